@@ -22,6 +22,7 @@ import pprint
 # IMPORT / GUI AND MODULES AND WIDGETS
 # ///////////////////////////////////////////////////////////////
 from modules import *
+from modules.compiler import compile_source
 from widgets import *
 os.environ["QT_FONT_DPI"] = "96" # FIX Problem for High DPI and Scale above 100%
 
@@ -29,6 +30,9 @@ os.environ["QT_FONT_DPI"] = "96" # FIX Problem for High DPI and Scale above 100%
 # ///////////////////////////////////////////////////////////////
 widgets = None
 
+# QTextCursor.selectedText devuelve los separadores de Qt; toPlainText los convierte así
+PLAIN_TEXT = str.maketrans({'\u2029': '\n', '\u2028': '\n', '\ufdd0': '\n', '\ufdd1': '\n', '\u00a0': ' '})
+
 class MainWindow(QMainWindow):
     def __init__(self):
         QMainWindow.__init__(self)
@@ -43,6 +47,11 @@ class MainWindow(QMainWindow):
         # INITIALIZE NEW CLASES
         #////////////////////////////////////////////////////////////////
         self.codeFile = CodeFile()
+        self.incrementalLexer = IncrementalLexer()
+        self.incrementalParser = IncrementalParser(self.incrementalLexer)
+        # La caché en disco es opcional: comparte los resultados con otras ejecuciones y con los scripts
+        diskCache = DiskCompilationCache(Settings.COMPILATION_CACHE_DIRECTORY, Settings.COMPILATION_CACHE_DISK_BYTES) if Settings.COMPILATION_CACHE_DIRECTORY else None
+        self.compilationCache = CompilationCache(Settings.COMPILATION_CACHE_ENTRIES, disk=diskCache)
         
 
         # USE CUSTOM TITLE BAR | USE AS "False" FOR MAC OR LINUX
@@ -75,6 +84,9 @@ class MainWindow(QMainWindow):
         widgets.btn_saveFile.clicked.connect(self.saveFileAction)
         widgets.btn_generate_code.clicked.connect(self.compilerCode)
 
+        # EDITOR CHANGES - mantiene actualizados los tokens del editor
+        widgets.plainTextEdit_editor.document().contentsChange.connect(self.editorContentsChange)
+
         # LEFT MENUS
         widgets.btn_home.clicked.connect(self.buttonClick)
         widgets.btn_widgets.clicked.connect(self.buttonClick)
@@ -182,7 +194,7 @@ class MainWindow(QMainWindow):
         if self.codeFile.load(path):            
             self.ui.plainTextEdit_editor.clear()
             
-            file_content = ''.join(self.codeFile.codeLines)
+            file_content = self.codeFile.code
             self.ui.plainTextEdit_editor.setPlainText(file_content)
         else: 
             mensaje1.exec()
@@ -222,13 +234,40 @@ class MainWindow(QMainWindow):
             mensaje1.exec()
             
     
+    @Slot(int, int, int)
+    def editorContentsChange(self, position, charsRemoved, charsAdded):
+        """Entrega al lexer incremental solo las líneas editadas; el texto completo se lee al compilar."""
+        document = self.ui.plainTextEdit_editor.document()
+        lexer = self.incrementalLexer
+        length = document.characterCount() - 1  # Sin el separador de párrafo final del documento
+        if position < 0 or position + charsRemoved > lexer.length or lexer.length - charsRemoved + charsAdded != length:
+            # La señal no corresponde al texto que conoce el lexer (por ejemplo setPlainText)
+            lexer.reset(self.ui.plainTextEdit_editor.toPlainText())
+            return
+
+        # Bloques (líneas) desde el de position hasta el del final de lo insertado, con su salto de línea
+        first = document.findBlock(position)
+        last = document.findBlock(position + charsAdded)
+        start = first.position()
+        end = min(last.position() + last.length(), length)
+        cursor = QTextCursor(document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        text = cursor.selectedText().translate(PLAIN_TEXT)
+        lexer.apply_lines(start, end - charsAdded + charsRemoved, text)
+
+    def runCompiler(self, text):
+        """Compila text con el lexer y el parser incrementales del editor; si ese texto ya se compiló devuelve el resultado guardado."""
+        options = CompilationOptions(max_lexical_errors=Settings.MAX_LEXICAL_ERRORS, max_syntax_errors=Settings.MAX_SYNTAX_ERRORS)
+        return compile_source(text, options, self.compilationCache, self.incrementalLexer, self.incrementalParser)
+
     @Slot()            
     def compilerCode(self):
         
         self.ui.message_output.clear()
         text = self.ui.plainTextEdit_editor.toPlainText()
-                
-        tokensFound, lexicalErrors = Compiler.lexicalAnalyser(text)
+        result = self.runCompiler(text)
+        tokensFound = result.tokens
         
         self.ui.lexical_analizer_table.setRowCount(len(tokensFound))
         
@@ -241,31 +280,29 @@ class MainWindow(QMainWindow):
             self.ui.lexical_analizer_table.setItem(pos, 1, tokenTypeWidget)
             self.ui.lexical_analizer_table.setItem(pos, 2, numTypeWidget)
             
-        if(lexicalErrors):
-            for i, error in enumerate(lexicalErrors):
+        if(result.lexical_errors):
+            for i, error in enumerate(result.lexical_errors):
                 self.showMessageOutput(f'{str(i + 1)}) {error}', QColor(230,25,25))
         else:
             self.showMessageOutput("Lexical analysis completed with no errors", QColor("green"))            
             
-            parseErrors = Compiler.parse(tokensFound)
-            if(parseErrors):
-                for i, error in enumerate(parseErrors):
+            if(result.syntax_errors):
+                for i, error in enumerate(result.syntax_errors):
                     self.showMessageOutput( f'{str(i + 1)}) {error}', QColor(230,25,25))
             else:
                 self.showMessageOutput("Syntax analysis completed with no errors", QColor("green"))
                 
-                semanticErrors = Compiler.semanticAnalyser()
-                if(semanticErrors):
-                    for i, error in enumerate(semanticErrors):
+                if(result.semantic_errors):
+                    for i, error in enumerate(result.semantic_errors):
                         self.showMessageOutput( f'{str(i + 1)}) {error}', QColor(230,25,25))
                 else:
-                    self.showMessageOutput("Semantic analysis completed with no errors", QColor("green")) 
-                                        
-                    if self.ui.plainTextEdit_editor.toPlainText().strip():
-                        resultMIPS = Compiler.MIPSGenerate(text)
-                        resultCode = Compiler.CodeResultGenerate(text)
-                        
-                        self.MIPSWindow = ResultCompilerWindow(resultMIPS, resultCode)
+                    self.showMessageOutput("Semantic analysis completed with no errors", QColor("green"))
+
+                    if(result.runtime_errors):
+                        for i, error in enumerate(result.runtime_errors):
+                            self.showMessageOutput( f'{str(i + 1)}) {error}', QColor(230,25,25))
+                    elif result.mips is not None:
+                        self.MIPSWindow = ResultCompilerWindow(result.mips, result.output)
                         self.MIPSWindow.show()               
                     
     def showMessageOutput(self, text, color):
@@ -32,6 +32,9 @@ from . app_functions import *
 # CLASSES FOR OUR PROYECT
 from . code_file import *
 from . compiler import *
+from . compilation_cache import *
+from . incremental_lexer import *
+from . incremental_parser import *
 
 
 # WINDOWS
@@ -1,12 +1,25 @@
 class Settings():
     # APP SETTINGS
     # ///////////////////////////////////////////////////////////////
+    # RELEASE VERSION (USED BY setup.py AND BY THE DISK COMPILATION CACHE)
+    VERSION = "1.0.0"
     ENABLE_CUSTOM_TITLE_BAR = True
     MENU_WIDTH = 240
     LEFT_BOX_WIDTH = 240
     RIGHT_BOX_WIDTH = 240
     TIME_ANIMATION = 500
 
+    # MAXIMUM LEXICAL AND SYNTAX ERRORS SHOWN IN THE OUTPUT
+    MAX_LEXICAL_ERRORS = 100
+    MAX_SYNTAX_ERRORS = 100
+
+    # COMPILATIONS KEPT IN MEMORY TO REUSE WHEN THE SAME TEXT IS COMPILED AGAIN
+    COMPILATION_CACHE_ENTRIES = 32
+
+    # DIRECTORY OF THE PERSISTENT COMPILATION CACHE (None DISABLES IT) AND ITS SIZE LIMIT
+    COMPILATION_CACHE_DIRECTORY = None
+    COMPILATION_CACHE_DISK_BYTES = 256 * 1024 * 1024
+
     # BTNS LEFT AND RIGHT BOX COLORS
     BTN_LEFT_BOX_COLOR = "background-color: rgb(44, 49, 58);"
     BTN_RIGHT_BOX_COLOR = "background-color: #ff79c6;"
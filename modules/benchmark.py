@@ -0,0 +1,349 @@
+"""Medición del rendimiento del analizador léxico y equivalencia entre sus motores.
+
+Uso: python -m modules.benchmark [--sizes 1k,10k,100k,1M,10M] [--mix mixto] [--engines regex,dfa] [--json resultados.json]
+"""
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from .incremental_lexer import IncrementalLexer
+from .incremental_parser import IncrementalParser
+from .lexer import tokens, regex_lexer, get_lexer
+from .parallel_lexer import ParallelLexer
+
+def legacy_lexical_analyser(code):
+    """Implementación anterior del analizador léxico (sin las impresiones de depuración), usada como referencia."""
+    token_regex = '|'.join(f'(?P<TOKEN_{i}>{pattern})' for i, (pattern, _, _) in enumerate(tokens))
+    compiled_re = re.compile(token_regex)
+
+    pos = 0
+    tokensFound = []
+    errors = []
+
+    while pos < len(code):
+        match = compiled_re.match(code, pos)
+        if match:
+            for i, (_, tokenType, numType) in enumerate(tokens):
+                lexeme = match.group(f'TOKEN_{i}')
+                if lexeme:
+                    if tokenType:
+                        tokensFound.append((lexeme, tokenType, numType))
+                    pos = match.end()
+                    break
+        else:
+            errors.append(f"Error LEXICO: token no reconosido '{code[pos]}'")
+            pos += 1
+
+    return tokensFound, errors
+
+def generate_program(lines, seed=0):
+    """Genera un programa sintético con declaraciones, asignaciones, if/else y print."""
+    rng = random.Random(seed)
+    names = [f'var{i}' for i in range(64)]
+    out = [f'int {name} = {i};' for i, name in enumerate(names)]
+
+    while len(out) < lines:
+        choice = rng.random()
+        a, b, c = rng.choice(names), rng.choice(names), rng.choice(names)
+        if choice < 0.6:
+            out.append(f'{a} = {b} + {c} * {rng.randint(0, 999)} - ({b} / 2);')
+        elif choice < 0.8:
+            out.append(f'if ({a} == {b}) {{')
+            out.append(f'    {c} = {a} + 1;')
+            out.append('} else {')
+            out.append(f'    {c} = {b} - 1;')
+            out.append('}')
+        else:
+            out.append(f'print({a});')
+
+    return '\n'.join(out[:lines]) + '\n'
+
+# Proporción de cada tipo de sentencia: (declaración, asignación, if/else, print)
+TOKEN_MIXES = {
+    'mixto': (0.10, 0.55, 0.20, 0.15),
+    'expresiones': (0.05, 0.85, 0.05, 0.05),
+    'control': (0.05, 0.30, 0.55, 0.10),
+    'declaraciones': (0.70, 0.20, 0.00, 0.10),
+}
+
+def generate_sized_program(target_tokens, mix='mixto', seed=0, max_depth=3):
+    """Genera un programa con declaraciones, asignaciones, if/else anidados y print de al menos target_tokens tokens.
+
+    Devuelve (código, número exacto de tokens). Cada sentencia se arma como lista de tokens, así
+    que el conteo no depende del analizador léxico que se quiera medir.
+    """
+    rng = random.Random(seed)
+    weights = TOKEN_MIXES[mix]
+    kinds = ('declaracion', 'asignacion', 'if', 'print')
+    names = []
+    lines = []
+    count = 0
+
+    def operand():
+        choice = rng.random()
+        if names and choice < 0.6:
+            return rng.choice(names)
+        if choice < 0.85:
+            return str(rng.randint(0, 9999))
+        return f'{rng.randint(0, 999)}.{rng.randint(0, 99)}'
+
+    def expression():
+        tokens = [operand()]
+        for _ in range(rng.randint(0, 4)):
+            tokens += [rng.choice('+-*/'), operand()]
+        if rng.random() < 0.2:
+            tokens = ['(', *tokens, ')', rng.choice('+-*/'), operand()]
+        return tokens
+
+    def emit(depth, tokens):
+        nonlocal count
+        lines.append('    ' * depth + ' '.join(tokens))
+        count += len(tokens)
+
+    def statement(depth):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'if' and depth >= max_depth:
+            kind = 'asignacion'
+        if kind != 'declaracion' and not names:
+            kind = 'declaracion'
+
+        if kind == 'declaracion':
+            name = f'v{len(names)}'
+            names.append(name)
+            if rng.random() < 0.8:
+                emit(depth, [rng.choice(('int', 'float')), name, '=', *expression(), ';'])
+            else:
+                emit(depth, [rng.choice(('int', 'float')), name, ';'])
+        elif kind == 'asignacion':
+            emit(depth, [rng.choice(names), '=', *expression(), ';'])
+        elif kind == 'print':
+            emit(depth, ['print', '(', rng.choice(names), ')', ';'])
+        else:
+            emit(depth, ['if', '(', *expression(), rng.choice(('==', '<', '>')), *expression(), ')', '{'])
+            for _ in range(rng.randint(1, 3)):
+                statement(depth + 1)
+            if rng.random() < 0.6:
+                emit(depth, ['}', 'else', '{'])
+                for _ in range(rng.randint(1, 3)):
+                    statement(depth + 1)
+            emit(depth, ['}'])
+
+    while count < target_tokens:
+        statement(0)
+    return '\n'.join(lines) + '\n', count
+
+# Casos límite para comparar motores: palabras reservadas pegadas a otros caracteres, números
+# incompletos, cadenas sin cerrar, caracteres no ASCII y caracteres no reconocidos.
+EQUIVALENCE_CASES = [
+    '', 'int', 'intx', 'int3', '3int', 'x3int', 'int_', '_int', 'void', 'voidx', 'float', 'printf', 'print(x);',
+    'if(x==3){x=1;}else{x=2;}', 'ifelse', 'else if', '3.5', '3.', '.5', '3..5', '12.34.56', '007',
+    '"abc"', '"a b" "c"', '""', '"sin cerrar', '"a\nb"', 'x = "a" + 1;', '<', '>', '==', '=', '!',
+    '||', '&&', '|', '&', '<=', '>=', '!=', '<==', '!==', '=>', '=<', '|||', '@', '#$%', 'a@b', '\t\n  \n', '\r\n', 'é', 'éint', 'intñ', '٣', 'x٣', '٣.٣', '€int',
+]
+
+def check_equivalence(reference, candidate, programs):
+    """Compara dos motores léxicos y devuelve los programas donde tokens o errores difieren."""
+    def result(lexer, code):
+        buffer, errors = lexer.tokenize(code)
+        return list(zip(buffer.kinds, buffer.starts, buffer.ends)), [(error.offset, error.message) for error in errors]
+
+    return [code for code in programs if result(reference, code) != result(candidate, code)]
+
+def random_programs(count, seed=0):
+    """Genera secuencias aleatorias de fragmentos de código, válidas o no."""
+    rng = random.Random(seed)
+    pieces = [case for case in EQUIVALENCE_CASES if case] + [' ', ' ', '\n', ';', '(', ')', '+', '-', '*', '/']
+    return [''.join(rng.choice(pieces) for _ in range(rng.randint(1, 12))) for _ in range(count)]
+
+def measure(lexer, code, repeat=3):
+    """Devuelve (tokens por segundo, número de tokens) tomando la mejor de varias ejecuciones."""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokensFound, _ = lexer(code)
+        elapsed = time.perf_counter() - start
+        count = len(tokensFound)
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best, count
+
+def measure_incremental(code, edits=200, seed=0):
+    """Devuelve la mediana en segundos de IncrementalLexer.apply_lines al escribir carácter por carácter en un punto del código.
+
+    Como el editor, se entrega solo la línea editada; armar el código nuevo queda fuera de la medición.
+    """
+    rng = random.Random(seed)
+    lexer = IncrementalLexer()
+    lexer.reset(code)
+    position = rng.randint(0, len(code))
+    timings = []
+    for _ in range(edits):
+        code = code[:position] + 'a' + code[position:]
+        first = code.rfind('\n', 0, position) + 1
+        last = code.find('\n', position + 1)
+        last = len(code) if last == -1 else last + 1
+        line = code[first:last]
+        start = time.perf_counter()
+        lexer.apply_lines(first, last - 1, line)
+        timings.append(time.perf_counter() - start)
+        position += 1
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def measure_incremental_parse(code, edits=50, seed=0):
+    """Devuelve la mediana en segundos de IncrementalParser.parse tras cambiar un número de una expresión."""
+    rng = random.Random(seed)
+    lexer = IncrementalLexer()
+    parser = IncrementalParser(lexer)
+    lexer.reset(code)
+    parser.parse(lexer.snapshot()[0])
+    timings = []
+    for _ in range(edits):
+        position = code.find('= ', rng.randint(0, len(code) - 1)) + 2
+        if position == 1:
+            continue
+        code = code[:position] + '7 + ' + code[position:]
+        lexer.apply_edit(position, 0, 4, code)
+        tokensFound, _ = lexer.snapshot()
+        start = time.perf_counter()
+        parser.parse(tokensFound)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def measure_parallel(code, workers=(1, 2, 4, 8), repeat=3):
+    """Devuelve [(procesos, tokens por segundo)] del análisis por fragmentos; verifica que coincida con el análisis en serie."""
+    expected = check_buffer(*regex_lexer.tokenize(code))
+    results = []
+    for count in workers:
+        with ParallelLexer(count, min_chunk_size=1 << 16) as lexer:
+            if check_buffer(*lexer.tokenize(code)) != expected:
+                raise SystemExit(f"El análisis con {count} procesos no coincide con el análisis en serie")
+            rate, _ = measure(lexer.tokenize, code, repeat)
+        results.append((count, rate))
+    return results
+
+def check_buffer(buffer, errors):
+    return list(zip(buffer.kinds, buffer.starts, buffer.ends)), [(error.offset, error.message, error.location) for error in errors]
+
+def parse_size(text):
+    """Convierte '1k', '250k', '1M' o '10M' en un número de tokens."""
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    text = text.strip().lower()
+    if text[-1:] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+def run_engines():
+    """Motores que se pueden medir, por nombre: función code -> (tokens, errores)."""
+    from .compiler import Compiler
+    return {
+        'anterior': legacy_lexical_analyser,
+        'regex': regex_lexer.tokenize,
+        'dfa': get_lexer('dfa').tokenize,
+        'compilador': Compiler.lexicalAnalyser,
+    }
+
+def benchmark(run, code, count, repeat=3):
+    """Mide un motor sobre code: tokens/s y MB/s de la mejor ejecución y el pico de memoria de tracemalloc."""
+    rate, found = measure(run, code, repeat)
+    if found != count:
+        raise SystemExit(f"Se esperaban {count} tokens y el motor encontró {found}")
+
+    tracemalloc.start()
+    try:
+        run(code)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    size = len(code.encode('utf-8'))
+    return {
+        'tokens': count,
+        'bytes': size,
+        'seconds': count / rate,
+        'tokens_per_second': rate,
+        'mb_per_second': size / (count / rate) / 1e6,
+        'peak_memory_bytes': peak,
+    }
+
+def verify(code):
+    """Comprueba que regex coincida con el motor dfa y con la implementación anterior antes de medir.
+
+    La implementación anterior divide '<=', '>=' y '!=' y reporta un error por carácter, así que
+    solo se compara con ella un código sin esos operadores ni errores léxicos (como el programa
+    sintético). La equivalencia completa de los motores está en tests/test_lexer_equivalence.py.
+    """
+    tokensFound, errors = regex_lexer.tokenize(code)
+    if not errors and not re.search(r'<=|>=|!=', code) and legacy_lexical_analyser(code) != (list(tokensFound), []):
+        raise SystemExit("Los resultados del motor regex y de la implementación anterior no coinciden")
+
+    mismatches = check_equivalence(regex_lexer, get_lexer('dfa'), EQUIVALENCE_CASES + random_programs(5000) + [code])
+    if mismatches:
+        raise SystemExit(f"Los motores regex y dfa no coinciden en {len(mismatches)} casos, por ejemplo {mismatches[0]!r}")
+
+def main(argv=None):
+    engines = run_engines()
+    parser = argparse.ArgumentParser(prog='python -m modules.benchmark', description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,10k,100k,1M',
+                        help="tamaños de los programas en tokens separados por comas (1k a 10M), por omisión %(default)s")
+    parser.add_argument('--mix', choices=sorted(TOKEN_MIXES), default='mixto', help="proporción de tipos de sentencia")
+    parser.add_argument('--engines', default='regex,dfa,compilador',
+                        help=f"motores separados por comas entre {', '.join(engines)}; por omisión %(default)s")
+    parser.add_argument('--repeat', type=int, default=3, help="ejecuciones por medición, se toma la mejor")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='ARCHIVO', help="guarda los resultados en JSON ('-' para la salida estándar)")
+    parser.add_argument('--extra', action='store_true', help="mide también el reanálisis incremental y el análisis en paralelo")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    names = args.engines.split(',')
+    unknown = [name for name in names if name not in engines]
+    if unknown:
+        parser.error(f"motor desconocido: {', '.join(unknown)}")
+
+    # Con --json - la tabla va a la salida de errores para no mezclarla con el JSON
+    out = sys.stderr if args.json == '-' else sys.stdout
+    results = []
+    print(f"{'tokens':>12}{'motor':>12}{'MB':>10}{'tokens/s':>14}{'MB/s':>10}{'memoria MB':>12}", file=out)
+    for index, size in enumerate(sizes):
+        code, count = generate_sized_program(size, args.mix, args.seed)
+        if index == 0:
+            verify(code)
+        for name in names:
+            result = {'engine': name, 'mix': args.mix, **benchmark(engines[name], code, count, args.repeat)}
+            results.append(result)
+            print(f"{count:>12,}{name:>12}{result['bytes'] / 1e6:>10.3f}{result['tokens_per_second']:>14,.0f}"
+                  f"{result['mb_per_second']:>10.2f}{result['peak_memory_bytes'] / 1e6:>12.1f}", file=out)
+
+    if args.extra:
+        code = generate_program(20000, args.seed)
+        print(f"Reanálisis incremental de una edición: {measure_incremental(code) * 1000:.3f} ms", file=out)
+        print(f"Análisis sintáctico incremental de una edición: {measure_incremental_parse(code) * 1000:.3f} ms", file=out)
+        print(f"{'procesos':<12}{'tokens/s':>14}{'escala':>10}", file=out)
+        scaling = measure_parallel(code + '@ "sin cerrar\n' + code)
+        for workers, rate in scaling:
+            print(f"{workers:<12}{rate:>14,.0f}{rate / scaling[0][1]:>9.2f}x", file=out)
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Formato de los archivos de caché en disco: una cabecera JSON seguida de bloques de bytes.
+
+A diferencia de pickle, leer un archivo no puede ejecutar código: JSON solo produce diccionarios,
+listas, cadenas, números, booleanos y None, y los bloques (arreglos de tokens, tablas del DFA) se
+copian tal cual. Los directorios de caché se comparten entre procesos y usuarios, así que quien
+lee un archivo valida los tipos y trata cualquier excepción como un archivo inválido.
+"""
+import json
+import struct
+import sys
+
+MAGIC = b'SSPTL2\0'
+_LENGTH = struct.Struct('<Q')
+
+def pack(header, *blobs):
+    """Serializa header (un valor JSON) y los bloques indicados (bytes o arreglos, que se guardan con el orden de bytes de la máquina)."""
+    lengths = [memoryview(blob).nbytes for blob in blobs]
+    text = json.dumps([sys.byteorder, lengths, header], separators=(',', ':')).encode('ascii')
+    return b''.join([MAGIC, _LENGTH.pack(len(text)), text, *blobs])
+
+def unpack(data):
+    """Devuelve (header, [bloques]) de lo que serializó pack; ValueError si data no tiene ese formato."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("El archivo no es una caché del compilador")
+    position = len(MAGIC) + _LENGTH.size
+    (size,) = _LENGTH.unpack_from(data, len(MAGIC))
+    byteorder, lengths, header = json.loads(data[position:position + size])
+    if byteorder != sys.byteorder:
+        raise ValueError("Caché guardada en una máquina con otro orden de bytes")
+    position += size
+    blobs = []
+    for length in lengths:
+        blobs.append(data[position:position + length])
+        position += length
+    if position != len(data):
+        raise ValueError("Caché truncada o con datos de más")
+    return header, blobs
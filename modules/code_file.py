@@ -1,7 +1,10 @@
+import mmap
+
+
 class CodeFile:
     def __init__(self) -> None:
         self.__code = ""
-        self.__codeLines = []
+        self.__codeLines = None
     
     @property
     def code(self):
@@ -13,6 +16,9 @@ class CodeFile:
         
     @property
     def codeLines(self):
+        # Las líneas se separan solo cuando se piden, para no tener el archivo dos veces en memoria
+        if self.__codeLines is None:
+            self.__codeLines = self.__code.splitlines(keepends=True)
         return self.__codeLines
 
     @codeLines.setter
@@ -25,14 +31,34 @@ class CodeFile:
         try:
             with open(path, 'r') as file:
                 
-                self.__codeLines = file.readlines()
-                self.__code = ''.join(self.__codeLines)
+                self.__code = file.read()
+                self.__codeLines = None
                 
             return 1
         
         except Exception as e:
             return 0
     
+    def iter_chunks(self, path, chunk_size=65536):
+        """Lee el archivo por fragmentos sin cargarlo completo en memoria."""
+        with open(path, 'r') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    
+    @staticmethod
+    def map(path):
+        """Mapea el archivo en memoria de solo lectura; el sistema carga las páginas a medida que se leen.
+
+        El resultado se puede pasar a RegexLexer.tokenize en lugar del texto.
+        """
+        with open(path, 'rb') as file:
+            if not file.seek(0, 2):
+                return b''  # mmap no admite archivos vacíos
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    
     def save(self, path):
         try:
             with open(path, 'w') as file:
@@ -0,0 +1,310 @@
+"""Cachés de los resultados de compilación, indexadas por el contenido del código.
+
+Compilar dos veces el mismo texto (o volver a él con deshacer/rehacer) devuelve el resultado
+guardado sin repetir ninguna fase. La clave es un hash BLAKE2 del código más las opciones de la
+compilación. CompilationCache guarda los resultados en memoria y descarta los menos usados
+recientemente al superar max_entries entradas o max_characters caracteres de código en total;
+DiskCompilationCache los guarda en un directorio compartido entre ejecuciones y procesos.
+"""
+import hashlib
+import os
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+
+from .app_settings import Settings
+from .cache_format import pack, unpack
+from .compiler import CompilationResult
+from .dfa_lexer import default_cache_directory
+from .diagnostics import Diagnostic
+from .interner import Interner
+from .lexer import tokens as token_table
+from .syntax_tree import NodeKind, flatten, unflatten
+from .token_buffer import TokenBuffer
+
+# Archivos de las fases del compilador y del formato de dumps: cualquier cambio en ellos invalida la caché en disco
+PHASE_FILES = (
+    'lexer.py', 'dfa_lexer.py', 'parallel_lexer.py', 'incremental_lexer.py', 'token_buffer.py',
+    'source_map.py', 'interner.py', 'diagnostics.py', 'compiler.py', 'syntax_tree.py', 'syntax_arena.py',
+    'll_parser.py', 'grammar.ebnf', 'incremental_parser.py', 'cache_format.py', 'compilation_cache.py',
+)
+
+def compiler_version():
+    """Hash de la versión de la aplicación y del código de las fases.
+
+    El ejecutable empaquetado con setup.py no incluye los .py, solo la gramática; ahí la versión
+    cambia con Settings.VERSION, que setup.py usa como versión del paquete.
+    """
+    digest = hashlib.blake2b(Settings.VERSION.encode('utf-8') + b'\0', digest_size=12)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in PHASE_FILES:
+        digest.update(name.encode('ascii') + b'\0')
+        try:
+            with open(os.path.join(directory, name), 'rb') as file:
+                digest.update(file.read())
+        except OSError:
+            pass
+    return digest.hexdigest()
+
+# Versión del compilador para la caché en disco: resultados guardados con otra versión no se leen
+COMPILER_VERSION = compiler_version()
+
+def source_key(source, options=()):
+    """Clave de source compilado con options (una tupla de valores que se pueden comparar)."""
+    data = source.encode('utf-8', 'surrogatepass') if isinstance(source, str) else bytes(source)
+    return hashlib.blake2b(data, digest_size=16).digest(), options
+
+def dumps(result):
+    """Serializa un CompilationResult con cache_format: arreglos de los tokens como bloques de bytes y,
+    en la cabecera JSON, diagnósticos como (mensaje, desplazamiento) y el árbol aplanado."""
+    def diagnostics(errors):
+        return None if errors is None else [(error.message, error.offset) for error in errors]
+
+    buffer = result.tokens
+    source = buffer.source
+    header = {
+        'version': COMPILER_VERSION,
+        'text': isinstance(source, str),
+        'names': buffer.interner.names if buffer.interner is not None else None,
+        'lexical_errors': diagnostics(result.lexical_errors),
+        'records': result._records if result._records is not None else flatten(result.program) if result.program is not None else None,
+        'syntax_errors': diagnostics(result.syntax_errors),
+        'semantic_errors': diagnostics(result.semantic_errors),
+        'mips': result.mips,
+        'output': result.output,
+        'runtime_errors': diagnostics(result.runtime_errors),
+        'timings': result.timings,
+    }
+    data = pack(
+        header,
+        source.encode('utf-8', 'surrogatepass') if isinstance(source, str) else bytes(source),
+        buffer.kinds, buffer.starts, buffer.ends,
+        buffer.symbols if buffer.symbols is not None else b'',
+    )
+    return zlib.compress(data, 1)
+
+def _optional(value, kind):
+    if value is not None and not isinstance(value, kind):
+        raise ValueError(f"Se esperaba {kind.__name__} en el resultado guardado")
+    return value
+
+def loads(data):
+    """Reconstruye el CompilationResult que serializó dumps; ValueError si el formato no corresponde.
+
+    Solo se aceptan los tipos que escribe dumps, y el árbol se reconstruye aquí para que un archivo
+    dañado cuente como fallo de la caché en lugar de fallar después, al pedir program.
+    """
+    header, (source, kinds, starts, ends, symbols) = unpack(zlib.decompress(data))
+    if header['version'] != COMPILER_VERSION:
+        raise ValueError(f"Resultado guardado por la versión {header['version']} del compilador")
+    if header['text']:
+        source = source.decode('utf-8', 'surrogatepass')
+
+    buffer = TokenBuffer(source, token_table)
+    buffer.kinds = array('B', kinds)
+    buffer.starts = array('I', starts)
+    buffer.ends = array('I', ends)
+    if not len(buffer.kinds) == len(buffer.starts) == len(buffer.ends):
+        raise ValueError("Arreglos de tokens de distinto tamaño")
+    names = _optional(header['names'], list)
+    if names is not None:
+        buffer.interner = Interner()
+        for name in names:
+            buffer.interner.intern(_optional(name, str))
+        buffer.symbols = array('I', symbols)
+
+    def diagnostics(errors):
+        if _optional(errors, list) is None:
+            return None
+        return [Diagnostic(_optional(message, str), _optional(offset, int), buffer.source_map) for message, offset in errors]
+
+    records = _optional(header['records'], list)
+    timings = _optional(header['timings'], dict)
+    result = CompilationResult(source)
+    result.tokens = buffer
+    result.lexical_errors = diagnostics(header['lexical_errors'])
+    if records is not None:
+        program = unflatten(records, buffer.interner)
+        if program.kind != NodeKind.PROGRAM:
+            raise ValueError("El árbol guardado no es un programa")
+        result.program = program
+    result.syntax_errors = diagnostics(header['syntax_errors'])
+    result.semantic_errors = diagnostics(header['semantic_errors'])
+    result.mips = _optional(header['mips'], str)
+    result.output = _optional(header['output'], str)
+    result.runtime_errors = diagnostics(header['runtime_errors'])
+    result.timings = {_optional(phase, str): _optional(seconds, float) for phase, seconds in timings.items()}
+    return result
+
+class CompilationCache:
+    """Caché LRU de CompilationResult con contadores de aciertos y fallos.
+
+    disk es una caché de segundo nivel (DiskCompilationCache): se consulta cuando el resultado no
+    está en memoria y recibe también los resultados nuevos.
+    """
+
+    def __init__(self, max_entries=32, max_characters=8 << 20, disk=None):
+        self.max_entries = max_entries
+        self.max_characters = max_characters
+        self.disk = disk
+        self.entries = OrderedDict()  # Clave -> (resultado, longitud del código), del menos al más reciente
+        self.characters = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, source, options=()):
+        """Devuelve el resultado guardado para source y options, o None si no está."""
+        key = source_key(source, options)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        if self.disk is not None:
+            result = self.disk.get(source, options)
+            if result is not None:
+                self.store(key, len(source), result)
+            return result
+        return None
+
+    def put(self, source, options, result):
+        """Guarda result y descarta las entradas más antiguas que excedan los límites."""
+        self.store(source_key(source, options), len(source), result)
+        if self.disk is not None:
+            self.disk.put(source, options, result)
+
+    def store(self, key, length, result):
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.characters -= previous[1]
+            if length > self.max_characters:
+                return
+            self.entries[key] = (result, length)
+            self.characters += length
+            while len(self.entries) > self.max_entries or self.characters > self.max_characters:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.characters -= evicted
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.characters = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def stats(self):
+        """Aciertos, fallos, entradas y caracteres guardados, para mostrarlos o trazarlos."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries), 'characters': self.characters}
+
+class DiskCompilationCache:
+    """Caché de CompilationResult en un directorio, un archivo por código, opciones y versión del compilador.
+
+    Los archivos se escriben en un temporal que luego se renombra, así que varios procesos pueden
+    compartir el directorio sin leer resultados a medias. Leer un resultado actualiza la fecha de
+    su archivo; al superar max_bytes se borran los archivos usados hace más tiempo hasta quedar
+    en tres cuartas partes del límite.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 << 20):
+        self.directory = directory or os.path.join(default_cache_directory(), 'compilaciones')
+        self.max_bytes = max_bytes
+        self.size = None  # Tamaño estimado del directorio; se calcula al primer put
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def path(self, source, options=()):
+        digest, options = source_key(source, options)
+        name = hashlib.blake2b(digest + repr((COMPILER_VERSION, options)).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f'{name}.bin')
+
+    def get(self, source, options=()):
+        """Devuelve el resultado guardado para source y options, o None si no está o no se puede leer."""
+        path = self.path(source, options)
+        try:
+            with open(path, 'rb') as file:
+                result = loads(file.read())
+            os.utime(path)
+        except Exception:  # Cualquier archivo dañado o ajeno cuenta como fallo
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return result
+
+    def put(self, source, options, result):
+        """Guarda result; los errores de escritura se ignoran porque la caché es opcional."""
+        path = self.path(source, options)
+        data = dumps(result)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            previous = os.path.getsize(path)  # Al reemplazar un resultado su tamaño anterior deja de contar
+        except OSError:
+            previous = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            return
+
+        with self.lock:
+            if self.size is None:
+                self.size = self.scan()[1]
+            else:
+                self.size += len(data) - previous
+            if self.size > self.max_bytes:
+                self.prune()
+
+    def scan(self):
+        """Devuelve [(fecha de uso, tamaño, ruta)] de los resultados guardados y su tamaño total."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as directory:
+                for entry in directory:
+                    if entry.name.endswith('.bin'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return entries, sum(size for _, size, _ in entries)
+
+    def prune(self):
+        entries, size = self.scan()
+        entries.sort()
+        target = self.max_bytes * 3 // 4
+        for _, length, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # Otro proceso ya lo borró
+            size -= length
+        self.size = size
+
+    def clear(self):
+        with self.lock:
+            for _, _, path in self.scan()[0]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.size = 0
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'directory': self.directory, 'bytes': self.size}
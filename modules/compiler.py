@@ -1,156 +1,153 @@
-import re
+import operator
+import time
+from itertools import chain
+
+from .code_file import CodeFile
+from .diagnostics import Diagnostic
+from .interner import Interner
+from .lexer import TokenKind, kind_name, get_lexer
+from .parallel_lexer import get_parallel_lexer
+from .syntax_arena import Cursor, SyntaxArena
+from .syntax_tree import NodeKind, TreeBuilder, postorder, declarations, flatten, unflatten
+from .tracing import TraceLevel, tracer as default_tracer
+
+# Lo que exporta 'from modules import *': sin __all__ también saldrían los módulos importados aquí
+__all__ = ['Interpreter', 'MIPSCodeGenerator', 'SemanticAnalyzer', 'Parser', 'Compiler', 'CompilationOptions',
+           'CompilationResult', 'Compilation', 'compile_source']
 
 class Interpreter:
-    def __init__(self, code):
-        self.symbol_table = {}  # Tabla de símbolos para almacenar las variables y sus valores
-        self.declarations = self.parse_code(code)  # Declaraciones del código fuente
+    # Operadores de las condiciones de if
+    COMPARACIONES = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+    OPERACIONES = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+
+    def __init__(self, program, tracer=None):
+        self.trace = (tracer or default_tracer).hook('interpreter')
+        self.program = program  # Árbol de sintaxis construido por el Parser
+        self.names = program.interner.names  # Nombre de cada variable por su ID
+        self.values = [None] * len(self.names)  # Valor de cada variable indexado por su ID, None si no existe
         self.output = []  # Almacena los resultados de las instrucciones print
         self.evaluate()
     
     def evaluate(self):
-        """Evalúa todas las declaraciones y realiza las operaciones necesarias."""
-        for decl in self.declarations:
-            if decl['type'] == 'declaration':
-                self.declare_variable(decl)
-            elif decl['type'] == 'assignment':
-                self.process_assignment(decl)
-            elif decl['type'] == 'print':
-                self.process_print(decl)
+        """Evalúa todas las sentencias del programa y realiza las operaciones necesarias."""
+        self.execute(self.program.statements)
+
+    def execute(self, statements):
+        """Ejecuta las sentencias en orden; el bloque elegido de un if/else se apila, sin recursión."""
+        stack = [iter(statements)]
+        while stack:
+            for statement in stack[-1]:
+                if self.trace:
+                    self.trace('statement', kind=NodeKind(statement.kind).name, offset=statement.offset)
+                if statement.kind == NodeKind.DECLARATION:
+                    self.declare_variable(statement)
+                elif statement.kind == NodeKind.ASSIGNMENT:
+                    self.process_assignment(statement)
+                elif statement.kind == NodeKind.PRINT:
+                    self.process_print(statement)
+                elif statement.kind == NodeKind.IF_ELSE:
+                    body = statement.then_body if self.evaluate_condition(statement.condition) else statement.else_body
+                    if body is not None:
+                        stack.append(iter(body))
+                        break
+            else:
+                stack.pop()
     
-    def declare_variable(self, decl):
+    def declare_variable(self, statement):
         """Declara una variable y la inicializa con su valor inicial."""
-        var_name = decl['name']
-        var_type = decl['var_type']
         # Inicializa con 0 o 0.0 según el tipo si no tiene una asignación inmediata
-        initial_value = 0 if var_type == 'int' else 0.0
-        self.symbol_table[var_name] = initial_value
+        self.values[statement.symbol] = 0 if statement.var_type == 'int' else 0.0
+        if statement.value is not None:
+            self.values[statement.symbol] = self.evaluate_expression(statement.value)
     
-    def process_assignment(self, decl):
+    def process_assignment(self, statement):
         """Procesa una asignación, evalúa la expresión y actualiza la tabla de símbolos."""
-        var_name = decl['name']
-        expression = decl['expression_type']
-        # Evalúa la expresión y actualiza la tabla de símbolos
-        self.symbol_table[var_name] = self.evaluate_expression(expression)
+        self.values[statement.symbol] = self.evaluate_expression(statement.value)
     
-    def evaluate_expression(self, expr):
-        """Evalúa una expresión y devuelve el resultado."""
-        # Reemplaza las variables con sus valores actuales en la tabla de símbolos
-        for var in self.symbol_table:
-            expr = expr.replace(var, str(self.symbol_table[var]))
-        
-        # Evalúa la expresión aritmética
+    def evaluate_expression(self, expression):
+        """Evalúa una expresión del árbol y devuelve el resultado."""
+        operations = self.OPERACIONES
+        stack = []
+        for node in postorder(expression):
+            if node.kind == NodeKind.BINARY_OP:
+                right = stack.pop()
+                try:
+                    stack[-1] = operations[node.operator](stack[-1], right)
+                except ArithmeticError as e:  # División entre cero o resultado demasiado grande para un float
+                    raise self.error(f"Error evaluando la expresión: {e}", node)
+            elif node.kind == NodeKind.NUMBER:
+                stack.append(node.value)
+            elif node.kind == NodeKind.VARIABLE:
+                value = self.values[node.symbol]
+                if value is None:
+                    raise self.error(f"Error: La variable '{self.names[node.symbol]}' no está definida.", node)
+                stack.append(value)
+            else:
+                raise self.error("Error evaluando la expresión: falta un operando", node)
+
+        result = stack[0]
+        # Determina si el resultado debe ser entero o flotante; int() falla con un float infinito o NaN
         try:
-            result = eval(expr)
-            # Determina si el resultado debe ser entero o flotante
             return int(result) if result == int(result) else float(result)
-        except Exception as e:
-            raise ValueError(f"Error evaluando la expresión '{expr}': {e}")
+        except (ArithmeticError, ValueError) as e:
+            raise self.error(f"Error evaluando la expresión: {e}", expression)
+
+    def error(self, message, node):
+        """ValueError de ejecución con el desplazamiento (offset) del nodo que lo produjo."""
+        error = ValueError(message)
+        error.offset = node.offset
+        return error
+
+    def evaluate_condition(self, condition):
+        return self.COMPARACIONES[condition.operator](self.evaluate_expression(condition.left), self.evaluate_expression(condition.right))
     
-    def process_print(self, decl):
+    def process_print(self, statement):
         """Procesa una instrucción print y almacena el valor en la salida."""
-        var_name = decl['name']
-        if var_name in self.symbol_table:
-            value = self.symbol_table[var_name]
-            self.output.append(f"{var_name} = {value}")
-        else:
-            raise ValueError(f"Error: La variable '{var_name}' no está definida.")
-    
-    def parse_code(cls, code):
-        lines = code.strip().splitlines()
-
-        declarations = []
-        variables = {}  # Diccionario para almacenar variables y sus tipos
-
-        for line in lines:
-            line = line.strip()
-
-            # Declaración e inicialización (e.g., int suma = 0;)
-            decl_init_match = re.match(r"(int|float|double|char)\s+(\w+)\s*=\s*(.+);", line)
-            if decl_init_match:
-                var_type, name, expression = decl_init_match.groups()
-                variables[name] = var_type  # Registrar el tipo de la variable
-                declarations.append({
-                    'type': 'declaration',
-                    'name': name,
-                    'var_type': var_type
-                })
-                declarations.append({
-                    'type': 'assignment',
-                    'name': name,
-                    'var_type': var_type,
-                    'expression_type': expression
-                })
-                continue
-
-            # Declaración sin inicialización (e.g., int x;)
-            decl_match = re.match(r"(int|float|double|char)\s+(\w+);", line)
-            if decl_match:
-                var_type, name = decl_match.groups()
-                variables[name] = var_type  # Registrar el tipo de la variable
-                declarations.append({
-                    'type': 'declaration',
-                    'name': name,
-                    'var_type': var_type
-                })
-                continue
-
-            # Asignación (e.g., suma = x + y + 30;)
-            assign_match = re.match(r"(\w+)\s*=\s*(.+);", line)
-            if assign_match:
-                name, expression = assign_match.groups()
-                var_type = variables.get(name, 'int')  # Obtener el tipo de la variable si está registrado
-                declarations.append({
-                    'type': 'assignment',
-                    'name': name,
-                    'var_type': var_type,
-                    'expression_type': expression
-                })
-                continue
-
-            # Print (e.g., print(suma);)
-            print_match = re.match(r"print\((\w+)\);", line)
-            if print_match:
-                name = print_match.group(1)
-                var_type = variables.get(name, 'unknown')  # Obtener el tipo de la variable o marcar como desconocido
-                declarations.append({
-                    'type': 'print',
-                    'name': name,
-                    'var_type': var_type
-                })
-                continue
-
-        return declarations
-    
+        self.output.append(f"{statement.label} = {self.evaluate_expression(statement.value)}")
     
     def getResult(self):
         """Devuelve el resultado de todas las instrucciones print."""
         return "\n".join(self.output)
 
 class MIPSCodeGenerator:
-    def __init__(self, code):
-        self.declarations = self.parse_code(code)
+    INSTRUCCIONES_INT = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div'}
+    INSTRUCCIONES_FLOAT = {'+': 'add.s', '-': 'sub.s', '*': 'mul.s', '/': 'div.s'}
+    # Salto al bloque else cuando la condición de un if es falsa
+    SALTOS_INT = {'==': 'bne', '!=': 'beq', '<': 'bge', '<=': 'bgt', '>': 'ble', '>=': 'blt'}
+    # Comparación de flotantes y si se salta cuando es falsa (bc1f) o verdadera (bc1t)
+    SALTOS_FLOAT = {
+        '==': ('c.eq.s', 'bc1f'), '!=': ('c.eq.s', 'bc1t'), '<': ('c.lt.s', 'bc1f'),
+        '<=': ('c.le.s', 'bc1f'), '>': ('c.le.s', 'bc1t'), '>=': ('c.lt.s', 'bc1t'),
+    }
+    # Registros para evaluar expresiones; los dos últimos se reservan para los operandos guardados en la pila
+    REGISTROS_INT = [f'$t{i}' for i in range(10)]
+    REGISTROS_FLOAT = [f'$f{i}' for i in range(12)]
+
+    def __init__(self, program, tracer=None):
+        self.trace = (tracer or default_tracer).hook('mips')
+        self.program = program  # Árbol de sintaxis construido por el Parser
+        self.names = program.interner.names  # Etiqueta de cada variable por su ID
+        self.types = [None] * len(self.names)  # Tipo declarado de cada variable
+        self.labels = 0  # Contador para las etiquetas de los if
         self.mips_code = [] 
         self.result = self.generate()
 
     def generate(self):
-        # Sección de datos
+        # Sección de datos: una etiqueta por variable aunque se declare varias veces
         self.mips_code.append(".data")
-        for decl in self.declarations:
-            if decl['type'] == 'declaration':
-                if decl['var_type'] == 'int':
-                    self.mips_code.append(f"{decl['name']}: .word 0")
-                elif decl['var_type'] == 'float':
-                    self.mips_code.append(f"{decl['name']}: .float {decl.get('initial_value', 0.0)}")
+        for declaration in declarations(self.program.statements):
+            if self.types[declaration.symbol] is None:
+                self.types[declaration.symbol] = declaration.var_type
+                if declaration.var_type == 'int':
+                    self.mips_code.append(f"{self.names[declaration.symbol]}: .word 0")
+                elif declaration.var_type == 'float':
+                    self.mips_code.append(f"{self.names[declaration.symbol]}: .float 0.0")
 
         # Sección de texto
         self.mips_code.append("\n.text")
         self.mips_code.append("main:")
 
-        for decl in self.declarations:
-            if decl['type'] == 'assignment':
-                self.process_assignment(decl)
-            elif decl['type'] == 'print':
-                self.process_print(decl)
+        self.process_statements(self.program.statements)
 
         # Finalizar programa
         self.mips_code.append("    li $v0, 10")
@@ -158,190 +155,279 @@ class MIPSCodeGenerator:
 
         return "\n".join(self.mips_code)
 
-    def process_assignment(self, decl):
-        """Procesa asignaciones, incluyendo expresiones complejas con variables y literales."""
-        expr = decl['expression_type']
-        var_type = decl['var_type']
-        operators = re.findall(r'[+\-*/]', expr)  # Encuentra todos los operadores
-        operands = re.split(r'[+\-*/]', expr)  # Divide la expresión en operandos
-
-        if var_type == 'int':
-            self.distribute_registers_int(operands, operators, decl['name'])
-        elif var_type == 'float':
-            self.distribute_registers_float(operands, operators, decl['name'])
+    def process_statements(self, statements):
+        """Genera las sentencias en orden sin recursión: los bloques de un if/else se apilan junto con las líneas que los cierran."""
+        stack = [iter(statements)]
+        while stack:
+            for statement in stack[-1]:
+                if isinstance(statement, str):  # Salto o etiqueta de un if/else
+                    self.mips_code.append(statement)
+                    continue
+                if self.trace:
+                    self.trace('statement', kind=NodeKind(statement.kind).name, instructions=len(self.mips_code))
+                if statement.kind in (NodeKind.DECLARATION, NodeKind.ASSIGNMENT):
+                    if statement.value is not None:
+                        self.process_assignment(statement)
+                elif statement.kind == NodeKind.PRINT:
+                    self.process_print(statement)
+                elif statement.kind == NodeKind.IF_ELSE:
+                    stack.append(self.process_if_else(statement))
+                    break
+            else:
+                stack.pop()
 
-    def distribute_registers_int(self, operands, operators, result_var):
-        """Distribuye cálculos entre registros temporales para enteros."""
-        self.load_operand(operands[0].strip(), '$t0')  # Carga el primer operando en $t0
+    def process_assignment(self, statement):
+        """Evalúa la expresión con instrucciones del tipo de la variable y guarda el resultado en memoria."""
+        name = self.names[statement.symbol]
+        if self.types[statement.symbol] == 'float':
+            register = self.load_expression(statement.value, True)
+            self.mips_code.append(f"    s.s {register}, {name}")
+        else:
+            register = self.load_expression(statement.value, False)
+            self.mips_code.append(f"    sw {register}, {name}")
 
-        for i, op in enumerate(operators):
-            reg_target = f'$t{i + 1}'  # Usa $t1, $t2, etc., dinámicamente
-            self.load_operand(operands[i + 1].strip(), reg_target)  # Carga el siguiente operando
-            instr = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div'}[op]
-            self.mips_code.append(f"    {instr} $t0, $t0, {reg_target}")  # Actualiza $t0 con el resultado
+    def is_float(self, expression):
+        """Una expresión se evalúa con registros flotantes si tiene algún número o variable flotante."""
+        for node in postorder(expression):
+            if node.kind == NodeKind.NUMBER and node.type == 'float':
+                return True
+            if node.kind == NodeKind.VARIABLE and self.types[node.symbol] == 'float':
+                return True
+        return False
 
-        self.mips_code.append(f"    sw $t0, {result_var}")  # Guarda el resultado final en memoria
+    def load_expression(self, expression, is_float, base=0):
+        """Evalúa la expresión en registros y devuelve el registro con el resultado.
 
-    def distribute_registers_float(self, operands, operators, result_var):
-        """Distribuye cálculos entre registros temporales para flotantes."""
-        self.load_operand(operands[0].strip(), '$f0', is_float=True)  # Carga el primer operando en $f0
+        El operando en la posición d de la pila de evaluación usa el registro d a partir de base;
+        cuando no quedan registros se guarda en la pila de MIPS ($sp) y los dos registros
+        reservados se usan para operar con él.
+        """
+        registers = self.REGISTROS_FLOAT if is_float else self.REGISTROS_INT
+        instructions = self.INSTRUCCIONES_FLOAT if is_float else self.INSTRUCCIONES_INT
+        store, load = ('s.s', 'l.s') if is_float else ('sw', 'lw')
+        available = len(registers) - 2
+        first_scratch, second_scratch = registers[-2], registers[-1]
+        code = self.mips_code
+        depth = base
 
-        for i, op in enumerate(operators):
-            reg_target = f'$f{i + 1}'  # Usa $f1, $f2, etc., dinámicamente
-            self.load_operand(operands[i + 1].strip(), reg_target, is_float=True)  # Carga el siguiente operando
-            instr = {'+': 'add.s', '-': 'sub.s', '*': 'mul.s', '/': 'div.s'}[op]
-            self.mips_code.append(f"    {instr} $f0, $f0, {reg_target}")  # Actualiza $f0 con el resultado
+        for node in postorder(expression):
+            if node.kind == NodeKind.BINARY_OP:
+                depth -= 1
+                right = registers[depth] if depth < available else second_scratch
+                if depth >= available:
+                    code.append(f"    {load} {right}, 0($sp)")
+                    code.append("    addi $sp, $sp, 4")
+                left = registers[depth - 1] if depth - 1 < available else first_scratch
+                if depth - 1 >= available:
+                    code.append(f"    {load} {left}, 0($sp)")
+                    code.append("    addi $sp, $sp, 4")
+                code.append(f"    {instructions[node.operator]} {left}, {left}, {right}")
+                if depth - 1 >= available:
+                    code.append("    addi $sp, $sp, -4")
+                    code.append(f"    {store} {left}, 0($sp)")
+            else:
+                register = registers[depth] if depth < available else first_scratch
+                self.load_operand(node, register, is_float)
+                if depth >= available:
+                    code.append("    addi $sp, $sp, -4")
+                    code.append(f"    {store} {register}, 0($sp)")
+                depth += 1
 
-        self.mips_code.append(f"    s.s $f0, {result_var}")  # Guarda el resultado final en memoria
+        return registers[base]
 
-    def load_operand(self, operand, reg, is_float=False):
+    def load_operand(self, node, reg, is_float=False):
         """Carga un operando en un registro, ya sea una variable o un literal."""
-        if operand.isdigit() or '.' in operand:  # Literal
+        if node.kind == NodeKind.VARIABLE:
             if is_float:
-                self.mips_code.append(f"    li.s {reg}, {operand}")
+                self.mips_code.append(f"    l.s {reg}, {self.names[node.symbol]}")
+                if self.types[node.symbol] == 'int':
+                    self.mips_code.append(f"    cvt.s.w {reg}, {reg}")  # Entero usado en una expresión real
             else:
-                self.mips_code.append(f"    li {reg}, {operand}")
-        else:  # Variable
+                self.mips_code.append(f"    lw {reg}, {self.names[node.symbol]}")
+        else:  # Literal
+            value = node.value if node.kind == NodeKind.NUMBER else 0
             if is_float:
-                self.mips_code.append(f"    l.s {reg}, {operand}")
+                self.mips_code.append(f"    li.s {reg}, {value}")
             else:
-                self.mips_code.append(f"    lw {reg}, {operand}")
+                self.mips_code.append(f"    li {reg}, {value}")
 
-    def process_print(self, decl):
+    def process_print(self, statement):
         """Procesa la impresión de valores."""
-        var_type = decl['var_type']
-        if var_type == 'int':
-            self.mips_code.append(f"    lw $a0, {decl['name']}")
-            self.mips_code.append("    li $v0, 1")  # Código de sistema para imprimir enteros
-        elif var_type == 'float':
-            self.mips_code.append(f"    l.s $f12, {decl['name']}")
-            self.mips_code.append("    li $v0, 2")  # Código de sistema para imprimir flotantes
+        value = statement.value
+        if value.kind == NodeKind.VARIABLE:
+            var_type = self.types[value.symbol]
+            if var_type == 'int':
+                self.mips_code.append(f"    lw $a0, {self.names[value.symbol]}")
+                self.mips_code.append("    li $v0, 1")  # Código de sistema para imprimir enteros
+            elif var_type == 'float':
+                self.mips_code.append(f"    l.s $f12, {self.names[value.symbol]}")
+                self.mips_code.append("    li $v0, 2")  # Código de sistema para imprimir flotantes
+        elif self.is_float(value):
+            self.mips_code.append(f"    mov.s $f12, {self.load_expression(value, True)}")
+            self.mips_code.append("    li $v0, 2")
+        else:
+            self.mips_code.append(f"    move $a0, {self.load_expression(value, False)}")
+            self.mips_code.append("    li $v0, 1")
         self.mips_code.append("    syscall")
 
-    def parse_code(cls, code):
-        lines = code.strip().splitlines()
-
-        declarations = []
-        variables = {}  # Diccionario para almacenar variables y sus tipos
-
-        for line in lines:
-            line = line.strip()
-
-            # Declaración e inicialización (e.g., int suma = 0;)
-            decl_init_match = re.match(r"(int|float|double|char)\s+(\w+)\s*=\s*(.+);", line)
-            if decl_init_match:
-                var_type, name, expression = decl_init_match.groups()
-                variables[name] = var_type  # Registrar el tipo de la variable
-                declarations.append({
-                    'type': 'declaration',
-                    'name': name,
-                    'var_type': var_type
-                })
-                declarations.append({
-                    'type': 'assignment',
-                    'name': name,
-                    'var_type': var_type,
-                    'expression_type': expression
-                })
-                continue
-
-            # Declaración sin inicialización (e.g., int x;)
-            decl_match = re.match(r"(int|float|double|char)\s+(\w+);", line)
-            if decl_match:
-                var_type, name = decl_match.groups()
-                variables[name] = var_type  # Registrar el tipo de la variable
-                declarations.append({
-                    'type': 'declaration',
-                    'name': name,
-                    'var_type': var_type
-                })
-                continue
-
-            # Asignación (e.g., suma = x + y + 30;)
-            assign_match = re.match(r"(\w+)\s*=\s*(.+);", line)
-            if assign_match:
-                name, expression = assign_match.groups()
-                var_type = variables.get(name, 'int')  # Obtener el tipo de la variable si está registrado
-                declarations.append({
-                    'type': 'assignment',
-                    'name': name,
-                    'var_type': var_type,
-                    'expression_type': expression
-                })
-                continue
-
-            # Print (e.g., print(suma);)
-            print_match = re.match(r"print\((\w+)\);", line)
-            if print_match:
-                name = print_match.group(1)
-                var_type = variables.get(name, 'unknown')  # Obtener el tipo de la variable o marcar como desconocido
-                declarations.append({
-                    'type': 'print',
-                    'name': name,
-                    'var_type': var_type
-                })
-                continue
-
-        return declarations
+    def process_if_else(self, statement):
+        """Evalúa la condición y salta al else (o al final) cuando es falsa.
+
+        Devuelve los bloques del if/else con sus saltos y etiquetas, para que process_statements los genere.
+        """
+        condition = statement.condition
+        label = self.labels
+        self.labels += 1
+        skip = f"else_{label}" if statement.else_body is not None else f"endif_{label}"
+
+        is_float = self.is_float(condition.left) or self.is_float(condition.right)
+        left = self.load_expression(condition.left, is_float)
+        right = self.load_expression(condition.right, is_float, 1)
+        if is_float:
+            compare, branch = self.SALTOS_FLOAT[condition.operator]
+            self.mips_code.append(f"    {compare} {left}, {right}")
+            self.mips_code.append(f"    {branch} {skip}")
+        else:
+            self.mips_code.append(f"    {self.SALTOS_INT[condition.operator]} {left}, {right}, {skip}")
+
+        if statement.else_body is None:
+            return chain(statement.then_body, (f"endif_{label}:",))
+        return chain(statement.then_body, (f"    j endif_{label}", f"else_{label}:"), statement.else_body, (f"endif_{label}:",))
     
     def getResult(self):
         return self.result
     
+# Marca de las variables sin declarar en SemanticAnalyzer.types (None es un tipo válido: 'int x;')
+UNDECLARED = object()
+
 class SemanticAnalyzer:
-    def __init__(self):
-        self.symbol_table = {}  # Tabla de símbolos: almacena nombre y tipo de cada variable
+    def __init__(self, source_map=None, tracer=None, interner=None):
+        self.trace = (tracer or default_tracer).hook('semantic')
+        self.interner = Interner() if interner is None else interner  # Nombres de las variables por ID
+        self.types = [UNDECLARED] * len(self.interner)  # Tabla de símbolos: tipo de cada variable indexado por su ID
         self.semantic_errors = []  # Lista para almacenar errores semánticos
-        self.declarations = []
+        self.source_map = source_map  # Para ubicar los errores en el código fuente
 
-    def declare_variable(self, name, var_type):
+    def error(self, message, offset=None):
+        self.semantic_errors.append(Diagnostic(message, offset, self.source_map))
+
+    @property
+    def symbol_table(self):
+        """Tabla de símbolos como diccionario nombre -> tipo, para mostrarla."""
+        names = self.interner.names
+        return {names[symbol]: var_type for symbol, var_type in enumerate(self.types) if var_type is not UNDECLARED}
+
+    def get_type(self, symbol):
+        """Devuelve el tipo de la variable symbol, o UNDECLARED si no ha sido declarada."""
+        types = self.types
+        return types[symbol] if symbol < len(types) else UNDECLARED
+
+    def declare_variable(self, symbol, var_type, offset=None):
         """Declara una variable en la tabla de símbolos; registra un error si ya está declarada."""
-        if name in self.symbol_table:
-            self.semantic_errors.append(f"Error SEMANTICO: La variable '{name}' ya ha sido declarada.")
+        if self.get_type(symbol) is not UNDECLARED:
+            self.error(f"Error SEMANTICO: La variable '{self.interner.name(symbol)}' ya ha sido declarada.", offset)
         else:
-            self.symbol_table[name] = var_type
+            types = self.types
+            if symbol >= len(types):
+                types.extend([UNDECLARED] * (symbol + 1 - len(types)))
+            types[symbol] = var_type
 
-    def check_variable(self, name):
+    def check_variable(self, symbol, offset=None):
         """Verifica si una variable ha sido declarada antes de usarse; registra un error si no lo está."""
-        print(f"check_variable | variable a checar -> {name}, name not in self.symbol_table -> {name not in self.symbol_table}")
-        if name not in self.symbol_table:
-            self.semantic_errors.append(f"Error SEMANTICO: La variable '{name}' no ha sido declarada.")
-            print(self.semantic_errors)
+        var_type = self.get_type(symbol)
+        if self.trace:
+            self.trace('check_variable', name=self.interner.name(symbol), declared=var_type is not UNDECLARED)
+        if var_type is UNDECLARED:
+            self.error(f"Error SEMANTICO: La variable '{self.interner.name(symbol)}' no ha sido declarada.", offset)
         else:
-            return self.symbol_table[name]
+            return var_type
 
-    def check_type(self, name, expected_type):
+    def check_type(self, symbol, expected_type, offset=None):
         """Verifica que el tipo de una variable coincida con el tipo esperado."""
-        actual_type = self.symbol_table.get(name)
-        if actual_type and actual_type != expected_type:
-            self.semantic_errors.append(
-                f"Error SEMANTICO: Se esperaba un dato de tipo '{actual_type}' pero se encontró el siguiente tipo de valor '{expected_type}' para la variable '{name}'."
+        actual_type = self.get_type(symbol)
+        if actual_type is not UNDECLARED and actual_type and actual_type != expected_type:
+            self.error(
+                f"Error SEMANTICO: Se esperaba un dato de tipo '{actual_type}' pero se encontró el siguiente tipo de valor '{expected_type}' para la variable '{self.interner.name(symbol)}'.",
+                offset
             )
     
-    def check_assignment(self, var_name, expr_type):
+    def check_assignment(self, symbol, expr_type, offset=None):
         """Verifica que el tipo de la variable coincida con el tipo de la expresión asignada."""
-        var_type = self.symbol_table.get(var_name)
-        if var_type and var_type != expr_type:
+        var_type = self.get_type(symbol)
+        if var_type is not UNDECLARED and var_type and var_type != expr_type:
+            var_name = self.interner.name(symbol)
             if var_type == "int" and expr_type == "float":
-                self.semantic_errors.append(
-                    f"Error SEMANTICO: No se puede asignar un valor de tipo 'float' a la variable '{var_name}' de tipo 'int'."
+                self.error(
+                    f"Error SEMANTICO: No se puede asignar un valor de tipo 'float' a la variable '{var_name}' de tipo 'int'.",
+                    offset
                 )
             elif var_type == "float" and expr_type == "int":
                 # Si es permitido en tu lenguaje, podrías omitir este caso
                 pass
             else:
-                self.semantic_errors.append(
-                    f"Error SEMANTICO: El tipo de la expresión ('{expr_type}') no coincide con el tipo de la variable '{var_name}' ('{var_type}')"
+                self.error(
+                    f"Error SEMANTICO: El tipo de la expresión ('{expr_type}') no coincide con el tipo de la variable '{var_name}' ('{var_type}')",
+                    offset
                 )
 
-    def analyze(self):
-        """Método principal para iniciar el análisis semántico, tomando como entrada el parser."""
-        for declaration in self.declarations:
-            if declaration['type'] == 'declaration':
-                self.declare_variable(declaration['name'], declaration['var_type'])
-            elif declaration['type'] == 'assignment':
-                self.check_variable(declaration['name'])
-                if declaration['expression_type']:
-                    self.check_type(declaration['name'], declaration['expression_type'])
+    def get_equivalent(self, word):
+        equivalent = {
+            "entero": "int",
+            "real": "float",
+        }
+        
+        if self.trace:
+            self.trace('equivalent', word=word, equivalent=equivalent.get(word, word))
+        
+        return equivalent.get(word, word)
+
+    def analyze(self, program):
+        """Método principal del análisis semántico: recorre el árbol que construyó el Parser en orden del código."""
+        self.visit(program.statements)
+
+    def visit(self, statements):
+        """Analiza las sentencias en orden del código; los bloques de un if/else se apilan, sin recursión."""
+        stack = [iter(statements)]
+        while stack:
+            for statement in stack[-1]:
+                if statement.kind == NodeKind.DECLARATION:
+                    expr_type = self.expression_type(statement.value) if statement.value is not None else None
+                    if self.trace:
+                        self.trace('declaration', name=self.interner.name(statement.symbol), expr_type=expr_type)
+                    self.declare_variable(statement.symbol, self.get_equivalent(expr_type), statement.offset)
+                elif statement.kind == NodeKind.ASSIGNMENT:
+                    if self.trace:
+                        self.trace('assignment', name=self.interner.name(statement.symbol), symbol_table=self.symbol_table)
+                    self.check_variable(statement.symbol, statement.offset)  # Verifica que la variable esté declarada
+                    if statement.value is not None:
+                        expr_type = self.expression_type(statement.value)
+                        self.check_assignment(statement.symbol, self.get_equivalent(expr_type), statement.offset)
+                elif statement.kind == NodeKind.IF_ELSE:
+                    self.expression_type(statement.condition.left)
+                    self.expression_type(statement.condition.right)
+                    stack.append(chain(statement.then_body, statement.else_body or ()))
+                    break
+                elif statement.kind == NodeKind.PRINT:
+                    self.expression_type(statement.value)
+            else:
+                stack.pop()
+
+    def expression_type(self, expression):
+        """Verifica las variables de la expresión, anota el tipo de cada nodo y devuelve el tipo resultante."""
+        types = []
+        for node in postorder(expression):
+            if node.kind == NodeKind.BINARY_OP:
+                right = types.pop()
+                left = types[-1]
+                # Si alguno de los tipos es real el resultado es real; si no, conserva el tipo del operando izquierdo
+                if left == 'real' or right == 'real' or right == 'float':
+                    types[-1] = 'real'
+                node.type = types[-1]
+            else:
+                if node.kind == NodeKind.VARIABLE:
+                    node.type = self.check_variable(node.symbol, node.offset)  # Verifica y obtiene el tipo
+                types.append(node.type)
+        return types[0]
                     
     def add_errors(self, error):
         self.semantic_errors.append(error)
@@ -351,274 +437,299 @@ class SemanticAnalyzer:
         return self.semantic_errors
 
 class Parser:
-    def __init__(self, tokens):
+    # Conjuntos FIRST de cada regla, precalculados sobre los tipos de token enteros
+    FIRST_DECLARACION_VAR = frozenset({TokenKind.PALABRA_RESERVADA_INT, TokenKind.PALABRA_RESERVADA_FLOAT})
+    FIRST_ASIGNACION = frozenset({TokenKind.IDENTIFICADOR})
+    FIRST_IF_ELSE = frozenset({TokenKind.PALABRA_RESERVADA_IF})
+    FIRST_PRINT = frozenset({TokenKind.PALABRA_RESERVADA_PRINT})
+    FIRST_FACTOR = frozenset({TokenKind.ENTERO, TokenKind.REAL, TokenKind.IDENTIFICADOR, TokenKind.PARENTESIS_ABIERTO})
+
+    # Precedencia de los operadores aritméticos (mayor número, mayor precedencia)
+    PRECEDENCIA = {
+        TokenKind.OPERACION_SUMA: 1, TokenKind.OPERACION_RESTA: 1,
+        TokenKind.OPERACION_MULTIPLICACION: 2, TokenKind.OPERACION_DIVISION: 2,
+    }
+    PARENTESIS = 0  # Marca de un '(' en la pila de operadores, menor que cualquier precedencia
+    OPERADORES_RELACION = frozenset({TokenKind.OPERACION_IGUALDAD, TokenKind.OPERACION_RELACION})
+
+    # Tokens que inician una sentencia: el modo pánico reanuda el análisis en ellos
+    INICIO_SENTENCIA = FIRST_DECLARACION_VAR | FIRST_IF_ELSE | FIRST_PRINT
+
+    # Tokens cuya ausencia al final del código se reporta como error
+    CIERRES_OBLIGATORIOS = frozenset({
+        TokenKind.PARENTESIS_ABIERTO, TokenKind.PARENTESIS_CERRADO,
+        TokenKind.LLAVE_ABIERTA, TokenKind.LLAVE_CERRADA,
+    })
+
+    def __init__(self, tokens, tracer=None, arena=False, max_errors=None):
+        tracer = tracer or default_tracer
+        self.trace = tracer.hook('parser')
         self.tokens = tokens
+        self.kinds = tokens.kinds
+        self.symbols = tokens.intern(TokenKind.IDENTIFICADOR)  # ID de cada identificador
         self.current_token = 0
         self.errors = []
-        self.line_number = 1  # Rastrea el número de línea actual
-        self.semantic_analyzer = SemanticAnalyzer()
-        self.declarations = []
-        
-    def get_equivalent(self, word):
-        equivalent = {
-            "entero": "int",
-            "real": "float",
-        }
-        
-        print(f" Equivalencias | recibido = {word}, equivalente = {equivalent.get(word, word)} " )
-        
-        return equivalent.get(word, word)
+        self.max_errors = max_errors  # Con este número de errores se deja de analizar
+        self.panic = False  # Modo pánico: se omiten los errores hasta sincronizar en una sentencia
+        self.depth = 0  # Bloques { } abiertos
+        self.semantic_analyzer = SemanticAnalyzer(tokens.source_map, tracer, tokens.interner)
+        # Con arena=True el árbol se guarda en arreglos (SyntaxArena) en lugar de objetos
+        self.nodes = SyntaxArena(tokens) if arena else TreeBuilder(tokens)
+        self.program = None  # Árbol de sintaxis, disponible después de Programa
+
+    def error(self, message):
+        """Registra un error sintáctico en la posición del token actual y entra en modo pánico.
 
+        En modo pánico los errores se descartan: suelen ser consecuencia del primero. Al llegar a
+        max_errors se registra un error final y se consumen los tokens restantes.
+        """
+        if self.panic:
+            return
+        offset = self.tokens.offset(self.current_token)
+        self.errors.append(Diagnostic(message, offset, self.tokens.source_map))
+        self.panic = True
+
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            remaining = len(self.kinds) - self.current_token
+            self.errors.append(Diagnostic(
+                f"Error SINTACTICO: se alcanzó el máximo de {self.max_errors} errores; no se analizaron los {remaining} tokens restantes",
+                offset, self.tokens.source_map))
+            self.current_token = len(self.kinds)
+
+    def synchronize(self):
+        """Sale del modo pánico descartando tokens hasta un punto seguro para continuar.
+
+        Se detiene después de un ';', antes de una palabra que inicia una sentencia o de una
+        asignación (identificador seguido de '='), o antes de una '}' que cierra un bloque abierto.
+        """
+        kinds = self.kinds
+        start = self.current_token
+        while self.current_token < len(kinds):
+            kind = kinds[self.current_token]
+            if kind == TokenKind.PUNTO_Y_COMA:
+                self.current_token += 1
+                break
+            if kind in self.INICIO_SENTENCIA or (kind == TokenKind.LLAVE_CERRADA and self.depth):
+                break
+            if (kind == TokenKind.IDENTIFICADOR and self.current_token + 1 < len(kinds)
+                    and kinds[self.current_token + 1] == TokenKind.ASIGNACION):
+                break
+            self.current_token += 1
+        self.panic = False
+        if self.trace:
+            self.trace('synchronize', skipped=self.current_token - start)
+        
     def get_next_token(self):
-        if self.current_token < len(self.tokens):
-            token = self.tokens[self.current_token]
+        """Consume el token actual y devuelve su índice, o None si no hay más tokens"""
+        if self.current_token < len(self.kinds):
+            index = self.current_token
             self.current_token += 1
-            # Si el token contiene un salto de línea, actualizamos el número de línea
-            if r'\n' in token[0]:
-                self.line_number += token[0].count(r'\n')
-            return token
+            return index
         else:
             return None
 
-    def peek_token(self):
-        """Retorna el token actual sin avanzar o None si no hay más tokens"""
-        if self.current_token < len(self.tokens):
-            return self.tokens[self.current_token]
+    def peek_kind(self):
+        """Retorna el tipo del token actual sin avanzar o None si no hay más tokens"""
+        if self.current_token < len(self.kinds):
+            return self.kinds[self.current_token]
         return None
 
-    def match(self, expected_token_type):
+    def match(self, expected_kind):
         """Verifica si el token actual coincide con el esperado y avanza"""
-        token = self.peek_token()
+        kind = self.peek_kind()
         
-        print(f'Match: token actual -> {token} == token a comparar { expected_token_type}')
-        if token:  # Verificamos si el token no es None
-            if token[1] == expected_token_type:
-                print('yes')
-                return self.get_next_token()  # Si coincide, avanzamos
+        if self.trace:
+            self.trace('match', current=kind_name(kind) if kind is not None else None, expected=kind_name(expected_kind))
+        if kind is not None:  # Verificamos si hay un token
+            if kind == expected_kind:
+                self.get_next_token()  # Si coincide, avanzamos
+                return True
             else:
-                print('no')
-                print('error a cargar')
-                self.errors.append(f"Error SINTACTICO: se esperaba '{expected_token_type}' pero se encontró '{token[1]}'")
-        elif expected_token_type in ("paréntesis abierto", "paréntesis cerrado", "llave abierta", "llave cerrada", ""):
-            self.errors.append(f"Error SINTACTICO: se esperaba '{expected_token_type}'")
-        #else:
-            # self.errors.append(f"Error sintáctico: se esperaba '{expected_token_type}' pero no se encontró ningún token (final prematuro del código)")
-        return None
+                self.error(f"Error SINTACTICO: se esperaba '{kind_name(expected_kind)}' pero se encontró '{kind_name(kind)}'")
+        elif expected_kind in self.CIERRES_OBLIGATORIOS:
+            self.error(f"Error SINTACTICO: se esperaba '{kind_name(expected_kind)}'")
+        return False
 
     def Programa(self):
-        """Regla inicial de la gramática"""
-        while self.peek_token():  # Mientras haya tokens
-            self.Declaracion()
+        """Regla inicial de la gramática: construye el árbol del programa y lo entrega al análisis semántico"""
+        statements = []
+        while self.peek_kind() is not None:  # Mientras haya tokens
+            self.Declaracion(statements)
         
-        print("--------- Termino de leer todo el programa -----------")
-
-    def Declaracion(self):
-        """Procesa una declaración, ya sea una declaración de variable o asignación"""
-        token = self.peek_token()
-        print(f'Parse: token en declaracion -> {token}')
-        if token and token[1] == 'palabra reservada int' or token[1] == 'palabra reservada float':
-            print(f'entro a palabra reservada int o float')
-            self.DeclaracionVar()
-            print(f'Termino de entrar a palabra reservada int o float')
-        elif token and token[1] == 'identificador':
-            print(f'entro a identificador')
-            self.Asignacion()
-        elif token and token[1] == 'palabra reservada if':
-            print(f'entro a palabra reservada')
-            self.IfElse()
-        elif token and token[1] == 'palabra reservada print':
-            print(f'entro a palabra reservada print')
-            self.printStmt()
+        self.program = self.nodes.program(statements)
+        self.semantic_analyzer.analyze(self.program)
+        if self.trace:
+            self.trace('end', tokens=self.current_token, errors=len(self.errors))
+        return self.program
+
+    def Declaracion(self, statements):
+        """Procesa una declaración, ya sea una declaración de variable o asignación, y agrega su nodo a statements"""
+        if self.panic:
+            self.synchronize()
+        kind = self.peek_kind()
+        if kind is None or (kind == TokenKind.LLAVE_CERRADA and self.depth):
+            return
+        if self.trace:
+            self.trace('declaracion', token=kind_name(kind))
+        if kind in self.FIRST_DECLARACION_VAR:
+            statement = self.DeclaracionVar()
+        elif kind in self.FIRST_ASIGNACION:
+            statement = self.Asignacion()
+        elif kind in self.FIRST_IF_ELSE:
+            statement = self.IfElse()
+        elif kind in self.FIRST_PRINT:
+            statement = self.printStmt()
         else:
-            print(f'entro a error')
-            print(f'entro a cargar')
-            self.errors.append(f"Error SINTACTICO: declaración inválida")
-            tipo = self.get_next_token()
-        
-        print(f'termino')
+            self.error("Error SINTACTICO: declaración inválida")
+            self.get_next_token()
+            statement = None
+
+        if statement is not None:
+            statements.append(statement)
         
-    
     def DeclaracionVar(self):
         """Procesa una declaración de variable"""
-        tipo = self.get_next_token()  # tipo: int o float
-        ident_token = self.peek_token()
+        keyword = self.get_next_token()  # tipo: int o float
+        statement = None
                 
-        if ident_token[1] == 'identificador':
-            var_name = ident_token[0]
-            self.get_next_token()  # Consume el identificador
-        
-            expr_type = None
+        if self.peek_kind() == TokenKind.IDENTIFICADOR:
+            ident = self.get_next_token()  # Consume el identificador
+            value = None
             
-            if self.peek_token() and self.peek_token()[1] == 'asignación':
+            if self.peek_kind() == TokenKind.ASIGNACION:
                 self.get_next_token()  # Consumes el token '='
-                expr_type = self.Expresion()
-                
-                print(f"Tipo expresion DeclaracionVar -> {expr_type}")
+                value = self.Expresion()
             
-            print(f"DeclaracionVar semantic_error -> {self.semantic_analyzer.get_errors()}")
-                            
-            self.semantic_analyzer.declare_variable(var_name, self.get_equivalent(expr_type))
+            statement = self.nodes.declaration(keyword, ident, value)
         
-        if not self.match('punto y coma'):
-            self.errors.append(f"Error SINTACTICO: falta ';' al final de la declaración")
+        if not self.match(TokenKind.PUNTO_Y_COMA):
+            self.error("Error SINTACTICO: falta ';' al final de la declaración")
+        return statement
     
     def Asignacion(self):
         """Procesa una asignación a una variable"""
-        token = self.peek_token()
-        
-        if token and token[1] == 'identificador':
-            var_name = token[0]
-            print(self.semantic_analyzer.symbol_table)
-            self.semantic_analyzer.check_variable(var_name)  # Verifica que la variable esté declarada
-            self.get_next_token()  # Consume el identificador
-        else:
-            self.errors.append(f"Error SINTACTICO: el lado izquierdo de una asignación debe ser un identificador, pero se encontró '{token[1]}'")
-            self.get_next_token()  # Avanzar para evitar que se quede atascado
+        ident = self.get_next_token()  # Consume el identificador
+        value = None
 
-        self.match('asignación')  # =
-        if self.peek_token() and self.peek_token()[1] != 'punto y coma':
-            expr_type = self.Expresion()  # Procesa la expresión solo si hay algo diferente de un ';'
-            
-            self.semantic_analyzer.declarations.append({
-                'type': 'assignment',
-                'name': var_name,
-                'expression_type': self.get_equivalent(expr_type)  # Tipo de la expresión asignada
-            })
-            
-            self.semantic_analyzer.check_assignment(var_name, self.get_equivalent(expr_type))
-            
+        self.match(TokenKind.ASIGNACION)  # =
+        kind = self.peek_kind()
+        if kind is not None and kind != TokenKind.PUNTO_Y_COMA:
+            value = self.Expresion()  # Procesa la expresión solo si hay algo diferente de un ';'
         else:
-            self.errors.append(f"Error SINTACTICO: se esperaba una expresión después de '='")
-        self.match('punto y coma')
+            self.error("Error SINTACTICO: se esperaba una expresión después de '='")
+        self.match(TokenKind.PUNTO_Y_COMA)
+        return self.nodes.assignment(ident, value)
 
     def Expresion(self):
-        """Procesa una expresión aritmética o lógica y devuelve el tipo resultante."""
-        term_type = self.Termino()  # Obtiene el tipo del término inicial
-        expr_prime_type = self.ExpresionPrime()  # Obtiene el tipo de la parte restante de la expresión
+        """Procesa una expresión aritmética y devuelve su nodo.
 
-        # Determina el tipo final de la expresión
-        if term_type == 'real' or expr_prime_type == 'real':
-            return 'real'  # Si alguno de los tipos es real, la expresión es de tipo real
-        
-        
-        return term_type  # De lo contrario, conserva el tipo original
-
-    def ExpresionPrime(self):
-        """Procesa el resto de una expresión y devuelve el tipo resultante, soportando + o -."""
-        token = self.peek_token()
-        if token and token[1] in ['operación suma', 'operación resta', 'operación multiplicación', 'operación división']:
-            self.get_next_token()  # Consume el operador
-            term_type = self.Termino()  # Obtiene el tipo del siguiente término
-            expr_prime_type = self.ExpresionPrime()  # Recursivamente obtiene el tipo de ExpresionPrime
-
-            # Si cualquier parte es de tipo real, el resultado es real
-            if term_type == 'real' or expr_prime_type == 'real' or self.get_equivalent(term_type) == 'float' or self.get_equivalent(expr_prime_type) == 'float':
-                return 'real'
-            return term_type  # Si ambos son enteros, el resultado es entero
-        return None
+        Precedence climbing iterativo: los operandos y operadores pendientes se guardan en pilas
+        y '(' se apila como una marca, así que ni la longitud ni el anidamiento de la expresión
+        consumen la pila de Python. El árbol es el de la gramática Expresion -> Termino
+        (('+' | '-') Termino)*, Termino -> Factor (('*' | '/') Factor)*, asociativa por la izquierda.
+        """
+        precedence = self.PRECEDENCIA
+        operands = []  # Nodos de los operandos pendientes
+        levels = []  # Precedencias de los operadores pendientes, o PARENTESIS para un '(' abierto
+        operators = []  # Índice del token de cada operador pendiente
 
-    def Termino(self):
-        """Procesa un término en la expresión (maneja multiplicación o división)"""
-        factor_type = self.Factor()  # Obtiene el tipo del factor inicial
-        term_prime_type = self.TerminoPrime()  # Obtiene el tipo de la parte restante del término
+        while True:
+            # Operando: primero los '(' que lo abren
+            while self.peek_kind() == TokenKind.PARENTESIS_ABIERTO:
+                self.get_next_token()  # Consume '('
+                levels.append(self.PARENTESIS)
+                operators.append(None)
+            operands.append(self.Factor())
 
-        # Si alguno de los factores es real, el término es de tipo real
-        if factor_type == 'real' or term_prime_type == 'real':
-            return 'real'
-        
-        return factor_type
-
-    def TerminoPrime(self):
-        """Procesa el resto de un término, soportando * o /"""
-        token = self.peek_token()
-        if token and token[1] in ['operación multiplicación', 'operación division']:
-            op = token[1]  # Captura el operador actual
-            self.get_next_token()  # Consumimos el token * o /
-            factor_type = self.Factor()  # Obtiene el tipo del siguiente factor
-            term_prime_type = self.TerminoPrime()  # Recursivamente obtiene el tipo de TerminoPrime
-            
-            # Si cualquiera es de tipo real, el resultado es real
-            if factor_type == 'real' or term_prime_type == 'real' or self.get_equivalent(factor_type) == "float" or self.get_equivalent(term_prime_type) == "float":
-                return 'real'
-            
-            return factor_type  # Si ambos son enteros, el resultado es entero
-        return None  # No hay más operaciones, así que no afecta el tipo
+            # Operadores y cierres hasta encontrar el siguiente operando o el final de la expresión
+            while True:
+                level = precedence.get(self.peek_kind())
+                if level is not None:
+                    while levels and levels[-1] >= level:
+                        self.reduce(operands, levels, operators)
+                    levels.append(level)
+                    operators.append(self.get_next_token())  # Consume el operador
+                    break
+
+                while levels and levels[-1] != self.PARENTESIS:
+                    self.reduce(operands, levels, operators)
+                if not levels:
+                    return operands[0]
+                levels.pop()
+                operators.pop()
+                self.match(TokenKind.PARENTESIS_CERRADO)
+
+    def reduce(self, operands, levels, operators):
+        """Combina los dos últimos operandos con el último operador pendiente"""
+        levels.pop()
+        index = operators.pop()
+        right = operands.pop()
+        operands[-1] = self.nodes.binary_op(index, operands[-1], right)
 
     def Factor(self):
-        """Procesa un factor: número, identificador o expresión entre paréntesis"""
-        token = self.peek_token()
-
-        if token:
-            if token[1] == 'entero':
-                self.get_next_token()  # Consume el número entero
-                return 'int'
-            elif token[1] == 'real':
-                self.get_next_token()  # Consume el número real
-                return 'float'
-            elif token[1] == 'identificador':
-                var_name = token[0]
-                var_type = self.semantic_analyzer.check_variable(var_name)  # Verifica y obtiene el tipo
-                
-                print(f" Factor | var_name = {var_name}, var_type = {var_type} " )
-                self.get_next_token()  # Consume el identificador
-                return var_type  # Retorna el tipo de la variable desde la tabla de símbolos
-            elif token[1] == 'paréntesis abierto':
-                self.get_next_token()  # Consume '('
-                expr_type = self.Expresion()  # Llama recursivamente a Expresion
-                self.match('paréntesis cerrado')
-                return expr_type
-        return None
+        """Procesa un operando: número o identificador (los paréntesis los maneja Expresion)"""
+        kind = self.peek_kind()
+
+        if kind == TokenKind.ENTERO or kind == TokenKind.REAL:
+            return self.nodes.number(self.get_next_token())  # Consume el número
+        elif kind == TokenKind.IDENTIFICADOR:
+            return self.nodes.variable(self.get_next_token())  # Consume el identificador
+        return self.nodes.missing(self.current_token)
 
     def IfElse(self):
         """Procesa la estructura if-else"""
-        print(f'Procesando if')
-        
-        
-        self.match('palabra reservada if')
-        print("paso if")
-        self.match('paréntesis abierto')
-        print("paso pa")
-        
-        print('Entro prueba expresion relacional')
-        self.ExpresionRelacional()
-        print('paso prueba expresion relacional')
-        
-        self.match('paréntesis cerrado')
-        print("paso pc")
-        self.match('llave abierta')
-        print("paso la")
+        token = self.current_token
+        self.match(TokenKind.PALABRA_RESERVADA_IF)
+        self.match(TokenKind.PARENTESIS_ABIERTO)
+        condition = self.ExpresionRelacional()
+        self.match(TokenKind.PARENTESIS_CERRADO)
+        self.match(TokenKind.LLAVE_ABIERTA)
         
-        
-        while self.peek_token() and self.peek_token()[1] != 'llave cerrada':
-            self.Declaracion()
-        self.match('llave cerrada')
-        token = self.peek_token()
-        if token and token[1] == 'palabra reservada else':
+        then_body = self.Bloque()
+
+        else_body = None
+        if self.peek_kind() == TokenKind.PALABRA_RESERVADA_ELSE:
             self.get_next_token()  # Consumimos else
-            self.match('llave abierta')
-            while self.peek_token() and self.peek_token()[1] != 'llave cerrada':
-                self.Declaracion()
-            self.match('llave cerrada')
+            self.match(TokenKind.LLAVE_ABIERTA)
+            else_body = self.Bloque()
+
+        return self.nodes.if_else(token, condition, then_body, else_body)
+
+    def Bloque(self):
+        """Procesa las sentencias de un bloque hasta su '}' y devuelve sus nodos"""
+        statements = []
+        self.depth += 1
+        while self.peek_kind() not in (None, TokenKind.LLAVE_CERRADA):
+            self.Declaracion(statements)
+        self.depth -= 1
+        self.match(TokenKind.LLAVE_CERRADA)
+        return statements
 
     def ExpresionRelacional(self):
         """Procesa una expresión relacional (por ejemplo, ==)"""
-        self.Expresion()  # Procesa el lado izquierdo
+        left = self.Expresion()  # Procesa el lado izquierdo
         
-        token = self.peek_token()  # Vemos el operador sin avanzar
-        if token and (token[1] == 'operación igualdad' or token[1] == 'operación relación'):
-            self.get_next_token()  # Consumimos el operador de relación o igualdad
+        operator = None
+        token = self.current_token
+        if self.peek_kind() in self.OPERADORES_RELACION:
+            operator = self.get_next_token()  # Consumimos el operador de relación o igualdad
         else:
-            self.errors.append(f"Error SINTACTICO: se esperaba un operador de relación o igualdad'")
+            self.error("Error SINTACTICO: se esperaba un operador de relación o igualdad'")
         
-        self.Expresion()  # Procesa el lado derecho
+        right = self.Expresion()  # Procesa el lado derecho
+        return self.nodes.comparison(token, operator, left, right)
 
     def printStmt(self):
         """Procesa la declaración print"""
-        self.match('palabra reservada print')
-        self.match('paréntesis abierto')
-        self.Expresion()
-        self.match('paréntesis cerrado')
-        self.match('punto y coma')
+        token = self.current_token
+        self.match(TokenKind.PALABRA_RESERVADA_PRINT)
+        self.match(TokenKind.PARENTESIS_ABIERTO)
+        first = self.current_token
+        value = self.Expresion()
+        last = self.current_token
+        self.match(TokenKind.PARENTESIS_CERRADO)
+        self.match(TokenKind.PUNTO_Y_COMA)
+        return self.nodes.print(token, value, first, last)
 
     def get_errors(self):
         """Devuelve la lista de errores"""
@@ -628,114 +739,338 @@ class Parser:
         """Devuelve los errores semánticos encontrados."""
         return self.semantic_analyzer.get_errors()
 
-tokens = [
-    (r'\bint\b',              'palabra reservada int', 23),
-    (r'\bfloat\b',            'palabra reservada float', 24),
-    (r'\bprint\b',            'palabra reservada print', 24),
-    (r'\bif\b',               'palabra reservada if', 19),
-    (r'\belse\b',             'palabra reservada else', 22),
-    (r'\bint\b|\bfloat\b|\bvoid\b', 'tipo', 4),
-    (r'[ \n\t]+',             None, None),                      # Para ignorar los espacios en blanco
-    (r'[A-Za-z_][A-Za-z0-9_]*','identificador', 0),
-    (r'\d+\.\d+',             'real', 2),
-    (r'\d+',                  'entero', 1),
-    (r'\".*?\"',              'cadena', 3),
-    (r'\+',                   'operación suma', 5),
-    (r'-',                    'operación resta', 5),
-    (r'\*',                   'operación multiplicación', 6),
-    (r'/',                    'operación división', 6),
-    (r'<|<=|>|>=',            'operación relación', 7),
-    (r'\|\|',                 'operación or', 8),
-    (r'&&',                   'operación and', 9),
-    (r'!',                    'operación not', 10),
-    (r'==|!=',                'operación igualdad', 11),
-    (r';',                    'punto y coma', 12),
-    (r',',                    'coma', 13),
-    (r'\(',                   'paréntesis abierto', 14),
-    (r'\)',                   'paréntesis cerrado', 15),
-    (r'\{',                   'llave abierta', 16),
-    (r'\}',                   'llave cerrada', 17),
-    (r'=',                    'asignación', 18),
-]
-
 class Compiler:
-    parseData = None
-    semanticErrors = None
-    declarations = []
-    
-    def __init__(self) -> None:
-        pass
+    """Fases del compilador como funciones sin estado; compile_source las ejecuta en orden (ver Compilation)."""
     
     @classmethod
-    def lexicalAnalyser(cls, code):
-        # Compilar los patrones de tokens en una sola expresión regular
-        token_regex = '|'.join(f'(?P<TOKEN_{i}>{pattern})' for i, (pattern, _, _) in enumerate(tokens))
-        compiled_re = re.compile(token_regex)
-        
-        print(token_regex)
-        
-        pos = 0
-        line_num = 1
-        tokensFound = []
-        errors = []
-        
-        print(f'Tamanio del codigo -> {len(code)} \n\n')
-
-        while pos < len(code):
-            match = compiled_re.match(code, pos)
-            print(f'Esto es el match -> {match}')
-            print(f'Pos inicial -> {pos} \n')
-            if match:
-                for i, (_, tokenType, numType) in enumerate(tokens):
-                    lexeme = match.group(f'TOKEN_{i}')
-                    print(f'Esto es el lexema -> {lexeme}')
-                    print(f'Esto es el tipo de token -> {tokenType}')
-                    print(f'Esto es el esto es el numero de tipo -> {numType}')
-                    if lexeme:
-                        print('Paso la validacion del lexema \n')
-                        if tokenType:
-                            print('Paso la validacion del tipo de token \n')
-                            tokensFound.append((lexeme, tokenType, numType))
-                        pos = match.end()  # Avanzamos a la siguiente posición después del token
-                        print(f'Pos if -> {pos} \n')
-                        line_num += lexeme.count('\n')  # Actualizamos el número de línea si hay saltos de línea
-                        break
-            else:
-                error_message = f"Error LEXICO: token no reconosido '{code[pos]}'"
-                errors.append(error_message)
-                pos += 1  # Avanzamos la posición para evitar quedarse atrapado en un ciclo
-                print(f'Pos else -> {pos} \n')
-                if code[pos-1] == '\n':
-                    line_num += 1
-            print(f'Pos final -> {pos} \n')
+    def lexicalAnalyser(cls, code, engine='regex', profile='base', max_errors=None, workers=1):
+        trace = default_tracer.hook('lexer', TraceLevel.PHASE)
+        if trace:
+            trace('start', engine=engine, profile=profile, workers=workers, characters=len(code))
+
+        # Con workers > 1 los códigos grandes se analizan por fragmentos en varios procesos
+        if workers > 1:
+            tokensFound, errors = get_parallel_lexer(workers, engine, profile).tokenize(code, max_errors)
+        else:
+            # Los motores se construyen una sola vez (el DFA además queda guardado en disco)
+            tokensFound, errors = get_lexer(engine, profile).tokenize(code, max_errors)
+        # Tabla de nombres de la compilación: cada identificador recibe un ID que usan las demás fases
+        tokensFound.intern(TokenKind.IDENTIFICADOR)
 
+        if trace:
+            trace('end', tokens=len(tokensFound), errors=len(errors))
+            cls.trace_tokens(tokensFound)
         return tokensFound, errors
     
     @classmethod
-    def parse(cls, tokensFound):        
-        parse = Parser(tokensFound)
-        parse.Programa()
-        
-        cls.parseData = parse
-        cls.semanticErrors = parse.semantic_analyzer.get_errors()
+    def trace_tokens(cls, tokensFound):
+        """Emite un evento por token cuando la traza está en nivel DEBUG."""
+        trace = default_tracer.hook('lexer')
+        if trace:
+            for i, (lexeme, tokenType, numType) in enumerate(tokensFound):
+                line, column = tokensFound.location(i)
+                trace('token', lexeme=lexeme, type=tokenType, num_type=numType, line=line, column=column)
+    
+    @classmethod
+    def lexicalAnalyseFile(cls, path, profile='base', max_errors=None):
+        """Analiza un archivo sin cargarlo como str: el motor regex recorre un mmap del archivo y los tokens
+        quedan como desplazamientos dentro de él (el mapeo permanece abierto mientras se use el TokenBuffer).
+        """
+        return get_lexer('regex', profile).tokenize(CodeFile.map(path), max_errors)
+    
+    @classmethod
+    def iter_tokens(cls, source, errors=None, chunk_size=65536, engine='regex', profile='base', max_errors=None):
+        """Genera los tokens de source a medida que se leen; acepta un texto, un archivo abierto o un iterable de fragmentos (por ejemplo CodeFile.iter_chunks).
+
+        Los errores léxicos se agregan a la lista errors si se proporciona; con max_errors la
+        lectura se detiene al alcanzar ese número de errores. Un archivo abierto en modo binario
+        produce TypeError al leer el primer fragmento.
+        """
+        if errors is None:
+            errors = []
+
+        if isinstance(source, str):
+            chunks = (source,)
+        elif hasattr(source, 'read'):
+            # El final del archivo es '' en modo texto y b'' en binario: se toma del primer fragmento
+            first = source.read(chunk_size)
+            chunks = chain((first,), iter(lambda: source.read(chunk_size), first[:0])) if first else ()
+        else:
+            chunks = source
+
+        return get_lexer(engine, profile).iter_chunks(chunks, errors, max_errors)
+    
+    @classmethod
+    def parse(cls, tokensFound, arena=False, max_errors=None, engine='manual', incremental=None):
+        """Analiza los tokens y construye el árbol; con arena=True el árbol se guarda en arreglos (SyntaxArena),
+        recomendable para programas con millones de sentencias. Con max_errors el análisis se detiene al
+        alcanzar ese número de errores sintácticos.
+
+        engine elige el analizador: 'manual' (Parser) o 'll1' (LLParser, dirigido por la tabla
+        generada de grammar.ebnf); ambos producen el mismo árbol y los mismos errores.
+
+        incremental es un IncrementalParser; con él solo se analizan de nuevo las sentencias que
+        cambiaron desde la llamada anterior (tokensFound debe venir de su IncrementalLexer).
+
+        Devuelve el analizador: program es el árbol, get_errors() los errores sintácticos y
+        get_semantic_errors() los semánticos.
+        """
+        trace = default_tracer.hook('parser', TraceLevel.PHASE)
+        if trace:
+            trace('start', tokens=len(tokensFound))
+
+        if incremental is not None:
+            parse = incremental.parse(tokensFound, max_errors)
+        else:
+            if engine == 'manual':
+                parse = Parser(tokensFound, arena=arena, max_errors=max_errors)
+            elif engine == 'll1':
+                from .ll_parser import LLParser
+                parse = LLParser(tokensFound, arena=arena, max_errors=max_errors)
+            else:
+                raise ValueError(f"Motor sintáctico desconocido: '{engine}'")
+            parse.Programa()
 
+        if trace:
+            trace('end', errors=len(parse.get_errors()), semantic_errors=len(parse.get_semantic_errors()))
         
-        return parse.get_errors()
+        return parse
     
     @classmethod
-    def semanticAnalyser(cls):
-        return cls.semanticErrors
+    def compileCode(cls, code, cache=None, **options):
+        """Ejecuta todas las fases sobre code sin interfaz gráfica y devuelve el CompilationResult.
+
+        options son los campos de CompilationOptions; cache es una CompilationCache o DiskCompilationCache.
+        """
+        return compile_source(code, CompilationOptions(**options), cache)
+    
+    @classmethod
+    def compileFile(cls, path, cache=None, **options):
+        """Compila el archivo de path con compileCode; pensado para scripts que compilan muchos archivos."""
+        with open(path, encoding='utf-8') as file:
+            return cls.compileCode(file.read(), cache, **options)
     
     @classmethod
-    def MIPSGenerate(cls, code):
-        MIPSCode = MIPSCodeGenerator(code)
+    def MIPSGenerate(cls, program):
+        """Genera MIPS a partir del árbol."""
+        MIPSCode = MIPSCodeGenerator(program)
+        
+        trace = default_tracer.hook('mips', TraceLevel.PHASE)
+        if trace:
+            trace('end', instructions=len(MIPSCode.mips_code))
         
         return MIPSCode.getResult()
     
     @classmethod
-    def CodeResultGenerate(cls, code):
-        ResultCode = Interpreter(code)
+    def CodeResultGenerate(cls, program):
+        """Ejecuta el árbol y devuelve su salida."""
+        ResultCode = Interpreter(program)
+        
+        trace = default_tracer.hook('interpreter', TraceLevel.PHASE)
+        if trace:
+            trace('end', outputs=len(ResultCode.output))
         
         return ResultCode.getResult()
-    
-    
\ No newline at end of file
+
+class CompilationOptions:
+    """Opciones de una compilación.
+
+    engine es el motor léxico (ver get_lexer) y parser el sintáctico (ver Compiler.parse); todos
+    los motores producen el mismo resultado, así que key, la parte de las opciones que lo
+    determina y que usan las cachés, no los incluye. arena sí: decide si program es un árbol de
+    objetos o un SyntaxArena.
+    """
+    __slots__ = ('profile', 'engine', 'parser', 'arena', 'max_lexical_errors', 'max_syntax_errors', 'workers')
+
+    def __init__(self, profile='base', engine='regex', parser='manual', arena=False,
+                 max_lexical_errors=None, max_syntax_errors=None, workers=1):
+        self.profile = profile
+        self.engine = engine
+        self.parser = parser
+        self.arena = arena
+        self.max_lexical_errors = max_lexical_errors
+        self.max_syntax_errors = max_syntax_errors
+        self.workers = workers
+
+    @property
+    def key(self):
+        return (self.profile, self.arena, self.max_lexical_errors, self.max_syntax_errors)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'CompilationOptions({fields})'
+
+class CompilationResult:
+    """Resultado de cada fase de una compilación; las fases que no se ejecutaron quedan en None.
+
+    timings guarda los segundos de cada fase ejecutada ('lexer', 'parser' con el análisis
+    semántico incluido, 'mips' e 'interpreter'). Un resultado de la caché conserva los tiempos de
+    la compilación que lo produjo. Se puede enviar a otro proceso o guardar en disco: el árbol se
+    serializa aplanado (ver flatten) y se reconstruye la primera vez que se pide program.
+
+    Si la ejecución falla (división entre cero, variable sin valor) runtime_errors tiene el error,
+    mips conserva el código generado y output queda en None.
+    """
+    __slots__ = ('source', 'tokens', 'lexical_errors', '_program', '_records', 'syntax_errors',
+                 'semantic_errors', 'mips', 'output', 'runtime_errors', 'timings')
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = None
+        self.lexical_errors = None
+        self._program = None
+        self._records = None  # Árbol aplanado con flatten, pendiente de reconstruir
+        self.syntax_errors = None
+        self.semantic_errors = None
+        self.mips = None
+        self.output = None
+        self.runtime_errors = None
+        self.timings = {}
+
+    @property
+    def program(self):
+        if self._records is not None:
+            self._program = unflatten(self._records, self.tokens.interner)
+            self._records = None
+        return self._program
+
+    @program.setter
+    def program(self, program):
+        self._program = program
+        self._records = None
+
+    @property
+    def diagnostics(self):
+        """Errores de todas las fases en el orden en que se detectaron."""
+        phases = (self.lexical_errors, self.syntax_errors, self.semantic_errors, self.runtime_errors)
+        return [error for errors in phases if errors for error in errors]
+
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        if self._program is not None:
+            state['_program'] = None
+            state['_records'] = flatten(self._program)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+class Compilation:
+    """Ejecuta las fases del compilador sobre un código y guarda su resultado en result.
+
+    Todo el estado de la compilación (tokens, tabla de nombres, árbol, errores y salidas) pertenece
+    a la instancia, así que se pueden compilar varios documentos a la vez en hilos o procesos; lo
+    único compartido son los motores ya construidos (get_lexer, get_grammar), que solo se leen.
+
+    Las fases se ejecutan en orden con run, o una por una con lex, parse y generate; cada fase se
+    ejecuta solo si la anterior no tuvo errores. compile_source es la forma corta de Compilation(...).run().
+    """
+
+    def __init__(self, source, options=None):
+        self.source = source
+        self.options = options or CompilationOptions()
+        self.result = CompilationResult(source)
+        self.cacheable = True  # False si el árbol tiene desplazamientos de un texto anterior (ver IncrementalParser.exact)
+
+    def run(self, cache=None, lexer=None, incremental=None):
+        """Ejecuta todas las fases y devuelve el CompilationResult.
+
+        Si cache (CompilationCache o DiskCompilationCache) ya tiene el resultado de este código con
+        estas opciones se devuelve sin ejecutar ninguna fase; si no, se guarda al terminar, salvo que
+        el árbol incremental no sea exacto. lexer e incremental son el IncrementalLexer y el
+        IncrementalParser del editor, si los hay; incremental no se usa con options.arena porque
+        solo construye árboles de objetos.
+        """
+        if cache is not None:
+            cached = cache.get(self.source, self.options.key)
+            if cached is not None:
+                if self.options.arena and cached.program is not None and not isinstance(cached.program, Cursor):
+                    # La caché en disco reconstruye el árbol con objetos; se pidió un SyntaxArena
+                    cached.program = Compiler.parse(cached.tokens, True, self.options.max_syntax_errors).program
+                self.result = cached
+                return cached
+
+        result = self.result
+        if not self.lex(lexer) and not self.parse(incremental) and not result.semantic_errors and self.source.strip():
+            self.generate()
+
+        if cache is not None and self.cacheable:
+            cache.put(self.source, self.options.key, result)
+        return result
+
+    def lex(self, lexer=None):
+        """Análisis léxico; con lexer (IncrementalLexer) solo se analiza lo que cambió desde su última edición.
+
+        lexer debe usar el perfil de las opciones (ValueError si no): su resultado se guarda con esa clave.
+        """
+        options, result = self.options, self.result
+        start = time.perf_counter()
+        if lexer is not None:
+            if lexer.lexer.profile.name != options.profile:
+                # El resultado se guarda en la caché con la clave del perfil de las opciones
+                raise ValueError(f"El lexer incremental usa el perfil '{lexer.lexer.profile.name}' y las opciones piden '{options.profile}'")
+            lexer.sync(self.source)  # Si perdió la sincronía con el texto lo analiza todo de nuevo
+            result.tokens, result.lexical_errors = lexer.snapshot(options.max_lexical_errors)
+        else:
+            result.tokens, result.lexical_errors = Compiler.lexicalAnalyser(
+                self.source, options.engine, options.profile, options.max_lexical_errors, options.workers)
+        result.timings['lexer'] = time.perf_counter() - start
+        return result.lexical_errors
+
+    def parse(self, incremental=None):
+        """Análisis sintáctico y semántico de los tokens; devuelve los errores sintácticos."""
+        options, result = self.options, self.result
+        start = time.perf_counter()
+        if options.arena:
+            incremental = None  # IncrementalParser solo construye árboles de objetos
+        parse = Compiler.parse(result.tokens, options.arena, options.max_syntax_errors, options.parser, incremental)
+        self.cacheable = parse is not incremental or incremental.exact
+        result.program = parse.program
+        result.syntax_errors = parse.get_errors()
+        if not result.syntax_errors:
+            result.semantic_errors = parse.get_semantic_errors()
+        result.timings['parser'] = time.perf_counter() - start
+        return result.syntax_errors
+
+    def generate(self):
+        """Genera el MIPS y ejecuta el programa; devuelve su salida, o None si la ejecución falló (ver runtime_errors)."""
+        result = self.result
+        start = time.perf_counter()
+        result.mips = Compiler.MIPSGenerate(result.program)
+        middle = time.perf_counter()
+        try:
+            result.output = Compiler.CodeResultGenerate(result.program)
+            result.runtime_errors = []
+        except ValueError as error:
+            result.output = None
+            result.runtime_errors = [self.runtime_error(error)]
+        result.timings['mips'] = middle - start
+        result.timings['interpreter'] = time.perf_counter() - middle
+        return result.output
+
+    def runtime_error(self, error):
+        """Diagnostic del error de ejecución error.
+
+        Los nodos reutilizados de un árbol incremental que no es exacto tienen desplazamientos de un
+        texto anterior: en ese caso se analiza todo el código y se ejecuta de nuevo para ubicar el
+        error en el texto actual. Solo ocurre al fallar la ejecución, y el resultado queda exacto.
+        """
+        result = self.result
+        if not self.cacheable:
+            options = self.options
+            result.program = Compiler.parse(result.tokens, options.arena, options.max_syntax_errors, options.parser).program
+            self.cacheable = True
+            try:
+                Compiler.CodeResultGenerate(result.program)
+            except ValueError as exact:
+                error = exact
+        return Diagnostic(str(error), getattr(error, 'offset', None), result.tokens.source_map)
+
+def compile_source(source, options=None, cache=None, lexer=None, incremental=None):
+    """Compila source con options (CompilationOptions) y devuelve su CompilationResult.
+
+    Punto de entrada único del compilador: ejecuta las fases en orden sobre los mismos tokens y el
+    mismo árbol. cache, lexer e incremental son los de Compilation.run.
+    """
+    return Compilation(source, options).run(cache, lexer, incremental)
@@ -0,0 +1,504 @@
+import hashlib
+import os
+from array import array
+
+from .cache_format import pack, unpack
+from .lexer import Lexer, base_profile
+
+# Versión del formato del autómata guardado en disco; cambiarla invalida la caché
+DFA_FORMAT_VERSION = 3
+
+NO_RULE = 255  # Estado que no acepta ninguna regla
+
+# Fuera de ASCII los caracteres solo se distinguen por lo que importa a \d, \w y '.'
+_OTHER_DIGIT = 'digito'
+_OTHER_WORD = 'palabra'
+_OTHER = 'otro'
+_OTHER_TAGS = frozenset({_OTHER_DIGIT, _OTHER_WORD, _OTHER})
+
+# Conjuntos de caracteres: (códigos ASCII incluidos, clases no ASCII incluidas)
+_ASCII = frozenset(range(128))
+_NONE = frozenset()
+DIGIT_SET = (frozenset(range(ord('0'), ord('9') + 1)), frozenset({_OTHER_DIGIT}))
+WORD_SET = (frozenset(c for c in range(128) if chr(c).isalnum() or chr(c) == '_'), frozenset({_OTHER_DIGIT, _OTHER_WORD}))
+ANY_SET = (_ASCII - {ord('\n')}, _OTHER_TAGS)
+
+_ESCAPED_SETS = {'d': DIGIT_SET, 'w': WORD_SET}
+_ESCAPED_CHARS = {'n': '\n', 't': '\t', 'r': '\r'}
+
+def default_cache_directory():
+    """Directorio donde se guardan los artefactos generados (COMPILADOR_CACHE_DIR lo reemplaza)."""
+    return os.environ.get('COMPILADOR_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'compilador-ssptl2')
+
+def _literal(char):
+    if ord(char) > 127:
+        raise ValueError(f"Solo se admiten caracteres ASCII en los patrones: '{char}'")
+    return (frozenset({ord(char)}), _NONE)
+
+def _union(sets):
+    return (frozenset().union(*(s[0] for s in sets)), frozenset().union(*(s[1] for s in sets)))
+
+class _PatternParser:
+    """Analizador del subconjunto de expresiones regulares que usa la tabla de tokens.
+
+    Produce un árbol de tuplas: ('set', conjunto), ('cat', [...]), ('alt', [...]),
+    ('star' | 'plus' | 'opt', nodo, perezoso) y ('boundary',) para \\b.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, message):
+        raise ValueError(f"{message} en el patrón {self.pattern!r} (posición {self.pos})")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else ''
+
+    def next(self):
+        char = self.peek()
+        if not char:
+            self.error("Fin inesperado")
+        self.pos += 1
+        return char
+
+    def parse(self):
+        node = self.alternation()
+        if self.pos != len(self.pattern):
+            self.error("Paréntesis sin abrir")
+        return node
+
+    def alternation(self):
+        items = [self.concatenation()]
+        while self.peek() == '|':
+            self.pos += 1
+            items.append(self.concatenation())
+        return items[0] if len(items) == 1 else ('alt', items)
+
+    def concatenation(self):
+        items = []
+        while self.peek() not in ('', '|', ')'):
+            items.append(self.repetition())
+        return ('cat', items)
+
+    def repetition(self):
+        node = self.atom()
+        while self.peek() in ('*', '+', '?'):
+            operator = self.next()
+            lazy = self.peek() == '?'
+            if lazy:
+                self.pos += 1
+            node = ({'*': 'star', '+': 'plus', '?': 'opt'}[operator], node, lazy)
+        return node
+
+    def atom(self):
+        char = self.next()
+        if char == '(':
+            if self.pattern.startswith('?:', self.pos):
+                self.pos += 2
+            elif self.peek() == '?':
+                self.error("Grupo no soportado")
+            node = self.alternation()
+            if self.next() != ')':
+                self.error("Falta ')'")
+            return node
+        if char == '[':
+            return ('set', self.char_class())
+        if char == '.':
+            return ('set', ANY_SET)
+        if char == '\\':
+            escaped = self.next()
+            if escaped == 'b':
+                return ('boundary',)
+            return ('set', self.escape(escaped))
+        if char in '*+?{^$':
+            self.error(f"Operador '{char}' no soportado")
+        return ('set', _literal(char))
+
+    def escape(self, char):
+        if char in _ESCAPED_SETS:
+            return _ESCAPED_SETS[char]
+        if char in _ESCAPED_CHARS:
+            return _literal(_ESCAPED_CHARS[char])
+        if char.isalnum():
+            self.error(f"Secuencia '\\{char}' no soportada")
+        return _literal(char)
+
+    def char_class(self):
+        negate = self.peek() == '^'
+        if negate:
+            self.pos += 1
+
+        members = []
+        first = True
+        while first or self.peek() != ']':
+            first = False
+            char = self.next()
+            if char == '\\':
+                escaped = self.next()
+                if escaped in _ESCAPED_SETS:
+                    members.append(_ESCAPED_SETS[escaped])
+                    continue
+                char = _ESCAPED_CHARS.get(escaped, escaped)
+            if self.peek() == '-' and self.pattern[self.pos + 1:self.pos + 2] not in ('', ']'):
+                self.pos += 1
+                last = self.next()
+                if last == '\\':
+                    last = self.next()
+                _literal(last)
+                members.append((frozenset(range(ord(char), ord(last) + 1)), _NONE))
+            else:
+                members.append(_literal(char))
+        self.pos += 1
+
+        charset = _union(members)
+        if negate:
+            charset = (_ASCII - charset[0], _OTHER_TAGS - charset[1])
+        return charset
+
+def _contains(node, predicate):
+    if predicate(node):
+        return True
+    if node[0] in ('cat', 'alt'):
+        return any(_contains(item, predicate) for item in node[1])
+    if node[0] in ('star', 'plus', 'opt'):
+        return _contains(node[1], predicate)
+    return False
+
+def _branches(node):
+    """Separa un patrón en sus alternativas de primer nivel y les quita los \\b de los extremos.
+
+    Genera (nodo, \\b inicial, \\b final, perezosa). Un \\b en otra posición no está soportado.
+    """
+    for item in (node[1] if node[0] == 'alt' else [node]):
+        parts = list(item[1]) if item[0] == 'cat' else [item]
+        leading = trailing = False
+        while parts and parts[0] == ('boundary',):
+            leading = True
+            parts.pop(0)
+        while parts and parts[-1] == ('boundary',):
+            trailing = True
+            parts.pop()
+
+        body = ('cat', parts)
+        if _contains(body, lambda n: n[0] == 'boundary'):
+            raise ValueError("\\b solo se admite al inicio o al final de una alternativa")
+        lazy = _contains(body, lambda n: n[0] in ('star', 'plus', 'opt') and n[2])
+        yield body, leading, trailing, lazy
+
+def _charsets(node):
+    if node[0] == 'set':
+        yield node[1]
+    elif node[0] in ('cat', 'alt'):
+        for item in node[1]:
+            yield from _charsets(item)
+    elif node[0] in ('star', 'plus', 'opt'):
+        yield from _charsets(node[1])
+
+class _NFA:
+    """Autómata no determinista de Thompson cuyas transiciones son conjuntos de clases de caracteres."""
+
+    def __init__(self):
+        self.edges = []
+        self.epsilon = []
+
+    def state(self):
+        self.edges.append([])
+        self.epsilon.append([])
+        return len(self.edges) - 1
+
+    def build(self, node, start, classes_of):
+        """Construye node a partir del estado start y devuelve su estado final."""
+        kind = node[0]
+        if kind == 'set':
+            end = self.state()
+            self.edges[start].append((classes_of(node[1]), end))
+            return end
+        if kind == 'cat':
+            for item in node[1]:
+                start = self.build(item, start, classes_of)
+            return start
+        if kind == 'alt':
+            end = self.state()
+            for item in node[1]:
+                entry = self.state()
+                self.epsilon[start].append(entry)
+                self.epsilon[self.build(item, entry, classes_of)].append(end)
+            return end
+
+        entry = self.state()
+        exit = self.state()
+        self.epsilon[start].append(entry)
+        body_end = self.build(node[1], entry, classes_of)
+        self.epsilon[body_end].append(exit)
+        if kind in ('star', 'plus'):
+            self.epsilon[body_end].append(entry)
+        if kind in ('star', 'opt'):
+            self.epsilon[entry].append(exit)
+        return exit
+
+    def closure(self, states):
+        result = set(states)
+        stack = list(states)
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if target not in result:
+                    result.add(target)
+                    stack.append(target)
+        return result
+
+def build_dfa(table, rules=None):
+    """Compila las reglas indicadas (todas por omisión) de la tabla de tokens en un DFA mínimo con semántica de coincidencia más larga.
+
+    Ante dos reglas que aceptan la misma longitud gana la que aparece primero en la tabla. Una
+    alternativa con cuantificador perezoso deja de extenderse en cuanto acepta, y los \\b de los
+    extremos se resuelven con dos estados iniciales (según haya límite de palabra antes del token)
+    y con una aceptación condicionada a que haya límite de palabra después.
+    """
+    branches = []
+    for rule in (range(len(table)) if rules is None else rules):
+        for branch in _branches(_PatternParser(table[rule][0]).parse()):
+            branches.append((rule,) + branch)
+
+    # Compresión del alfabeto: caracteres con la misma pertenencia a todos los conjuntos comparten clase
+    charsets = [WORD_SET] + [charset for branch in branches for charset in _charsets(branch[1])]
+    signatures = {}
+    ascii_classes = bytes(signatures.setdefault(tuple(code in s[0] for s in charsets), len(signatures)) for code in range(128))
+    other_classes = {tag: signatures.setdefault(tuple(tag in s[1] for s in charsets), len(signatures)) for tag in sorted(_OTHER_TAGS)}
+    n_classes = len(signatures)
+
+    def classes_of(charset):
+        members = {ascii_classes[code] for code in charset[0]}
+        members.update(other_classes[tag] for tag in charset[1])
+        return frozenset(members)
+
+    word = classes_of(WORD_SET)
+
+    nfa = _NFA()
+    accepting = {}  # estado de aceptación -> (regla, requiere \b al final, índice de la alternativa)
+    ranges = []
+    entries_boundary = []
+    entries_any = []
+    for index, (rule, body, leading, trailing, lazy) in enumerate(branches):
+        entry = nfa.state()
+        accept = nfa.state()
+        nfa.epsilon[nfa.build(body, entry, classes_of)].append(accept)
+        if accept in nfa.closure([entry]):
+            raise ValueError(f"La regla {table[rule][0]!r} acepta la cadena vacía")
+        accepting[accept] = (rule, trailing, index)
+        ranges.append((entry, len(nfa.edges), lazy))
+        entries_boundary.append(entry)
+        if not leading:
+            entries_any.append(entry)
+
+    def normalize(states):
+        # Una alternativa perezosa que ya aceptó no sigue consumiendo caracteres
+        for state in [s for s in states if s in accepting and ranges[accepting[s][2]][2]]:
+            low, high, _ = ranges[accepting[state][2]]
+            states = {s for s in states if not low <= s < high or s == state}
+        return frozenset(states)
+
+    sets = [frozenset()]
+    ids = {frozenset(): 0}
+    transitions = []
+
+    def state_id(states):
+        if states not in ids:
+            ids[states] = len(sets)
+            sets.append(states)
+        return ids[states]
+
+    start_boundary = state_id(normalize(nfa.closure(entries_boundary)))
+    start_any = state_id(normalize(nfa.closure(entries_any)))
+    current = 0
+    while current < len(sets):
+        row = []
+        for cls in range(n_classes):
+            targets = [target for state in sets[current] for classes, target in nfa.edges[state] if cls in classes]
+            row.append(state_id(normalize(nfa.closure(targets))) if targets else 0)
+        transitions.append(row)
+        current += 1
+
+    accept = []
+    accept_boundary = []
+    for states in sets:
+        rules = [accepting[s] for s in states if s in accepting]
+        accept.append(min((rule for rule, trailing, _ in rules if not trailing), default=NO_RULE))
+        accept_boundary.append(min((rule for rule, _, _ in rules), default=NO_RULE))
+
+    # Minimización por refinamiento de particiones (Moore); el estado muerto queda como 0
+    block = [(s == 0, accept[s], accept_boundary[s]) for s in range(len(sets))]
+    while True:
+        keys = [(block[s], tuple(block[t] for t in transitions[s])) for s in range(len(sets))]
+        numbering = {}
+        for key in [keys[0]] + keys:
+            numbering.setdefault(key, len(numbering))
+        refined = [numbering[key] for key in keys]
+        if len(numbering) == len(set(block)):
+            break
+        block = refined
+
+    size = len(numbering)
+    flat = array('H', [0] * (size * n_classes))
+    final_accept = array('B', [NO_RULE] * size)
+    final_accept_boundary = array('B', [NO_RULE] * size)
+    for s in range(len(sets)):
+        target = refined[s]
+        final_accept[target] = accept[s]
+        final_accept_boundary[target] = accept_boundary[s]
+        for cls, next_state in enumerate(transitions[s]):
+            flat[target * n_classes + cls] = refined[next_state]
+
+    return {
+        'ascii_classes': ascii_classes,
+        'other_classes': other_classes,
+        'n_classes': n_classes,
+        'word': bytes(cls in word for cls in range(n_classes)),
+        'transitions': flat,
+        'accept': final_accept,
+        'accept_boundary': final_accept_boundary,
+        'start_boundary': refined[start_boundary],
+        'start_any': refined[start_any],
+    }
+
+def dump_dfa(dfa):
+    """Serializa el DFA con cache_format: las tablas como bloques de bytes y el resto en la cabecera."""
+    header = {name: dfa[name] for name in ('other_classes', 'n_classes', 'start_boundary', 'start_any')}
+    return pack(header, dfa['ascii_classes'], dfa['word'], dfa['transitions'], dfa['accept'], dfa['accept_boundary'])
+
+def load_dfa(data):
+    """Reconstruye el DFA que serializó dump_dfa; ValueError si las tablas no son coherentes entre sí."""
+    header, (ascii_classes, word, transitions, accept, accept_boundary) = unpack(data)
+    n_classes = header['n_classes']
+    other_classes = {tag: header['other_classes'][tag] for tag in _OTHER_TAGS}
+    dfa = {
+        'ascii_classes': ascii_classes,
+        'other_classes': other_classes,
+        'n_classes': n_classes,
+        'word': word,
+        'transitions': array('H', transitions),
+        'accept': array('B', accept),
+        'accept_boundary': array('B', accept_boundary),
+        'start_boundary': header['start_boundary'],
+        'start_any': header['start_any'],
+    }
+    # Toda clase y todo estado deben ser índices válidos, así scan nunca lee fuera de las tablas
+    states = len(dfa['accept'])
+    classes = list(ascii_classes) + list(other_classes.values())
+    if (not isinstance(n_classes, int) or len(ascii_classes) != 128 or len(word) != n_classes
+            or not all(isinstance(cls, int) and 0 <= cls < n_classes for cls in classes)
+            or len(dfa['transitions']) != states * n_classes or len(dfa['accept_boundary']) != states
+            or max(dfa['transitions'], default=0) >= states
+            or not all(isinstance(start, int) and 0 <= start < states for start in (dfa['start_boundary'], dfa['start_any']))):
+        raise ValueError("DFA guardado inválido")
+    return dfa
+
+class _ClassMap(dict):
+    """Tabla para str.translate: código de carácter -> clase; los no ASCII se clasifican al vuelo."""
+
+    def __init__(self, ascii_classes, other_classes):
+        super().__init__(enumerate(ascii_classes))
+        self.other_classes = other_classes
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char.isdecimal():
+            tag = _OTHER_DIGIT
+        elif char.isalnum():
+            tag = _OTHER_WORD
+        else:
+            tag = _OTHER
+        value = self[code] = self.other_classes[tag]
+        return value
+
+class DFALexer(Lexer):
+    """Motor léxico que recorre un DFA mínimo generado a partir de la tabla de tokens.
+
+    La tabla de transiciones es un arreglo plano indexado por estado * clases + clase, y el texto
+    se convierte primero a una secuencia de clases de caracteres con str.translate. Aplica la
+    coincidencia más larga, igual que el patrón de OperatorTrie en el motor regex, por lo que
+    ambos motores producen los mismos tokens.
+    """
+
+    def __init__(self, table, dfa, profile=base_profile):
+        super().__init__(table, profile)
+        self.classmap = _ClassMap(dfa['ascii_classes'], dfa['other_classes'])
+        self.n_classes = dfa['n_classes']
+        self.word = dfa['word']
+        self.transitions = dfa['transitions']
+        self.accept = dfa['accept']
+        self.accept_boundary = dfa['accept_boundary']
+        self.conditional = bytes(a != b for a, b in zip(self.accept, self.accept_boundary))
+        self.start_boundary = dfa['start_boundary']
+        self.start_any = dfa['start_any']
+
+    @classmethod
+    def from_table(cls, table, profile=base_profile, cache_directory=None):
+        """Genera el DFA de la tabla o lo lee de la caché en disco, indexada por el hash de la tabla."""
+        scanner = Lexer(table, profile)
+        # Los operadores entran al DFA como una regla más con el patrón del árbol de operadores
+        patterns = list(table) + [(scanner.operator_trie.pattern(), None, None)]
+        rules = scanner.scanned_rules + [scanner.operator]
+        key = hashlib.sha256(repr((DFA_FORMAT_VERSION, patterns, rules)).encode('utf-8')).hexdigest()[:24]
+        path = os.path.join(cache_directory or default_cache_directory(), f'dfa-{key}.bin')
+
+        try:
+            with open(path, 'rb') as file:
+                return cls(table, load_dfa(file.read()), profile)
+        except Exception:
+            pass  # Un archivo dañado o ajeno se ignora y se vuelve a generar
+
+        dfa = build_dfa(patterns, rules)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(dump_dfa(dfa))
+            os.replace(temporary, path)
+        except OSError:
+            pass  # Sin caché el motor sigue funcionando, solo se regenera en la próxima ejecución
+
+        return cls(table, dfa, profile)
+
+    def scan(self, code):
+        classes = code.translate(self.classmap).encode('latin-1')
+        transitions = self.transitions
+        n_classes = self.n_classes
+        accept = self.accept
+        accept_boundary = self.accept_boundary
+        conditional = self.conditional
+        word = self.word
+        keywords = self.keywords
+        identifier = self.identifier
+        operators = self.operators
+        operator = self.operator
+        length = len(classes)
+        pos = 0
+
+        while pos < length:
+            previous = word[classes[pos - 1]] if pos else 0
+            state = self.start_boundary if previous != word[classes[pos]] else self.start_any
+            rule = NO_RULE
+            end = i = pos
+
+            while i < length:
+                state = transitions[state * n_classes + classes[i]]
+                if not state:
+                    break
+                i += 1
+                accepted = accept[state]
+                if conditional[state] and word[classes[i - 1]] != (i < length and word[classes[i]]):
+                    accepted = accept_boundary[state]
+                if accepted != NO_RULE:
+                    rule = accepted
+                    end = i
+
+            if rule == NO_RULE:
+                pos += 1  # Carácter no reconocido, queda como hueco entre lexemas
+            else:
+                if rule == identifier:
+                    rule = keywords.get(code[pos:end], identifier)
+                elif rule == operator:
+                    rule = operators[code[pos:end]]
+                yield rule, pos, end
+                pos = end
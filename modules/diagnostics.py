@@ -0,0 +1,53 @@
+class Diagnostic:
+    """Error de compilación con su posición en el código fuente.
+
+    Se guarda solo el desplazamiento; la línea y la columna se calculan con el SourceMap
+    cuando el mensaje se muestra, de modo que registrar un error no cuesta nada extra.
+    """
+    __slots__ = ('message', 'offset', 'source_map', '_location')
+
+    def __init__(self, message, offset=None, source_map=None):
+        self.message = message
+        self.offset = offset
+        self.source_map = source_map
+        self._location = None
+
+    @property
+    def location(self):
+        """(línea, columna) del error o None si no se conoce su posición."""
+        if self._location is None and self.offset is not None and self.source_map is not None:
+            self._location = self.source_map.location(self.offset)
+        return self._location
+
+    @property
+    def line(self):
+        location = self.location
+        return location[0] if location else None
+
+    @property
+    def column(self):
+        location = self.location
+        return location[1] if location else None
+
+    def resolve(self):
+        """Calcula la posición y suelta la referencia al SourceMap (y con ella al código fuente)."""
+        self.location
+        self.source_map = None
+        return self
+
+    def __str__(self):
+        location = self.location
+        if location is None:
+            return self.message
+        return f"{self.message} (línea {location[0]}, columna {location[1]})"
+
+    def __repr__(self):
+        return f"Diagnostic({self.message!r}, offset={self.offset})"
+
+    def __eq__(self, other):
+        if isinstance(other, Diagnostic):
+            return self.message == other.message and self.offset == other.offset
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.message, self.offset))
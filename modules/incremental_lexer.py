@@ -0,0 +1,269 @@
+from array import array
+from bisect import bisect_left
+
+from .diagnostics import Diagnostic
+from .interner import Interner
+from .lexer import regex_lexer, TokenKind
+from .source_map import SourceMap
+from .token_buffer import TokenBuffer
+
+def _offset(error):
+    return error[0]
+
+def _from_end(stored):
+    return -stored
+
+class SplitTokenBuffer(TokenBuffer):
+    """TokenBuffer de IncrementalLexer.snapshot con las posiciones en la representación del lexer.
+
+    Los tokens a partir de split guardan su inicio y su fin contados desde el final del código,
+    así que tomar la instantánea solo copia los arreglos, sin recorrer los tokens. offset, lexeme,
+    text y location convierten la posición al consultarla; starts y ends con posiciones absolutas
+    se calculan la primera vez que se piden (por ejemplo al mostrar la tabla de tokens).
+    """
+    __slots__ = ('split', 'stored_starts', 'stored_ends', 'absolute')
+
+    def __init__(self, source, table, kinds, starts, ends, split, interner, symbols):
+        self.source = source
+        self.table = table
+        self.kinds = kinds
+        self.stored_starts = starts
+        self.stored_ends = ends
+        self.split = split
+        self.source_map = SourceMap(source)
+        self.interner = interner
+        self.symbols = symbols
+        self.absolute = None  # (starts, ends) con posiciones absolutas
+
+    def positions(self):
+        if self.absolute is None:
+            length = len(self.source)
+            split = self.split
+            starts = self.stored_starts[:split]
+            starts.extend([length - offset for offset in self.stored_starts[split:]])
+            ends = self.stored_ends[:split]
+            ends.extend([length - offset for offset in self.stored_ends[split:]])
+            self.absolute = (starts, ends)
+        return self.absolute
+
+    @property
+    def starts(self):
+        return self.positions()[0]
+
+    @property
+    def ends(self):
+        return self.positions()[1]
+
+    def offset(self, index):
+        if index < self.split:
+            return self.stored_starts[index]
+        if index < len(self.kinds):
+            return len(self.source) - self.stored_starts[index]
+        return len(self.source)
+
+    def end(self, index):
+        if index < self.split:
+            return self.stored_ends[index]
+        return len(self.source) - self.stored_ends[index]
+
+    def lexeme(self, index):
+        return self.source[self.offset(index):self.end(index)]
+
+    def text(self, first, last):
+        if first >= last:
+            return ''
+        return self.source[self.offset(first):self.end(last - 1)]
+
+    def location(self, index):
+        return self.source_map.location(self.offset(index))
+
+    def __reduce__(self):
+        # Se serializa como un TokenBuffer con posiciones absolutas
+        starts, ends = self.positions()
+        return _token_buffer, (self.source, self.table, self.kinds, starts, ends, self.interner, self.symbols)
+
+def _token_buffer(source, table, kinds, starts, ends, interner, symbols):
+    buffer = TokenBuffer(source, table)
+    buffer.kinds, buffer.starts, buffer.ends = kinds, starts, ends
+    buffer.interner, buffer.symbols = interner, symbols
+    return buffer
+
+class IncrementalLexer:
+    """Conserva los tokens del documento del editor y vuelve a analizar solo las líneas editadas.
+
+    Ningún token cruza un salto de línea, así que el final de la región editada siempre es un
+    punto de resincronización con los tokens anteriores. Los tokens a partir del índice split
+    guardan su posición contada desde el final del documento (longitud - desplazamiento), por lo
+    que una edición no obliga a desplazar los tokens que le siguen: el costo depende del tamaño
+    de la edición y de la distancia a la edición anterior, no del tamaño del archivo.
+
+    Las posiciones de apply_edit son las que entrega la señal QTextDocument.contentsChange. El
+    editor usa apply_lines, que recibe solo las líneas editadas: leer el documento completo en cada
+    tecla costaría más que analizarlo; source queda en None hasta que sync recibe el texto al compilar.
+
+    Los identificadores se registran en un Interner que dura lo que el editor, así que los
+    símbolos de los tokens que no cambian siguen siendo válidos. damage acumula el rango de
+    tokens reemplazado desde la última llamada a take_damage (ver IncrementalParser).
+    """
+
+    def __init__(self, lexer=regex_lexer):
+        self.lexer = lexer
+        self.interner = Interner()
+        self.kinds = array('B')
+        self.reset('')
+
+    def reset(self, source):
+        """Analiza source completo y descarta el estado anterior."""
+        buffer, errors = self.lexer.tokenize(source)
+        self.damage = (0, len(self.kinds), len(buffer))
+        self.source = source
+        self.length = len(source)
+        self.kinds = buffer.kinds
+        self.starts = buffer.starts
+        self.ends = buffer.ends
+        self.symbols = buffer.intern(TokenKind.IDENTIFICADOR, self.interner)
+        self.split = len(self.kinds)
+        self.lexical_errors = [(error.offset, error.message) for error in errors]
+
+    def apply_edit(self, position, removed, added, source):
+        """Actualiza los tokens tras reemplazar removed caracteres por added en position; source es el texto nuevo."""
+        old_length = self.length
+        if position < 0 or position + removed > old_length or old_length - removed + added != len(source):
+            # La edición no corresponde al texto que conocemos (por ejemplo setPlainText)
+            self.reset(source)
+            return
+
+        # Región dañada extendida a líneas completas del texto nuevo y su equivalente en el anterior
+        start = source.rfind('\n', 0, position) + 1
+        end = source.find('\n', position + added)
+        end = len(source) if end == -1 else end + 1
+        self.relex(start, end - (added - removed), source[start:end])
+        self.source = source
+
+    def apply_lines(self, start, old_end, text):
+        """Actualiza los tokens tras reemplazar las líneas completas entre start y old_end del texto anterior por text.
+
+        text debe terminar en un salto de línea, salvo que llegue al final del documento. source
+        queda en None hasta la próxima llamada a sync.
+        """
+        if start < 0 or old_end > self.length or start > old_end:
+            raise ValueError(f"Líneas {start}-{old_end} fuera de un texto de {self.length} caracteres")
+        self.relex(start, old_end, text)
+        self.source = None
+
+    def sync(self, source):
+        """Recibe el texto completo antes de snapshot; si no corresponde a las ediciones lo analiza de nuevo.
+
+        Después de apply_lines solo se comprueba la longitud: comparar el contenido costaría tanto como analizarlo.
+        """
+        if self.source is None and len(source) == self.length:
+            self.source = source
+        elif self.source is None or self.source != source:
+            self.reset(source)
+
+    def relex(self, start, old_end, text):
+        """Analiza text, que reemplaza las líneas completas entre start y old_end, y desplaza los tokens siguientes."""
+        delta = len(text) - (old_end - start)
+        first = self.find(start)
+        last = self.find(old_end)
+        self.move_split(first)
+
+        buffer, errors = self.lexer.tokenize(text)
+        self.kinds[first:last] = buffer.kinds
+        self.starts[first:last] = array('I', [offset + start for offset in buffer.starts])
+        self.ends[first:last] = array('I', [offset + start for offset in buffer.ends])
+        self.symbols[first:last] = buffer.intern(TokenKind.IDENTIFICADOR, self.interner)
+        self.split = first + len(buffer)
+        self.add_damage(first, last, first + len(buffer))
+
+        lexical_errors = self.lexical_errors
+        error_first = bisect_left(lexical_errors, start, key=_offset)
+        error_last = bisect_left(lexical_errors, old_end, key=_offset)
+        lexical_errors[error_first:] = (
+            [(error.offset + start, error.message) for error in errors]
+            + [(offset + delta, message) for offset, message in lexical_errors[error_last:]]
+        )
+        self.length += delta
+
+    def add_damage(self, first, last, new_last):
+        """Combina el reemplazo de los tokens first a last - 1 por first a new_last - 1 con el daño acumulado.
+
+        damage es (first, old_last, new_last): los tokens first a old_last - 1 del texto que vio la
+        última llamada a take_damage ahora son first a new_last - 1; los demás no cambiaron.
+        """
+        if self.damage is None:
+            self.damage = (first, last, new_last)
+            return
+        previous_first, previous_old, previous_new = self.damage
+        self.damage = (
+            min(previous_first, first),
+            max(previous_old, last - (previous_new - previous_old)),
+            max(new_last, previous_new + (new_last - last)),
+        )
+
+    def take_damage(self):
+        """Devuelve el daño acumulado (o None si no hubo cambios) y empieza a acumular de nuevo."""
+        damage = self.damage
+        self.damage = None
+        return damage
+
+    def find(self, offset):
+        """Índice del primer token que empieza en offset o después."""
+        index = bisect_left(self.starts, offset, 0, self.split)
+        if index < self.split:
+            return index
+        return bisect_left(self.starts, offset - self.length, self.split, len(self.starts), key=_from_end)
+
+    def move_split(self, index):
+        """Cambia la representación de los tokens entre split e index (la transformación es su propia inversa)."""
+        low, high = sorted((self.split, index))
+        length = self.length
+        self.starts[low:high] = array('I', [length - offset for offset in self.starts[low:high]])
+        self.ends[low:high] = array('I', [length - offset for offset in self.ends[low:high]])
+        self.split = index
+
+    def snapshot(self, max_errors=None):
+        """Devuelve un TokenBuffer (SplitTokenBuffer) y los errores léxicos del texto actual, igual que tokenize del lexer.
+
+        Los arreglos se copian para que las ediciones siguientes no cambien la instantánea. Con
+        max_errors los tokens y los errores terminan donde tokenize detiene el análisis, con el
+        mismo aviso (ver stop).
+        """
+        if self.source is None:
+            raise ValueError("snapshot necesita el texto completo: llame a sync después de apply_lines")
+        lexical_errors = self.lexical_errors
+        count = len(self.kinds)
+        stop = None
+        if max_errors is not None and len(lexical_errors) >= max(max_errors, 1):
+            # tokenize revisa el límite después de registrar cada error, así que siempre registra al menos uno
+            stop = self.stop(max(max_errors, 1) - 1)
+            if stop is not None:
+                count = self.find(stop)
+                lexical_errors = lexical_errors[:max(max_errors, 1)]
+
+        buffer = SplitTokenBuffer(self.source, self.lexer.table, self.kinds[:count], self.starts[:count], self.ends[:count],
+                                  min(self.split, count), self.interner, self.symbols[:count])
+        errors = [Diagnostic(message, offset, buffer.source_map) for offset, message in lexical_errors]
+        if stop is not None:
+            self.lexer.abort(errors, max_errors, stop, len(self.source) - stop, buffer.source_map)
+        return buffer, errors
+
+    def stop(self, index):
+        """Desplazamiento donde tokenize se detiene al registrar el error index, o None si no se detiene.
+
+        tokenize se detiene en la coincidencia que sigue a la secuencia no reconocida, que puede
+        ser un espacio descartado; como ni los tokens ni las secuencias cruzan un salto de línea,
+        basta con analizar de nuevo la línea del error. Un error al final del código sin salto de
+        línea no detiene el análisis.
+        """
+        source = self.source
+        offset = self.lexical_errors[index][0]
+        start = source.rfind('\n', 0, offset) + 1
+        end = source.find('\n', offset)
+        end = len(source) if end == -1 else end + 1
+        # Errores de la misma línea anteriores a este: el del límite es el siguiente
+        before = index - bisect_left(self.lexical_errors, start, 0, index, key=_offset)
+        _, errors = self.lexer.tokenize(source[start:end], before + 1)
+        if len(errors) <= before + 1:
+            return None
+        return start + errors[-1].offset
@@ -0,0 +1,295 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .compiler import Parser, SemanticAnalyzer, UNDECLARED
+from .diagnostics import Diagnostic
+from .syntax_tree import Program
+
+def _from_end(stored):
+    return -stored
+
+def _splice(marks, index, end, added, shift):
+    """Reemplaza en la lista ordenada marks los índices index a end - 1 por added y suma shift a los siguientes."""
+    first = bisect_left(marks, index)
+    last = bisect_left(marks, end, first)
+    if shift:
+        marks[first:] = added + [mark + shift for mark in marks[last:]]
+    else:
+        marks[first:last] = added
+
+class Unit:
+    """Resultado de una sentencia del nivel superior (una llamada a Parser.Declaracion).
+
+    node es su nodo (None si la sentencia no produjo uno) y panic el modo pánico con el que se
+    empezó a analizar. Los errores se guardan con su desplazamiento relativo a origin, la posición
+    del primer token cuando se analizó la sentencia. uses son los símbolos que consultó el análisis
+    semántico y defines las variables que declaró por primera vez con su tipo.
+    """
+    __slots__ = ('node', 'panic', 'origin', 'errors', 'semantic_errors', 'uses', 'defines')
+
+    def __init__(self, node, panic, origin, errors):
+        self.node = node
+        self.panic = panic
+        self.origin = origin
+        self.errors = errors
+        self.semantic_errors = []
+        self.uses = frozenset()
+        self.defines = {}
+
+class UnitAnalyzer(SemanticAnalyzer):
+    """SemanticAnalyzer que registra qué símbolos consulta y declara cada sentencia."""
+
+    def __init__(self, interner):
+        super().__init__(interner=interner)
+        self.uses = set()
+        self.defines = {}
+
+    def get_type(self, symbol):
+        self.uses.add(symbol)
+        return super().get_type(symbol)
+
+    def declare_variable(self, symbol, var_type, offset=None):
+        if self.get_type(symbol) is UNDECLARED:
+            self.defines[symbol] = var_type
+        super().declare_variable(symbol, var_type, offset)
+
+    def check(self, unit):
+        """Analiza la sentencia de unit con la tabla de símbolos actual y guarda sus errores y dependencias."""
+        self.semantic_errors = []
+        self.uses = set()
+        self.defines = {}
+        if unit.node is not None:
+            self.visit((unit.node,))
+        unit.semantic_errors = [(error.offset - unit.origin, error.message) for error in self.semantic_errors]
+        unit.uses = frozenset(self.uses)
+        unit.defines = self.defines
+
+class IncrementalParser:
+    """Conserva el árbol del documento del editor y vuelve a analizar solo las sentencias dañadas.
+
+    El árbol se guarda por sentencias del nivel superior (Unit); una sentencia if/else incluye sus
+    bloques. Tras una edición se analiza de nuevo desde la sentencia que contiene el token anterior
+    al daño (una sentencia puede depender del token que la sigue) hasta alcanzar, después del daño,
+    el inicio de una sentencia anterior con el mismo modo pánico; desde ahí se reutilizan los nodos,
+    sus tipos anotados y sus errores.
+
+    Como en IncrementalLexer, los inicios de las sentencias a partir del índice split se guardan
+    contados desde el final de los tokens, así que una edición no obliga a desplazarlos. La tabla
+    de símbolos (types) corresponde a las sentencias anteriores a checked; solo se revisan de nuevo
+    las sentencias siguientes que consultan una variable cuya declaración cambió.
+
+    La lista de sentencias del árbol (statements) y los índices de las sentencias sin nodo (empty)
+    y con errores (flagged) se actualizan con el mismo reemplazo que units, así que el costo de
+    parse no depende del tamaño del documento, salvo por copiar la lista de sentencias en el
+    Program que devuelve. Los diagnósticos se construyen solo a partir de flagged.
+
+    Solo funciona con el árbol de objetos: los nodos no dependen del TokenBuffer que los creó y no
+    se modifican después de analizarlos, así que los árboles anteriores siguen siendo válidos. Los
+    nodos reutilizados conservan los desplazamientos de cuando se crearon (los errores sí se ubican
+    en la posición actual); exact es False cuando una edición cambió la posición de alguno, y
+    Compilation no guarda ese resultado en la caché.
+    """
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.analyzer = UnitAnalyzer(lexer.interner)
+        self.types = self.analyzer.types  # Tabla de símbolos después de las sentencias anteriores a checked
+        self.units = None  # Sentencias del documento, None hasta el primer análisis
+        self.starts = array('I')  # Token inicial de cada sentencia (desde el final a partir de split)
+        self.split = 0
+        self.checked = 0
+        self.count = 0  # Número de tokens del último análisis
+        self.length = 0  # Longitud del código del último análisis
+        self.statements = []  # Nodos de las sentencias, sin las que no produjeron uno
+        self.empty = []  # Índices de las sentencias sin nodo
+        self.flagged = []  # Índices de las sentencias con errores sintácticos o semánticos
+        self.exact = True  # Los desplazamientos de todos los nodos corresponden al código actual
+        self.program = None
+        self.errors = []
+        self.semantic_errors = []
+
+    def parse(self, tokens, max_errors=None):
+        """Actualiza el árbol con los tokens de lexer.snapshot y lo devuelve en program.
+
+        Los errores son los mismos que los de Parser.Programa. Si se alcanza max_errors se analiza
+        todo de nuevo con Parser, que se detiene en ese error como en el análisis completo.
+        """
+        damage = self.lexer.take_damage()
+        if self.units is None or len(tokens) - self.count != (damage[2] - damage[1] if damage else 0):
+            damage = (0, self.count, len(tokens))  # Primer análisis, o el daño no corresponde a estos tokens
+        if damage is not None:
+            self.reparse(tokens, *damage)
+
+        errors = self.collect(tokens, 'errors')
+        if max_errors is not None and len(errors) >= max_errors:
+            parser = Parser(tokens, max_errors=max_errors)
+            parser.Programa()
+            return parser
+
+        self.program = Program(list(self.statements), tokens.interner)
+        self.errors = errors
+        self.semantic_errors = self.collect(tokens, 'semantic_errors')
+        return self
+
+    def reparse(self, tokens, first, old_last, new_last):
+        """Analiza de nuevo las sentencias afectadas por el reemplazo de los tokens first a old_last - 1 por first a new_last - 1."""
+        if self.units is None:
+            self.units = []
+        units = self.units
+        index = max(self.find(first - 1), 0)
+        self.move_split(index)
+        self.move_checked(index)
+
+        parser = Parser(tokens)
+        if index < len(units):
+            parser.current_token = self.start(index)
+            parser.panic = units[index].panic
+
+        # Sentencias nuevas hasta sincronizar con las anteriores después del daño
+        count = len(tokens)
+        new_units = []
+        new_starts = array('I')
+        end = len(units)
+        while parser.current_token < count:
+            start = parser.current_token
+            new_units.append(self.parse_unit(parser, tokens))
+            new_starts.append(start)
+
+            if parser.current_token >= new_last:
+                # Los inicios desde el final no cambian con la edición
+                stored = count - parser.current_token
+                following = bisect_left(self.starts, -stored, index, len(units), key=_from_end)
+                if following < len(units) and self.starts[following] == stored and units[following].panic == parser.panic:
+                    end = following
+                    break
+
+        # Cambios en la tabla de símbolos al final de la región analizada de nuevo
+        changed = {}
+        for unit in units[index:end]:
+            for symbol, var_type in unit.defines.items():
+                changed[symbol] = var_type
+        for unit in new_units:
+            for symbol in unit.defines:
+                changed.setdefault(symbol, UNDECLARED)
+        changed = {symbol: old for symbol, old in changed.items() if self.get_type(symbol) != old}
+
+        if index == 0 and end == len(units):
+            self.exact = True
+        elif end < len(units) and len(tokens.source) != self.length:
+            self.exact = False  # Las sentencias reutilizadas después de la edición cambiaron de posición
+        self.replace(index, end, new_units)
+        self.starts[index:end] = new_starts
+        self.split = index + len(new_units)
+        self.checked = self.split
+        self.count = count
+        self.length = len(tokens.source)
+
+        # Sentencias reutilizadas que dependen de esos cambios; changed guarda el valor anterior de cada símbolo.
+        # Se construyen de nuevo en lugar de anotar otra vez sus nodos, que pueden estar en árboles anteriores
+        position = self.checked
+        while changed and position < len(units):
+            unit = units[position]
+            if unit.uses.isdisjoint(changed):
+                self.apply(unit)
+            else:
+                previous = {symbol: self.get_type(symbol) for symbol in unit.uses}
+                old_defines = unit.defines
+                parser.current_token = self.start(position)
+                parser.panic = unit.panic
+                unit = self.parse_unit(parser, tokens)
+                self.replace(position, position + 1, [unit])
+                for symbol in old_defines.keys() | unit.defines.keys():
+                    old = old_defines[symbol] if symbol in old_defines else changed.get(symbol, previous.get(symbol, UNDECLARED))
+                    if self.get_type(symbol) == old:
+                        changed.pop(symbol, None)
+                    else:
+                        changed[symbol] = old
+            position += 1
+        self.checked = position
+
+    def parse_unit(self, parser, tokens):
+        """Analiza la sentencia del nivel superior en la posición de parser y la revisa con la tabla de símbolos actual."""
+        start = parser.current_token
+        panic = parser.panic
+        error_count = len(parser.errors)
+        statements = []
+        parser.Declaracion(statements)
+        origin = tokens.offset(start)
+        errors = [(error.offset - origin, error.message) for error in parser.errors[error_count:]]
+        unit = Unit(statements[0] if statements else None, panic, origin, errors)
+        self.analyzer.check(unit)
+        return unit
+
+    def replace(self, index, end, new_units):
+        """Reemplaza las sentencias index a end - 1 por new_units en units, statements, empty y flagged."""
+        units, empty = self.units, self.empty
+        first = index - bisect_left(empty, index)
+        last = end - bisect_left(empty, end)
+        self.statements[first:last] = [unit.node for unit in new_units if unit.node is not None]
+
+        shift = len(new_units) - (end - index)
+        _splice(empty, index, end, [index + i for i, unit in enumerate(new_units) if unit.node is None], shift)
+        _splice(self.flagged, index, end,
+                [index + i for i, unit in enumerate(new_units) if unit.errors or unit.semantic_errors], shift)
+        units[index:end] = new_units
+
+    def collect(self, tokens, attribute):
+        """Diagnósticos guardados en attribute de las sentencias con errores, ubicados en la posición actual de la sentencia."""
+        units = self.units
+        source_map = tokens.source_map
+        diagnostics = []
+        for index in self.flagged:
+            errors = getattr(units[index], attribute)
+            if errors:
+                start = tokens.offset(self.start(index))
+                for offset, message in errors:
+                    diagnostics.append(Diagnostic(message, start + offset, source_map))
+        return diagnostics
+
+    def start(self, index):
+        """Token inicial de la sentencia index."""
+        if index < self.split:
+            return self.starts[index]
+        return self.count - self.starts[index]
+
+    def find(self, token):
+        """Índice de la sentencia que contiene token (-1 si no hay sentencias)."""
+        index = bisect_right(self.starts, token, 0, self.split)
+        if index < self.split:
+            return index - 1
+        return bisect_right(self.starts, token - self.count, self.split, len(self.starts), key=_from_end) - 1
+
+    def move_split(self, index):
+        """Cambia la representación de los inicios entre split e index (la transformación es su propia inversa)."""
+        low, high = sorted((self.split, index))
+        count = self.count
+        self.starts[low:high] = array('I', [count - start for start in self.starts[low:high]])
+        self.split = index
+
+    def get_type(self, symbol):
+        types = self.types
+        return types[symbol] if symbol < len(types) else UNDECLARED
+
+    def apply(self, unit):
+        types = self.types
+        for symbol, var_type in unit.defines.items():
+            if symbol >= len(types):
+                types.extend([UNDECLARED] * (symbol + 1 - len(types)))
+            types[symbol] = var_type
+
+    def move_checked(self, index):
+        """Lleva la tabla de símbolos al punto anterior a la sentencia index."""
+        units = self.units
+        while self.checked > index:
+            self.checked -= 1
+            for symbol in units[self.checked].defines:
+                self.types[symbol] = UNDECLARED
+        while self.checked < index:
+            self.apply(units[self.checked])
+            self.checked += 1
+
+    def get_errors(self):
+        return self.errors
+
+    def get_semantic_errors(self):
+        return self.semantic_errors
@@ -0,0 +1,28 @@
+class Interner:
+    """Tabla de nombres de una compilación: asigna a cada identificador un ID entero pequeño.
+
+    Los IDs se asignan en orden de aparición desde 0, así que las tablas que se indexan por
+    símbolo pueden ser listas. names es la tabla inversa para mostrar mensajes y etiquetas.
+    """
+    __slots__ = ('ids', 'names')
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        """Devuelve el ID de name, asignándole uno nuevo si es la primera vez que aparece."""
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def name(self, symbol):
+        return self.names[symbol]
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.names)
@@ -0,0 +1,428 @@
+import re
+import unicodedata
+from enum import IntEnum
+
+from .diagnostics import Diagnostic
+from .source_map import SourceMap
+from .token_buffer import TokenBuffer
+
+# Tabla de tokens: (patrón, tipo de token, número de tipo). El orden importa,
+# la expresión maestra prueba las alternativas en este mismo orden.
+tokens = [
+    (r'\bint\b',              'palabra reservada int', 23),
+    (r'\bfloat\b',            'palabra reservada float', 24),
+    (r'\bprint\b',            'palabra reservada print', 24),
+    (r'\bif\b',               'palabra reservada if', 19),
+    (r'\belse\b',             'palabra reservada else', 22),
+    (r'\bint\b|\bfloat\b|\bvoid\b', 'tipo', 4),
+    (r'[ \n\t]+',             None, None),                      # Para ignorar los espacios en blanco
+    (r'[A-Za-z_][A-Za-z0-9_]*','identificador', 0),
+    (r'\d+\.\d+',             'real', 2),
+    (r'\d+',                  'entero', 1),
+    (r'\".*?\"',              'cadena', 3),
+    (r'\+',                   'operación suma', 5),
+    (r'-',                    'operación resta', 5),
+    (r'\*',                   'operación multiplicación', 6),
+    (r'/',                    'operación división', 6),
+    (r'<|<=|>|>=',            'operación relación', 7),
+    (r'\|\|',                 'operación or', 8),
+    (r'&&',                   'operación and', 9),
+    (r'!',                    'operación not', 10),
+    (r'==|!=',                'operación igualdad', 11),
+    (r';',                    'punto y coma', 12),
+    (r',',                    'coma', 13),
+    (r'\(',                   'paréntesis abierto', 14),
+    (r'\)',                   'paréntesis cerrado', 15),
+    (r'\{',                   'llave abierta', 16),
+    (r'\}',                   'llave cerrada', 17),
+    (r'=',                    'asignación', 18),
+]
+
+def _kind_name(tokenType):
+    """Convierte la descripción de un token en un nombre de constante: 'operación suma' -> 'OPERACION_SUMA'."""
+    ascii_name = unicodedata.normalize('NFKD', tokenType).encode('ascii', 'ignore').decode()
+    return ascii_name.upper().replace(' ', '_')
+
+# Tipos de token como enteros; el valor de cada miembro es el índice de su regla en la tabla.
+# Las descripciones de la tabla solo se usan para mostrar tokens y redactar diagnósticos.
+TokenKind = IntEnum('TokenKind', [(_kind_name(tokenType), i) for i, (_, tokenType, _) in enumerate(tokens) if tokenType])
+
+def kind_name(kind):
+    """Devuelve la descripción legible de un tipo de token."""
+    return tokens[kind][1]
+
+_KEYWORD_PATTERN = re.compile(r'\\b(\w+)\\b')
+
+def keyword_rules(table):
+    """Devuelve las reglas formadas solo por palabras completas (r'\\bint\\b|...') y el diccionario palabra -> regla.
+
+    Si una palabra aparece en varias reglas se queda con la primera, igual que la alternancia ordenada.
+    """
+    rules = set()
+    keywords = {}
+    for rule, (pattern, _, _) in enumerate(table):
+        words = [_KEYWORD_PATTERN.fullmatch(part) for part in pattern.split('|')]
+        if all(words):
+            rules.add(rule)
+            for word in words:
+                keywords.setdefault(word.group(1), rule)
+    return rules, keywords
+
+# Patrón formado solo por signos literales, sin letras ni operadores de expresiones regulares: '\\|\\|', '==', '<'
+_OPERATOR_PATTERN = re.compile(r'(?:\\[^\w\s]|[^\\\w\s.^$*+?()\[\]{}|])+')
+
+def operator_rules(table):
+    """Devuelve las reglas formadas solo por operadores o signos literales (r'<|<=|>|>=') y el diccionario lexema -> regla.
+
+    Si un lexema aparece en varias reglas se queda con la primera.
+    """
+    rules = set()
+    operators = {}
+    for rule, (pattern, tokenType, _) in enumerate(table):
+        parts = pattern.split('|')
+        # Un '|' escapado ('\\|\\|') divide el patrón, se vuelve a unir antes de validar
+        joined = []
+        for part in parts:
+            if joined and joined[-1].endswith('\\'):
+                joined[-1] += '|' + part
+            else:
+                joined.append(part)
+        if tokenType and all(_OPERATOR_PATTERN.fullmatch(part) for part in joined):
+            rules.add(rule)
+            for part in joined:
+                operators.setdefault(re.sub(r'\\(.)', r'\1', part), rule)
+    return rules, operators
+
+class OperatorTrie:
+    """Árbol de prefijos de los operadores y signos de puntuación de la tabla.
+
+    pattern() lo convierte en una expresión sin retroceso entre alternativas ('<(?:=)?|...')
+    que siempre toma el operador más largo, y rules da la regla de cada lexema. Los motores
+    reconocen todos los operadores con ese único patrón y clasifican el lexema con una sola
+    búsqueda, así '<=', '>=' y '!=' son un token sin depender del orden de la tabla.
+    """
+
+    def __init__(self, operators):
+        self.rules = dict(operators)
+        self.root = {}  # carácter -> [regla o None, hijos]
+        for lexeme, rule in self.rules.items():
+            children = self.root
+            for char in lexeme[:-1]:
+                children = children.setdefault(char, [None, {}])[1]
+            children.setdefault(lexeme[-1], [None, {}])[0] = rule
+
+    def pattern(self, children=None):
+        """Expresión regular equivalente al árbol; en cada nodo prueba primero la continuación más larga."""
+        alternatives = []
+        for char, (rule, nested) in sorted((self.root if children is None else children).items()):
+            tail = self.pattern(nested) if nested else ''
+            if tail:
+                tail = f'(?:{tail})' + ('?' if rule is not None else '')
+            alternatives.append(re.escape(char) + tail)
+        return '|'.join(alternatives)
+
+class LanguageProfile:
+    """Palabras reservadas de una variante del lenguaje.
+
+    Las palabras reservadas no forman parte de los patrones del lexer: se reconoce el identificador
+    y se clasifica con una sola búsqueda en keywords, así que agregar palabras no hace más lento el análisis.
+    """
+
+    def __init__(self, name, keywords, identifier=TokenKind.IDENTIFICADOR):
+        self.name = name
+        self.keywords = dict(keywords)
+        self.identifier = int(identifier)
+
+    def extend(self, name, aliases):
+        """Devuelve un perfil nuevo con las palabras de este más aliases (palabra -> TokenKind)."""
+        return LanguageProfile(name, {**self.keywords, **{word: int(kind) for word, kind in aliases.items()}}, self.identifier)
+
+base_profile = LanguageProfile('base', keyword_rules(tokens)[1])
+
+# Acepta también los nombres en español de los tipos que Parser.get_equivalent ya reconoce
+spanish_profile = base_profile.extend('espanol', {
+    'entero': TokenKind.PALABRA_RESERVADA_INT,
+    'real': TokenKind.PALABRA_RESERVADA_FLOAT,
+})
+
+language_profiles = {profile.name: profile for profile in (base_profile, spanish_profile)}
+
+class Lexer:
+    """Base común de los motores léxicos generados a partir de una tabla de tokens.
+
+    Cada motor implementa scan(code), que genera (regla, inicio, fin) por cada lexema reconocido,
+    incluidos los que se descartan; los huecos entre lexemas son caracteres no reconocidos. Las
+    reglas de palabras reservadas no se compilan en el motor: los identificadores se clasifican
+    con el diccionario del perfil de lenguaje. Los operadores tampoco: el motor reconoce el patrón
+    de OperatorTrie y el lexema se clasifica con operators.
+    """
+
+    def __init__(self, table, profile=base_profile):
+        self.table = table
+        self.profile = profile
+        self.keywords = profile.keywords
+        self.identifier = profile.identifier
+
+        # Reglas que reconoce el motor (todas menos las de palabras reservadas y las de operadores)
+        excluded, _ = keyword_rules(table)
+        operators, lexemes = operator_rules(table)
+        self.scanned_rules = [rule for rule in range(len(table)) if rule not in excluded and rule not in operators]
+
+        # Los operadores se reconocen con el patrón del árbol como una regla más, con índice len(table)
+        self.operator_trie = OperatorTrie(lexemes)
+        self.operators = self.operator_trie.rules
+        self.operator = len(table)
+
+        # Reglas cuyo lexema se descarta (espacios en blanco)
+        self.skip = [tokenType is None for _, tokenType, _ in table]
+
+    def scan(self, code):
+        raise NotImplementedError
+
+    def tokenize(self, code, max_errors=None):
+        """Devuelve un TokenBuffer con los tokens de code y la lista de errores léxicos.
+
+        Con max_errors el análisis se detiene al llegar a ese número de errores.
+        """
+        skip = self.skip
+        buffer = TokenBuffer(code, self.table)
+        add_kind = buffer.kinds.append
+        add_start = buffer.starts.append
+        add_end = buffer.ends.append
+        errors = []
+        pos = 0
+
+        for rule, start, end in self.scan(code):
+            if start != pos:
+                self.unknown(code, pos, start, errors, buffer.source_map)
+                if max_errors is not None and len(errors) >= max_errors:
+                    self.abort(errors, max_errors, start, len(code) - start, buffer.source_map)
+                    return buffer, errors
+
+            pos = end
+            if not skip[rule]:
+                add_kind(rule)
+                add_start(start)
+                add_end(end)
+
+        self.unknown(code, pos, len(code), errors, buffer.source_map)
+        return buffer, errors
+
+    def iter_text(self, code, errors, source_map=None, max_errors=None):
+        """Genera los tokens de un texto completo; los errores léxicos se agregan a la lista errors.
+
+        source_map describe la posición de code dentro del código completo cuando es solo un fragmento.
+        """
+        if source_map is None:
+            source_map = SourceMap(code)
+        base = source_map.base
+        table = self.table
+        pos = 0
+
+        for rule, start, end in self.scan(code):
+            if start != pos:
+                self.unknown(code, pos, start, errors, source_map, base)
+                if max_errors is not None and len(errors) >= max_errors:
+                    self.abort(errors, max_errors, base + start, None, source_map)
+                    return
+
+            pos = end
+            _, tokenType, numType = table[rule]
+            if tokenType:
+                yield (code[start:end], tokenType, numType)
+
+        self.unknown(code, pos, len(code), errors, source_map, base)
+
+    def unknown(self, code, start, end, errors, source_map, base=0):
+        """Registra un solo error para la secuencia de caracteres no reconocidos entre start y end."""
+        if start >= end:
+            return
+
+        sequence = code[start:end]
+        if not isinstance(sequence, str):
+            # Código en bytes (archivo mapeado en memoria)
+            sequence = sequence.decode('utf-8', 'replace')
+        length = len(sequence)
+        if length == 1:
+            errors.append(Diagnostic(f"Error LEXICO: token no reconosido '{sequence}'", base + start, source_map))
+        else:
+            preview = sequence[:20] + ('...' if length > 20 else '')
+            errors.append(Diagnostic(f"Error LEXICO: secuencia no reconocida '{preview}' ({length} caracteres)", base + start, source_map))
+
+    def abort(self, errors, max_errors, offset, remaining, source_map):
+        """Registra que el análisis se detuvo por exceder max_errors y cuánto código quedó sin analizar."""
+        if remaining is None:
+            detail = "no se analizó el resto del código"
+        else:
+            detail = f"no se analizaron los {remaining} caracteres restantes"
+        errors.append(Diagnostic(f"Error LEXICO: se alcanzó el máximo de {max_errors} errores; {detail}", offset, source_map))
+
+    def iter_chunks(self, chunks, errors, max_errors=None, max_pending=1 << 20):
+        """Genera los tokens de una secuencia de fragmentos de texto sin tener todo el código en memoria.
+
+        Ningún token cruza un salto de línea (las cadenas no aceptan '\\n' y los espacios se descartan),
+        así que cada fragmento se analiza hasta su último salto de línea y el resto se une al siguiente.
+        Si lo pendiente supera max_pending caracteres sin un salto de línea se corta en el límite de
+        un token (ver boundary). Los fragmentos deben ser str: un archivo se abre en modo texto.
+        """
+        pending = []
+        size = 0  # Caracteres en pending
+        limit = max_pending  # Tamaño de pending a partir del cual se busca un corte sin salto de línea
+        base = 0
+        first_line = 1
+        first_column = 1
+        for chunk in chunks:
+            if not isinstance(chunk, str):
+                raise TypeError(f"Se esperaba un fragmento de texto (str) pero se recibió {type(chunk).__name__}; abra el archivo en modo texto")
+            pending.append(chunk)
+            size += len(chunk)
+            cut = chunk.rfind('\n') + 1
+            if cut:
+                cut += size - len(chunk)
+            elif size <= limit:
+                continue
+
+            text = ''.join(pending)
+            if not cut:
+                cut = self.boundary(text)
+                if not cut:
+                    # Una cadena sin cerrar ocupa todo lo pendiente: se espera a tener el doble
+                    pending = [text]
+                    limit = size * 2
+                    continue
+
+            fragment = text[:cut]
+            yield from self.iter_fragment(fragment, errors, base, first_line, max_errors, first_column)
+            if max_errors is not None and len(errors) > max_errors:
+                return
+            base += cut
+            lines = fragment.count('\n')
+            first_line += lines
+            first_column = cut - fragment.rfind('\n') if lines else first_column + cut
+            pending = [text[cut:]]
+            size = len(text) - cut
+            limit = max_pending
+
+        rest = ''.join(pending)
+        if rest:
+            yield from self.iter_fragment(rest, errors, base, first_line, max_errors, first_column)
+
+    def boundary(self, text):
+        """Posición de text donde se puede cortar sin cambiar los tokens ni los errores, o 0 si no hay ninguna.
+
+        Es el inicio del último lexema, que podría continuar en el texto siguiente; o el final del
+        último lexema antes de una comilla no reconocida, que podría abrir una cadena que se cierra
+        después del corte.
+        """
+        cut = pos = 0
+        for _, start, end in self.scan(text):
+            if start != pos and '"' in text[pos:start]:
+                return pos
+            cut, pos = start, end
+        return pos if '"' in text[pos:] else cut
+
+    def iter_fragment(self, text, errors, base, first_line, max_errors=None, first_column=1):
+        """Analiza un fragmento y fija la posición de sus errores para no retener el texto en memoria."""
+        reported = len(errors)
+        yield from self.iter_text(text, errors, SourceMap(text, base, first_line, first_column), max_errors)
+        for error in errors[reported:]:
+            error.resolve()
+
+class RegexLexer(Lexer):
+    """Motor léxico basado en una sola expresión regular maestra compilada a partir de la tabla de tokens.
+
+    tokenize acepta también bytes o un mmap del archivo fuente: se usa la misma expresión compilada
+    sobre bytes y los tokens quedan como desplazamientos dentro del archivo, sin copiarlo a un str.
+    En ese modo \\d solo reconoce dígitos ASCII y las posiciones de los errores se cuentan en bytes.
+    """
+
+    def __init__(self, table, profile=base_profile):
+        super().__init__(table, profile)
+        patterns = [f'(?P<TOKEN_{i}>{table[i][0]})' for i in self.scanned_rules]
+        patterns.append(f'(?P<TOKEN_{self.operator}>{self.operator_trie.pattern()})')
+        self.regex = re.compile('|'.join(patterns))
+        self.bytes_regex = re.compile(self.regex.pattern.encode('ascii'))
+        self.bytes_keywords = {word.encode('ascii'): rule for word, rule in self.keywords.items() if word.isascii()}
+        self.bytes_operators = {lexeme.encode('ascii'): rule for lexeme, rule in self.operators.items()}
+
+        # Tabla de despacho: número de grupo (match.lastindex) -> índice de la regla en la tabla.
+        # Al ser el grupo con nombre el más externo de su alternativa, siempre es el último en cerrarse.
+        self.rules = [None] * (self.regex.groups + 1)
+        for name, group in self.regex.groupindex.items():
+            self.rules[group] = int(name[len('TOKEN_'):])
+
+    def scan(self, code):
+        rules = self.rules
+        keywords = self.keywords
+        identifier = self.identifier
+        operators = self.operators
+        operator = self.operator
+        for match in self.regex.finditer(code):
+            rule = rules[match.lastindex]
+            if rule == identifier:
+                rule = keywords.get(match.group(), identifier)
+            elif rule == operator:
+                rule = operators[match.group()]
+            yield rule, match.start(), match.end()
+
+    def tokenize(self, code, max_errors=None):
+        # Misma lógica que Lexer.tokenize sin pasar por el generador scan, es el camino más usado
+        rules = self.rules
+        skip = self.skip
+        identifier = self.identifier
+        operator = self.operator
+        if isinstance(code, str):
+            regex, keywords, operators = self.regex, self.keywords, self.operators
+        else:
+            regex, keywords, operators = self.bytes_regex, self.bytes_keywords, self.bytes_operators
+        buffer = TokenBuffer(code, self.table)
+        add_kind = buffer.kinds.append
+        add_start = buffer.starts.append
+        add_end = buffer.ends.append
+        errors = []
+        pos = 0
+
+        # finditer solo salta posiciones donde ninguna alternativa coincide, esos huecos son los errores
+        for match in regex.finditer(code):
+            start = match.start()
+            if start != pos:
+                self.unknown(code, pos, start, errors, buffer.source_map)
+                if max_errors is not None and len(errors) >= max_errors:
+                    self.abort(errors, max_errors, start, len(code) - start, buffer.source_map)
+                    return buffer, errors
+
+            pos = match.end()
+            rule = rules[match.lastindex]
+            if rule == identifier:
+                rule = keywords.get(code[start:pos], identifier)
+            elif rule == operator:
+                rule = operators[code[start:pos]]
+            if not skip[rule]:
+                add_kind(rule)
+                add_start(start)
+                add_end(pos)
+
+        self.unknown(code, pos, len(code), errors, buffer.source_map)
+        return buffer, errors
+
+# Motor por defecto, construido una sola vez al importar el módulo
+regex_lexer = RegexLexer(tokens)
+
+# Motores disponibles por (motor, perfil); los demás se construyen la primera vez que se solicitan
+lexer_engines = {('regex', 'base'): regex_lexer}
+
+def get_lexer(engine='regex', profile='base'):
+    """Devuelve el motor léxico indicado, 'regex' (expresión maestra) o 'dfa' (autómata generado), para un perfil de lenguaje."""
+    key = (engine, profile)
+    if key not in lexer_engines:
+        if profile not in language_profiles:
+            raise ValueError(f"Perfil de lenguaje desconocido: '{profile}'")
+
+        if engine == 'regex':
+            lexer_engines[key] = RegexLexer(tokens, language_profiles[profile])
+        elif engine == 'dfa':
+            from .dfa_lexer import DFALexer
+            lexer_engines[key] = DFALexer.from_table(tokens, language_profiles[profile])
+        else:
+            raise ValueError(f"Motor léxico desconocido: '{engine}'")
+    return lexer_engines[key]
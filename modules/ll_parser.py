@@ -0,0 +1,521 @@
+import hashlib
+import json
+import os
+import re
+
+from .compiler import Parser
+from .dfa_lexer import default_cache_directory
+from .lexer import tokens, TokenKind, kind_name
+
+# Versión del formato de la tabla guardada en disco; cambiarla invalida la caché
+GRAMMAR_FORMAT_VERSION = 2
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grammar.ebnf')
+
+END = -1  # Fin del código en los conjuntos FOLLOW
+
+class _EBNFReader:
+    """Lector del subconjunto de EBNF (ISO/IEC 14977) que usa grammar.ebnf.
+
+    Produce una lista de reglas (nombre, alternativas); cada alternativa es una lista de
+    elementos ('symbol', nombre), ('special', texto) y ('group' | 'option' | 'repeat', alternativas).
+    """
+    TOKEN = re.compile(r'\s+|\(\*.*?\*\)|\?[^?]*\?|[A-Za-z_]\w*|[=;|,\[\]{}()]', re.S)
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        pos = 0
+        while pos < len(text):
+            match = self.TOKEN.match(text, pos)
+            if match is None:
+                self.pos = pos
+                self.error(f"Carácter inesperado {text[pos]!r}")
+            token = match.group()
+            if not token.isspace() and not token.startswith('(*'):
+                self.tokens.append((token, pos))
+            pos = match.end()
+        self.index = 0
+
+    def error(self, message):
+        offset = self.tokens[self.index][1] if self.index < len(self.tokens) else len(self.text)
+        line = self.text.count('\n', 0, offset) + 1
+        raise ValueError(f"{message} en la gramática (línea {line})")
+
+    def peek(self):
+        return self.tokens[self.index][0] if self.index < len(self.tokens) else ''
+
+    def expect(self, token):
+        if self.peek() != token:
+            self.error(f"Se esperaba '{token}' y se encontró '{self.peek()}'")
+        self.index += 1
+
+    def parse(self):
+        rules = []
+        while self.index < len(self.tokens):
+            name = self.peek()
+            if not name[:1].isalpha():
+                self.error(f"Se esperaba el nombre de una regla y se encontró '{name}'")
+            self.index += 1
+            self.expect('=')
+            rules.append((name, self.alternatives()))
+            self.expect(';')
+        return rules
+
+    def alternatives(self):
+        alternatives = [self.sequence()]
+        while self.peek() == '|':
+            self.index += 1
+            alternatives.append(self.sequence())
+        return alternatives
+
+    def sequence(self):
+        elements = []
+        if self.peek() in ('|', ';', ')', ']', '}'):
+            return elements  # Alternativa vacía
+        elements.append(self.element())
+        while self.peek() == ',':
+            self.index += 1
+            elements.append(self.element())
+        return elements
+
+    def element(self):
+        token = self.peek()
+        self.index += 1
+        if token.startswith('?'):
+            return ('special', token[1:-1].strip())
+        if token[:1].isalpha() or token[:1] == '_':
+            return ('symbol', token)
+        for opening, closing, kind in (('(', ')', 'group'), ('[', ']', 'option'), ('{', '}', 'repeat')):
+            if token == opening:
+                alternatives = self.alternatives()
+                self.expect(closing)
+                return (kind, alternatives)
+        self.index -= 1
+        self.error(f"Símbolo inesperado '{token}'")
+
+def build_table(text):
+    """Genera la tabla LL(1) de la gramática text.
+
+    Convierte la EBNF en producciones simples (los grupos, opciones y repeticiones pasan a ser
+    no terminales auxiliares), calcula FIRST y FOLLOW y llena la tabla de predicción. Reporta
+    todos los conflictos juntos con ValueError. Las celdas vacías se llenan con la alternativa
+    otherwise (propia o del primer símbolo) o con la alternativa vacía.
+    """
+    rules = _EBNFReader(text).parse()
+    nonterminals = [name for name, _ in rules]
+    index = {name: i for i, name in enumerate(nonterminals)}
+    if len(index) != len(nonterminals):
+        raise ValueError("La gramática define una regla más de una vez")
+
+    productions = []  # (no terminal, símbolos, acción final, otherwise)
+    bodies = {}  # No terminal de una repetición -> no terminal de su cuerpo
+    continues = {}  # No terminal de una repetición -> producción que repite
+
+    def helper(rule, alternatives):
+        nonterminals.append(f'{rule}#{len(nonterminals)}')
+        nonterminal = len(nonterminals) - 1
+        for alternative in alternatives:
+            add_production(rule, nonterminal, alternative)
+        return nonterminal
+
+    def add_production(rule, nonterminal, elements):
+        symbols = []
+        action = None
+        otherwise = False
+        for position, (kind, value) in enumerate(elements):
+            if kind == 'special':
+                if value == 'otherwise':
+                    if position:
+                        raise ValueError(f"'? otherwise ?' debe iniciar la alternativa en la regla {rule}")
+                    otherwise = True
+                elif position == len(elements) - 1:
+                    action = value
+                else:
+                    symbols.append(('action', value))
+            elif kind == 'symbol':
+                if value in index:
+                    symbols.append(('nonterminal', index[value]))
+                elif value in TokenKind.__members__:
+                    symbols.append(('terminal', TokenKind[value]))
+                else:
+                    raise ValueError(f"Símbolo no definido '{value}' en la regla {rule}")
+            elif kind == 'group':
+                symbols.append(('nonterminal', helper(rule, value)))
+            elif kind == 'option':
+                symbols.append(('nonterminal', helper(rule, value + [[]])))
+            else:
+                # { ... } -> R = cuerpo R | vacío; el motor la recorre con un ciclo y acumula una lista
+                if len(value) == 1 and len(value[0]) == 1 and value[0][0][0] == 'symbol' and value[0][0][1] in index:
+                    body = index[value[0][0][1]]
+                else:
+                    body = helper(rule, value)
+                nonterminals.append(f'{rule}#{len(nonterminals)}')
+                repeat = len(nonterminals) - 1
+                bodies[repeat] = body
+                continues[repeat] = len(productions)
+                productions.append((repeat, [('nonterminal', body), ('repeat', repeat)], None, False))
+                productions.append((repeat, [], None, False))
+                symbols.append(('repeat', repeat))
+        productions.append((nonterminal, symbols, action, otherwise))
+
+    for name, alternatives in rules:
+        for alternative in alternatives:
+            add_production(name, index[name], alternative)
+
+    # FIRST y anulables, sin las alternativas otherwise
+    count = len(nonterminals)
+    first = [set() for _ in range(count)]
+    nullable = [False] * count
+
+    def first_of(symbols):
+        result = set()
+        for kind, value in symbols:
+            if kind == 'terminal':
+                result.add(value)
+                return result, False
+            if kind in ('nonterminal', 'repeat'):
+                result |= first[value]
+                if not nullable[value]:
+                    return result, False
+        return result, True
+
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, symbols, _, otherwise in productions:
+            if otherwise:
+                continue
+            result, empty = first_of(symbols)
+            if not result <= first[nonterminal] or (empty and not nullable[nonterminal]):
+                first[nonterminal] |= result
+                nullable[nonterminal] = nullable[nonterminal] or empty
+                changed = True
+
+    follow = [set() for _ in range(count)]
+    follow[0].add(END)
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, symbols, _, otherwise in productions:
+            if otherwise:
+                continue
+            for position, (kind, value) in enumerate(symbols):
+                if kind not in ('nonterminal', 'repeat'):
+                    continue
+                result, empty = first_of(symbols[position + 1:])
+                if empty:
+                    result = result | follow[nonterminal]
+                if not result <= follow[value]:
+                    follow[value] |= result
+                    changed = True
+
+    # Tabla de predicción: rows[no terminal][tipo de token] -> producción, -1 si es un error
+    def describe(production):
+        nonterminal, symbols, _, _ = productions[production]
+        names = [kind_name(value) if kind == 'terminal' else nonterminals[value] for kind, value in symbols if kind != 'action']
+        return f"{nonterminals[nonterminal]} -> {' '.join(names) or 'ε'}"
+
+    rows = [[-1] * len(tokens) for _ in range(count)]
+    end = [-1] * count
+    conflicts = []
+
+    def predict(nonterminal, kind, production):
+        row, column = (end, nonterminal) if kind == END else (rows[nonterminal], kind)
+        if row[column] not in (-1, production):
+            lookahead = 'fin del código' if kind == END else kind_name(kind)
+            conflicts.append(f"{nonterminals[nonterminal]} con '{lookahead}': {describe(row[column])} | {describe(production)}")
+        else:
+            row[column] = production
+
+    empty_production = [None] * count
+    for production, (nonterminal, symbols, _, otherwise) in enumerate(productions):
+        if otherwise:
+            continue
+        result, empty = first_of(symbols)
+        for kind in result:
+            predict(nonterminal, kind, production)
+        if empty:
+            empty_production[nonterminal] = production
+            for kind in follow[nonterminal]:
+                predict(nonterminal, kind, production)
+
+    if conflicts:
+        raise ValueError("La gramática no es LL(1):\n" + '\n'.join(conflicts))
+
+    # Alternativa para los tokens sin entrada: la otherwise, o la que empieza con un no terminal
+    # que tiene una (por ejemplo Expresion -> Termino ... -> Factor); así se propaga hasta las
+    # repeticiones cuyo cuerpo la tiene
+    fallback = [None] * count
+    for production, (nonterminal, _, _, otherwise) in enumerate(productions):
+        if otherwise:
+            fallback[nonterminal] = production
+    changed = True
+    while changed:
+        changed = False
+        for production, (nonterminal, symbols, _, otherwise) in enumerate(productions):
+            leading = next((value for kind, value in symbols if kind != 'action'), None)
+            if fallback[nonterminal] is None and leading is not None and symbols[0][0] == 'nonterminal' and fallback[leading] is not None:
+                fallback[nonterminal] = production
+                changed = True
+
+    for nonterminal in range(count):
+        default = fallback[nonterminal] if fallback[nonterminal] is not None else empty_production[nonterminal]
+        if default is not None:
+            rows[nonterminal] = [default if production < 0 else production for production in rows[nonterminal]]
+        if end[nonterminal] < 0:
+            # Al final del código se prefiere terminar la regla si puede ser vacía
+            end[nonterminal] = empty_production[nonterminal] if nullable[nonterminal] else (default if default is not None else -1)
+
+    # Codificación de la pila del motor: terminales (tipos de token), no terminales, ciclos de
+    # repetición, operaciones de la lista de repetición y acciones intermedias
+    terminal_limit = len(tokens)
+    loop = terminal_limit + count
+    append = loop + count
+    new_list = append + 1
+    action_base = new_list + 1
+    middle_actions = sorted({value for _, symbols, _, _ in productions for kind, value in symbols if kind == 'action'})
+
+    def encode(kind, value):
+        if kind == 'terminal':
+            return int(value)
+        if kind == 'nonterminal':
+            return terminal_limit + value
+        if kind == 'repeat':
+            return (loop + value, new_list)  # new_list se ejecuta primero
+        return action_base + middle_actions.index(value)
+
+    rhs = []
+    for _, symbols, _, _ in productions:
+        encoded = []
+        for kind, value in reversed(symbols):
+            entry = encode(kind, value)
+            encoded.extend(entry if isinstance(entry, tuple) else (entry,))
+        rhs.append(tuple(encoded))
+
+    return {
+        'nonterminals': nonterminals,
+        'rows': rows,
+        'end': end,
+        'rhs': rhs,
+        'actions': [action for _, _, action, _ in productions],
+        'middle_actions': middle_actions,
+        'bodies': bodies,
+        'continues': continues,
+        'bases': (terminal_limit, loop, append, new_list, action_base),
+        'productions': [describe(production) for production in range(len(productions))],
+    }
+
+def decode_table(table):
+    """Restaura los tipos de la tabla que JSON no conserva (tuplas y claves enteras); ValueError si no es una tabla."""
+    if not isinstance(table, dict):
+        raise ValueError("Tabla LL(1) guardada inválida")
+    table['rhs'] = [tuple(entry) for entry in table['rhs']]
+    table['bodies'] = {int(key): value for key, value in table['bodies'].items()}
+    table['continues'] = {int(key): value for key, value in table['continues'].items()}
+    table['bases'] = tuple(table['bases'])
+    entries = [entry for row in table['rows'] + table['rhs'] + [table['end'], table['bases']] for entry in row]
+    names = [name for name in table['actions'] if name is not None] + table['middle_actions']
+    if (not all(type(entry) is int for entry in entries)
+            or not all(isinstance(name, str) and hasattr(LLParser, f'action_{name}') for name in names)):
+        raise ValueError("Tabla LL(1) guardada inválida")
+    return table
+
+def load_grammar(path=GRAMMAR_PATH, cache_directory=None):
+    """Genera la tabla de la gramática en path o la lee de la caché en disco, indexada por el hash del archivo."""
+    with open(path, encoding='utf-8') as file:
+        text = file.read()
+
+    terminals = tuple((name, int(kind)) for name, kind in TokenKind.__members__.items())
+    key = hashlib.sha256(repr((GRAMMAR_FORMAT_VERSION, text, terminals, len(tokens))).encode('utf-8')).hexdigest()[:24]
+    cache_path = os.path.join(cache_directory or default_cache_directory(), f'll1-{key}.json')
+
+    try:
+        with open(cache_path, 'rb') as file:
+            return decode_table(json.load(file))
+    except Exception:
+        pass  # Un archivo dañado o ajeno se ignora y se vuelve a generar
+
+    table = build_table(text)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(table, file, separators=(',', ':'))
+        os.replace(temporary, cache_path)
+    except OSError:
+        pass  # Sin caché el analizador sigue funcionando, solo se regenera en la próxima ejecución
+
+    return table
+
+# Tablas ya cargadas por ruta de la gramática, se reutilizan entre compilaciones
+grammars = {}
+
+def get_grammar(path=GRAMMAR_PATH):
+    if path not in grammars:
+        grammars[path] = load_grammar(path)
+    return grammars[path]
+
+class LLParser(Parser):
+    """Analizador sintáctico dirigido por la tabla LL(1) generada de grammar.ebnf.
+
+    Recorre la gramática con una pila explícita, sin recursión. Las acciones de la gramática usan
+    los mismos métodos de construcción que Parser (TreeBuilder o SyntaxArena) y los errores y la
+    recuperación en modo pánico son los de Parser, así que ambos producen el mismo árbol y los
+    mismos errores.
+    """
+    # No terminal en el que el modo pánico se sincroniza, igual que Parser.Declaracion
+    SINCRONIZACION = 'Sentencia'
+
+    def __init__(self, tokens, tracer=None, arena=False, max_errors=None, grammar=None):
+        super().__init__(tokens, tracer, arena, max_errors)
+        self.grammar = grammar if grammar is not None else get_grammar()
+        self.actions = [self.action(name) if name is not None else None for name in self.grammar['actions']]
+        self.middle_actions = [self.action(name) for name in self.grammar['middle_actions']]
+        self.stack = []
+
+    def action(self, name):
+        method = getattr(self, f'action_{name}', None)
+        if method is None:
+            raise ValueError(f"Acción desconocida en la gramática: '{name}'")
+        return method
+
+    def predict(self, nonterminal):
+        """Producción para nonterminal según el token actual, o -1 si el token no es válido ahí"""
+        kind = self.peek_kind()
+        production = self.grammar['end'][nonterminal] if kind is None else self.grammar['rows'][nonterminal][kind]
+        if self.trace:
+            self.trace('predict', nonterminal=self.grammar['nonterminals'][nonterminal],
+                       token=kind_name(kind) if kind is not None else None, production=production)
+        return production
+
+    def Programa(self):
+        """Analiza todo el programa con la tabla LL(1) y lo entrega al análisis semántico"""
+        grammar = self.grammar
+        rhs = grammar['rhs']
+        bodies = grammar['bodies']
+        continues = grammar['continues']
+        nonterminal_base, loop, append, new_list, action_base = grammar['bases']
+        synchronization = grammar['nonterminals'].index(self.SINCRONIZACION)
+        actions = self.actions
+
+        stack = self.stack = [nonterminal_base]  # La regla inicial es la primera de la gramática
+        values = []  # Valores de los símbolos ya reconocidos
+        bases = []  # Inicio en values de cada producción en curso
+
+        while stack:
+            entry = stack.pop()
+            if entry < 0:
+                # Fin de la producción ~entry: sus valores se reducen a uno
+                production = ~entry
+                base = bases.pop()
+                items = values[base:]
+                del values[base:]
+                if actions[production] is not None:
+                    values.append(actions[production](items))
+                else:
+                    values.append(items[0] if len(items) == 1 else (items or None))
+            elif entry < nonterminal_base:
+                index = self.current_token
+                values.append(index if self.match(entry) else None)
+            elif entry < loop:
+                nonterminal = entry - nonterminal_base
+                if nonterminal == synchronization and self.panic:
+                    self.depth = stack.count(TokenKind.LLAVE_CERRADA)  # Bloques abiertos
+                    self.synchronize()
+                    kind = self.peek_kind()
+                    if kind is None or (kind == TokenKind.LLAVE_CERRADA and self.depth):
+                        values.append(None)
+                        continue
+                production = self.predict(nonterminal)
+                if production < 0:
+                    self.error(f"Error SINTACTICO: '{kind_name(self.peek_kind())}' inesperado")
+                    self.get_next_token()
+                    values.append(None)
+                    continue
+                bases.append(len(values))
+                stack.append(~production)
+                stack.extend(rhs[production])
+            elif entry < append:
+                # Ciclo de una repetición: cada vuelta agrega el valor del cuerpo a la lista
+                nonterminal = entry - loop
+                if self.predict(nonterminal) == continues[nonterminal]:
+                    stack.append(entry)
+                    stack.append(append)
+                    stack.append(nonterminal_base + bodies[nonterminal])
+            elif entry == append:
+                item = values.pop()
+                if item is not None:
+                    values[-1].append(item)
+            elif entry == new_list:
+                values.append([])
+            else:
+                values.append(self.middle_actions[entry - action_base](values[bases[-1]:]))
+
+        self.program = values[0]
+        self.semantic_analyzer.analyze(self.program)
+        if self.trace:
+            self.trace('end', tokens=self.current_token, errors=len(self.errors))
+        return self.program
+
+    # Acciones de la gramática: reciben los valores de los símbolos de la alternativa
+
+    def action_program(self, items):
+        return self.nodes.program(items[0])
+
+    def action_invalid_statement(self, items):
+        self.error("Error SINTACTICO: declaración inválida")
+        self.get_next_token()
+
+    def action_declaration(self, items):
+        keyword, name, semicolon = items
+        statement = None
+        if name is not None:
+            ident, initializer = name
+            statement = self.nodes.declaration(keyword, ident, initializer[1] if initializer is not None else None)
+        if semicolon is None:
+            self.error("Error SINTACTICO: falta ';' al final de la declaración")
+        return statement
+
+    def action_assignment(self, items):
+        ident, _, value, _ = items
+        return self.nodes.assignment(ident, value)
+
+    def action_expected_expression(self, items):
+        self.error("Error SINTACTICO: se esperaba una expresión después de '='")
+
+    def action_if_else(self, items):
+        token, _, condition, _, _, then_body, _, else_part = items
+        return self.nodes.if_else(token, condition, then_body, else_part[2] if else_part is not None else None)
+
+    def action_position(self, items):
+        return self.current_token
+
+    def action_comparison(self, items):
+        left, token, operator, right = items
+        return self.nodes.comparison(token, operator, left, right)
+
+    def action_missing_operator(self, items):
+        self.error("Error SINTACTICO: se esperaba un operador de relación o igualdad'")
+
+    def action_print(self, items):
+        token, _, first, value, last, _, _ = items
+        return self.nodes.print(token, value, first, last)
+
+    def action_binary_op(self, items):
+        node, rest = items
+        for operator, operand in rest:
+            node = self.nodes.binary_op(operator, node, operand)
+        return node
+
+    def action_number(self, items):
+        return self.nodes.number(items[0])
+
+    def action_variable(self, items):
+        return self.nodes.variable(items[0])
+
+    def action_group(self, items):
+        return items[1]
+
+    def action_missing(self, items):
+        return self.nodes.missing(self.current_token)
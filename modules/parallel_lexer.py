@@ -0,0 +1,111 @@
+import atexit
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .diagnostics import Diagnostic
+from .lexer import get_lexer
+from .token_buffer import TokenBuffer
+
+def _tokenize_chunk(engine, profile, text, base, max_errors):
+    """Analiza un fragmento en un proceso del grupo y devuelve sus tokens con desplazamientos globales."""
+    buffer, errors = get_lexer(engine, profile).tokenize(text, max_errors)
+    starts = array('I', [offset + base for offset in buffer.starts])
+    ends = array('I', [offset + base for offset in buffer.ends])
+    return buffer.kinds, starts, ends, [(error.offset + base, error.message) for error in errors]
+
+def split_points(code, parts):
+    """Devuelve los desplazamientos donde cortar code en hasta parts fragmentos de tamaño parecido.
+
+    Cada corte queda justo después de un salto de línea. Las cadenas del lenguaje no aceptan '\\n'
+    y ningún otro token ni secuencia no reconocida cruza una línea, así que todo salto de línea es
+    un límite seguro: cada fragmento se analiza igual que dentro del código completo.
+    """
+    newline = '\n' if isinstance(code, str) else b'\n'
+    length = len(code)
+    points = [0]
+    for part in range(1, parts):
+        cut = code.find(newline, max(points[-1], length * part // parts)) + 1
+        if not cut:
+            break
+        if cut > points[-1]:
+            points.append(cut)
+    if points[-1] != length:
+        points.append(length)
+    return points
+
+class ParallelLexer:
+    """Analiza códigos grandes repartiendo fragmentos entre varios procesos.
+
+    El código se corta en saltos de línea (ver split_points), cada proceso analiza su fragmento con
+    el mismo motor y los resultados se unen en un solo TokenBuffer. Los tokens y los errores son
+    exactamente los del análisis en un solo proceso; los errores se ubican con el SourceMap del
+    código completo, así que la línea y columna también coinciden.
+    """
+
+    def __init__(self, workers, engine='regex', profile='base', min_chunk_size=1 << 20):
+        self.workers = workers
+        self.engine = engine
+        self.profile = profile
+        self.min_chunk_size = min_chunk_size
+        self.executor = None
+
+    def tokenize(self, code, max_errors=None):
+        """Devuelve lo mismo que tokenize del motor indicado para code."""
+        lexer = get_lexer(self.engine, self.profile)
+        parts = min(self.workers, len(code) // self.min_chunk_size)
+        if parts < 2:
+            return lexer.tokenize(code, max_errors)
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+
+        points = split_points(code, parts)
+        futures = [
+            self.executor.submit(_tokenize_chunk, self.engine, self.profile, code[start:end], start, max_errors)
+            for start, end in zip(points, points[1:])
+        ]
+
+        buffer = TokenBuffer(code, lexer.table)
+        lexical_errors = []
+        for future in futures:
+            kinds, starts, ends, chunk_errors = future.result()
+            buffer.kinds.extend(kinds)
+            buffer.starts.extend(starts)
+            buffer.ends.extend(ends)
+            lexical_errors.extend(chunk_errors)
+
+        if max_errors is not None and len(lexical_errors) >= max_errors:
+            # Con el límite alcanzado el análisis en serie se detiene a mitad del código
+            return lexer.tokenize(code, max_errors)
+
+        errors = [Diagnostic(message, offset, buffer.source_map) for offset, message in lexical_errors]
+        return buffer, errors
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Grupos de procesos por (procesos, motor, perfil), se reutilizan entre compilaciones
+parallel_lexers = {}
+
+def get_parallel_lexer(workers, engine='regex', profile='base'):
+    """Devuelve un ParallelLexer compartido con workers procesos para el motor y perfil indicados."""
+    key = (workers, engine, profile)
+    if key not in parallel_lexers:
+        get_lexer(engine, profile)  # Valida el motor y el perfil antes de crear procesos
+        parallel_lexers[key] = ParallelLexer(workers, engine, profile)
+    return parallel_lexers[key]
+
+@atexit.register
+def close_parallel_lexers():
+    """Detiene los procesos de los ParallelLexer compartidos; se llama al terminar el intérprete."""
+    while parallel_lexers:
+        _, lexer = parallel_lexers.popitem()
+        lexer.close()
@@ -0,0 +1,49 @@
+from array import array
+from bisect import bisect_right
+
+class SourceMap:
+    """Índice de inicios de línea de un código fuente para traducir desplazamientos a línea y columna.
+
+    El índice se construye una sola vez, en la primera consulta, y cada consulta es una búsqueda
+    binaria; los tokens solo guardan su desplazamiento. base, first_line y first_column permiten
+    describir un fragmento que empieza a mitad del código, incluso a mitad de una línea (por
+    ejemplo al leer el archivo por partes).
+    """
+    __slots__ = ('source', 'base', 'first_line', 'first_column', '_line_starts')
+
+    def __init__(self, source, base=0, first_line=1, first_column=1):
+        self.source = source
+        self.base = base
+        self.first_line = first_line
+        self.first_column = first_column
+        self._line_starts = None
+
+    @property
+    def line_starts(self):
+        if self._line_starts is None:
+            source = self.source
+            newline = '\n' if isinstance(source, str) else b'\n'
+            starts = array('I', [0])
+            pos = source.find(newline)
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = source.find(newline, pos + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_count(self):
+        return len(self.line_starts)
+
+    def line(self, offset):
+        """Devuelve el número de línea (desde 1) del desplazamiento offset."""
+        return bisect_right(self.line_starts, offset - self.base) + self.first_line - 1
+
+    def location(self, offset):
+        """Devuelve (línea, columna), ambas desde 1, del desplazamiento offset."""
+        starts = self.line_starts
+        local = offset - self.base
+        index = bisect_right(starts, local) - 1
+        column = local - starts[index] + 1
+        if not index:
+            column += self.first_column - 1
+        return index + self.first_line, column
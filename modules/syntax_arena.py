@@ -0,0 +1,221 @@
+"""Representación compacta del árbol de sintaxis para programas muy grandes.
+
+Cada nodo es una posición en arreglos paralelos (tipo de nodo, primer hijo, siguiente hermano,
+índice del token y tipo de la expresión), unos 14 bytes por nodo en lugar de un objeto de Python.
+Los nodos se recorren con Cursor, que expone los mismos atributos que las clases de syntax_tree,
+así que el análisis semántico, el intérprete y el generador de MIPS funcionan sin cambios.
+
+El arena y su TokenBuffer se pueden serializar con pickle (salvo si el código es un mmap).
+"""
+from array import array
+
+from .lexer import TokenKind
+from .syntax_tree import NodeKind
+
+# Tipo de una expresión guardado como entero; -1 es None
+TYPE_TAGS = {None: -1, 'int': 0, 'float': 1, 'real': 2}
+TYPE_NAMES = ('int', 'float', 'real')
+
+OPERADORES_RELACION = (TokenKind.OPERACION_IGUALDAD, TokenKind.OPERACION_RELACION)
+
+class SyntaxArena:
+    """Árbol de sintaxis guardado en arreglos; tiene los mismos métodos de construcción que TreeBuilder.
+
+    Los métodos devuelven el índice del nodo creado y program devuelve un Cursor a la raíz.
+    Los hijos se crean antes que el padre, así que enlazarlos no requiere mover nada.
+    """
+    __slots__ = ('tokens', 'kinds', 'first_child', 'next_sibling', 'token', 'types', 'label_ends', 'root')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.kinds = array('B')
+        self.first_child = array('i')  # -1 si el nodo no tiene hijos
+        self.next_sibling = array('i')  # -1 si es el último hijo
+        self.token = array('I')  # Token que origina el nodo (ver Cursor para cada tipo de nodo)
+        self.types = array('b')  # TYPE_TAGS del tipo de la expresión
+        self.label_ends = {}  # Nodo print -> token siguiente al final de su expresión
+        self.root = None
+
+    def add(self, kind, token, children=(), type=-1):
+        """Agrega un nodo con sus hijos (se omiten los None) y devuelve su índice."""
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.token.append(token)
+        self.types.append(type)
+        self.next_sibling.append(-1)
+
+        first = previous = -1
+        next_sibling = self.next_sibling
+        for child in children:
+            if child is None:
+                continue
+            if previous < 0:
+                first = child
+            else:
+                next_sibling[previous] = child
+            previous = child
+        self.first_child.append(first)
+        return index
+
+    def node(self, index):
+        return Cursor(self, index)
+
+    def children(self, index):
+        """Genera los cursores de los hijos del nodo index."""
+        child = self.first_child[index]
+        next_sibling = self.next_sibling
+        while child >= 0:
+            yield Cursor(self, child)
+            child = next_sibling[child]
+
+    def __len__(self):
+        return len(self.kinds)
+
+    # Métodos de construcción, con la misma firma que TreeBuilder
+
+    def program(self, statements):
+        self.root = self.add(NodeKind.PROGRAM, 0, statements)
+        return Cursor(self, self.root)
+
+    def declaration(self, keyword, ident, value):
+        return self.add(NodeKind.DECLARATION, ident, (value,))
+
+    def assignment(self, ident, value):
+        return self.add(NodeKind.ASSIGNMENT, ident, (value,))
+
+    def if_else(self, token, condition, then_body, else_body):
+        then_block = self.add(NodeKind.BLOCK, token, then_body)
+        else_block = self.add(NodeKind.BLOCK, token, else_body) if else_body is not None else None
+        return self.add(NodeKind.IF_ELSE, token, (condition, then_block, else_block))
+
+    def print(self, token, value, first, last):
+        # first se deduce del token: es el siguiente a 'print', o el que sigue al '(' si lo hay
+        index = self.add(NodeKind.PRINT, token, (value,))
+        self.label_ends[index] = last
+        return index
+
+    def comparison(self, token, operator, left, right):
+        # Si falta el operador, token es el token que ocupaba su lugar y no es un operador de relación
+        return self.add(NodeKind.COMPARISON, token, (left, right))
+
+    def binary_op(self, operator, left, right):
+        return self.add(NodeKind.BINARY_OP, operator, (left, right))
+
+    def number(self, index):
+        number_type = TYPE_TAGS['int'] if self.tokens.kinds[index] == TokenKind.ENTERO else TYPE_TAGS['float']
+        return self.add(NodeKind.NUMBER, index, type=number_type)
+
+    def variable(self, ident):
+        return self.add(NodeKind.VARIABLE, ident)
+
+    def missing(self, token):
+        return self.add(NodeKind.MISSING, token)
+
+class Cursor:
+    """Vista de un nodo de SyntaxArena con los atributos de los nodos de syntax_tree.
+
+    Los cuerpos (statements, then_body, else_body) se generan al recorrerlos en lugar de
+    construir listas, así que recorrer un programa no crea más objetos que los cursores en uso.
+    """
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    def __repr__(self):
+        return f'Cursor({NodeKind(self.kind).name}, {self.index})'
+
+    def __eq__(self, other):
+        return isinstance(other, Cursor) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.arena), self.index))
+
+    def child(self, position):
+        """Cursor del hijo en la posición indicada, o None si no existe."""
+        arena = self.arena
+        child = arena.first_child[self.index]
+        while position and child >= 0:
+            child = arena.next_sibling[child]
+            position -= 1
+        return Cursor(arena, child) if child >= 0 else None
+
+    @property
+    def kind(self):
+        return self.arena.kinds[self.index]
+
+    @property
+    def offset(self):
+        return self.arena.tokens.offset(self.arena.token[self.index])
+
+    @property
+    def interner(self):
+        return self.arena.tokens.interner
+
+    @property
+    def statements(self):
+        return self.arena.children(self.index)
+
+    @property
+    def symbol(self):
+        return self.arena.tokens.symbols[self.arena.token[self.index]]
+
+    @property
+    def var_type(self):
+        # El tipo es la palabra reservada que precede al identificador
+        tokens = self.arena.tokens
+        return 'int' if tokens.kinds[self.arena.token[self.index] - 1] == TokenKind.PALABRA_RESERVADA_INT else 'float'
+
+    @property
+    def value(self):
+        if self.kind == NodeKind.NUMBER:
+            tokens = self.arena.tokens
+            index = self.arena.token[self.index]
+            return int(tokens.lexeme(index)) if tokens.kinds[index] == TokenKind.ENTERO else float(tokens.lexeme(index))
+        return self.child(0)
+
+    @property
+    def label(self):
+        tokens = self.arena.tokens
+        token = self.arena.token[self.index]
+        first = token + 2 if token + 1 < len(tokens) and tokens.kinds[token + 1] == TokenKind.PARENTESIS_ABIERTO else token + 1
+        return tokens.text(first, self.arena.label_ends[self.index])
+
+    @property
+    def operator(self):
+        tokens = self.arena.tokens
+        token = self.arena.token[self.index]
+        if self.kind == NodeKind.COMPARISON and (token >= len(tokens) or tokens.kinds[token] not in OPERADORES_RELACION):
+            return None
+        return tokens.lexeme(token)
+
+    @property
+    def left(self):
+        return self.child(0)
+
+    @property
+    def right(self):
+        return self.child(1)
+
+    @property
+    def condition(self):
+        return self.child(0)
+
+    @property
+    def then_body(self):
+        return self.arena.children(self.arena.next_sibling[self.arena.first_child[self.index]])
+
+    @property
+    def else_body(self):
+        block = self.child(2)
+        return self.arena.children(block.index) if block is not None else None
+
+    @property
+    def type(self):
+        tag = self.arena.types[self.index]
+        return TYPE_NAMES[tag] if tag >= 0 else None
+
+    @type.setter
+    def type(self, value):
+        self.arena.types[self.index] = TYPE_TAGS[value]
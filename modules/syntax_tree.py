@@ -0,0 +1,304 @@
+"""Árbol de sintaxis que construye el Parser y que recorren el análisis semántico y los generadores.
+
+Los nodos usan __slots__ y guardan símbolos (IDs del Interner del programa) en lugar de nombres.
+offset es el desplazamiento en el código fuente del token que origina el nodo. Los tipos de las
+expresiones ('int', 'float', 'real' o None) los completa SemanticAnalyzer.
+
+Los consumidores distinguen los nodos por su atributo kind (NodeKind) y no por su clase, así
+funcionan igual con estos objetos y con los cursores de SyntaxArena (ver syntax_arena.py).
+"""
+from enum import IntEnum
+from itertools import chain
+
+from .lexer import TokenKind
+
+class NodeKind(IntEnum):
+    PROGRAM = 0
+    BLOCK = 1
+    DECLARATION = 2
+    ASSIGNMENT = 3
+    IF_ELSE = 4
+    PRINT = 5
+    COMPARISON = 6
+    BINARY_OP = 7
+    NUMBER = 8
+    VARIABLE = 9
+    MISSING = 10
+
+class Node:
+    __slots__ = ('offset',)
+
+    def __init__(self, offset):
+        self.offset = offset
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+class Program(Node):
+    kind = NodeKind.PROGRAM
+    __slots__ = ('statements', 'interner')
+
+    def __init__(self, statements, interner, offset=0):
+        super().__init__(offset)
+        self.statements = statements
+        self.interner = interner
+
+class Declaration(Node):
+    """Declaración 'int x;' o 'float x = expresión;'; value es None si no hay inicialización."""
+    kind = NodeKind.DECLARATION
+    __slots__ = ('var_type', 'symbol', 'value')
+
+    def __init__(self, var_type, symbol, value, offset):
+        super().__init__(offset)
+        self.var_type = var_type
+        self.symbol = symbol
+        self.value = value
+
+class Assignment(Node):
+    """Asignación 'x = expresión;'; value es None si falta la expresión."""
+    kind = NodeKind.ASSIGNMENT
+    __slots__ = ('symbol', 'value')
+
+    def __init__(self, symbol, value, offset):
+        super().__init__(offset)
+        self.symbol = symbol
+        self.value = value
+
+class IfElse(Node):
+    """if (condición) { then_body } else { else_body }; else_body es None si no hay else."""
+    kind = NodeKind.IF_ELSE
+    __slots__ = ('condition', 'then_body', 'else_body')
+
+    def __init__(self, condition, then_body, else_body, offset):
+        super().__init__(offset)
+        self.condition = condition
+        self.then_body = then_body
+        self.else_body = else_body
+
+class Print(Node):
+    """print(expresión); label es el texto de la expresión, para mostrar el resultado."""
+    kind = NodeKind.PRINT
+    __slots__ = ('value', 'label')
+
+    def __init__(self, value, label, offset):
+        super().__init__(offset)
+        self.value = value
+        self.label = label
+
+class Comparison(Node):
+    """Condición de un if; operator es el lexema ('==', '<=', ...) o None si faltó el operador."""
+    kind = NodeKind.COMPARISON
+    __slots__ = ('operator', 'left', 'right')
+
+    def __init__(self, operator, left, right, offset):
+        super().__init__(offset)
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+class BinaryOp(Node):
+    kind = NodeKind.BINARY_OP
+    __slots__ = ('operator', 'left', 'right', 'type')
+
+    def __init__(self, operator, left, right, offset):
+        super().__init__(offset)
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.type = None
+
+class Number(Node):
+    kind = NodeKind.NUMBER
+    __slots__ = ('value', 'type')
+
+    def __init__(self, value, type, offset):
+        super().__init__(offset)
+        self.value = value
+        self.type = type
+
+class Variable(Node):
+    kind = NodeKind.VARIABLE
+    __slots__ = ('symbol', 'type')
+
+    def __init__(self, symbol, offset):
+        super().__init__(offset)
+        self.symbol = symbol
+        self.type = None
+
+class Missing(Node):
+    """Operando que falta en una expresión con errores sintácticos."""
+    kind = NodeKind.MISSING
+    __slots__ = ('type',)
+
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.type = None
+
+def postorder(node):
+    """Recorre una expresión en postorden sin recursión: una expresión puede tener millones de operandos."""
+    stack = [(node, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded or node.kind != NodeKind.BINARY_OP:
+            yield node
+        else:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+def declarations(statements):
+    """Genera en orden de aparición las declaraciones de una lista de sentencias, incluidas las de los bloques if/else."""
+    stack = [iter(statements)]
+    while stack:
+        for statement in stack[-1]:
+            if statement.kind == NodeKind.DECLARATION:
+                yield statement
+            elif statement.kind == NodeKind.IF_ELSE:
+                stack.append(chain(statement.then_body, statement.else_body or ()))
+                break
+        else:
+            stack.pop()
+
+def _if_else_children(node):
+    children = [node.condition, list(node.then_body)]
+    if node.else_body is not None:
+        children.append(list(node.else_body))
+    return children
+
+def _value_children(node):
+    return (node.value,) if node.value is not None else ()
+
+# Por tipo de nodo: sus hijos en el orden en que se guardan y la tupla con sus atributos (ver flatten)
+_FLATTEN = {
+    NodeKind.PROGRAM: (lambda node: (list(node.statements),), lambda node: (node.kind,)),
+    NodeKind.DECLARATION: (_value_children, lambda node: (node.kind, node.offset, node.var_type, node.symbol, node.value is not None)),
+    NodeKind.ASSIGNMENT: (_value_children, lambda node: (node.kind, node.offset, node.symbol, node.value is not None)),
+    NodeKind.IF_ELSE: (_if_else_children, lambda node: (node.kind, node.offset, node.else_body is not None)),
+    NodeKind.PRINT: (_value_children, lambda node: (node.kind, node.offset, node.label)),
+    NodeKind.COMPARISON: (lambda node: (node.left, node.right), lambda node: (node.kind, node.offset, node.operator)),
+    NodeKind.BINARY_OP: (lambda node: (node.left, node.right), lambda node: (node.kind, node.offset, node.operator, node.type)),
+    NodeKind.NUMBER: (lambda node: (), lambda node: (node.kind, node.offset, node.value, node.type)),
+    NodeKind.VARIABLE: (lambda node: (), lambda node: (node.kind, node.offset, node.symbol, node.type)),
+    NodeKind.MISSING: (lambda node: (), lambda node: (node.kind, node.offset, node.type)),
+}
+# Listas indexadas por el tipo de nodo: el hash de un miembro de Enum se calcula en Python y es lento
+_FLATTEN = [_FLATTEN.get(kind) for kind in NodeKind]
+
+def flatten(program):
+    """Convierte el árbol en una lista de tuplas en postorden, sin recursión, para guardarlo en disco.
+
+    Cada tupla empieza con el NodeKind del nodo (BLOCK para una lista de sentencias) seguido de sus
+    atributos; los hijos la preceden. Funciona con los nodos de este módulo y con los cursores de SyntaxArena.
+    """
+    block = int(NodeKind.BLOCK)
+    records = []
+    stack = [(program, False)]
+    while stack:
+        item, expanded = stack.pop()
+        if isinstance(item, list):
+            if expanded:
+                records.append((block, len(item)))
+            else:
+                stack.append((item, True))
+                stack.extend((child, False) for child in reversed(item))
+        else:
+            children, record = _FLATTEN[item.kind]
+            if expanded:
+                records.append(record(item))
+            else:
+                stack.append((item, True))
+                stack.extend((child, False) for child in reversed(children(item)))
+    return records
+
+def _typed(node, record):
+    node.type = record[-1]
+    return node
+
+def _unflatten_if_else(stack, record):
+    else_body = stack.pop() if record[2] else None
+    then_body = stack.pop()
+    return IfElse(stack.pop(), then_body, else_body, record[1])
+
+def _unflatten_operation(node_class, stack, record):
+    right = stack.pop()
+    return node_class(record[2], stack.pop(), right, record[1])
+
+# Por tipo de nodo: construye el nodo de la tupla tomando sus hijos de la pila
+_UNFLATTEN = {
+    NodeKind.DECLARATION: lambda stack, record: Declaration(record[2], record[3], stack.pop() if record[4] else None, record[1]),
+    NodeKind.ASSIGNMENT: lambda stack, record: Assignment(record[2], stack.pop() if record[3] else None, record[1]),
+    NodeKind.IF_ELSE: _unflatten_if_else,
+    NodeKind.PRINT: lambda stack, record: Print(stack.pop(), record[2], record[1]),
+    NodeKind.COMPARISON: lambda stack, record: _unflatten_operation(Comparison, stack, record),
+    NodeKind.BINARY_OP: lambda stack, record: _typed(_unflatten_operation(BinaryOp, stack, record), record),
+    NodeKind.NUMBER: lambda stack, record: Number(record[2], record[3], record[1]),
+    NodeKind.VARIABLE: lambda stack, record: _typed(Variable(record[2], record[1]), record),
+    NodeKind.MISSING: lambda stack, record: _typed(Missing(record[1]), record),
+}
+_UNFLATTEN = [_UNFLATTEN.get(kind) for kind in NodeKind]
+
+def unflatten(records, interner):
+    """Reconstruye con los nodos de este módulo el árbol que devolvió flatten."""
+    block, program = NodeKind.BLOCK, NodeKind.PROGRAM
+    stack = []
+    for record in records:
+        kind = record[0]
+        if kind == block:
+            first = len(stack) - record[1]
+            items = stack[first:]
+            del stack[first:]
+            stack.append(items)
+        elif kind == program:
+            stack.append(Program(stack.pop(), interner))
+        else:
+            stack.append(_UNFLATTEN[kind](stack, record))
+    return stack.pop()
+
+class TreeBuilder:
+    """Crea los nodos del Parser como objetos a partir de los índices de sus tokens.
+
+    Las posiciones se piden con tokens.offset, que también funciona con el SplitTokenBuffer del lexer incremental.
+
+    SyntaxArena tiene los mismos métodos y guarda los nodos en arreglos; el Parser usa uno u otro.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def program(self, statements):
+        return Program(statements, self.tokens.interner)
+
+    def declaration(self, keyword, ident, value):
+        tokens = self.tokens
+        var_type = 'int' if tokens.kinds[keyword] == TokenKind.PALABRA_RESERVADA_INT else 'float'
+        return Declaration(var_type, tokens.symbols[ident], value, tokens.offset(ident))
+
+    def assignment(self, ident, value):
+        return Assignment(self.tokens.symbols[ident], value, self.tokens.offset(ident))
+
+    def if_else(self, token, condition, then_body, else_body):
+        return IfElse(condition, then_body, else_body, self.tokens.offset(token))
+
+    def print(self, token, value, first, last):
+        return Print(value, self.tokens.text(first, last), self.tokens.offset(token))
+
+    def comparison(self, token, operator, left, right):
+        """operator es el índice del token del operador, o None si faltó."""
+        lexeme = self.tokens.lexeme(operator) if operator is not None else None
+        return Comparison(lexeme, left, right, self.tokens.offset(token))
+
+    def binary_op(self, operator, left, right):
+        return BinaryOp(self.tokens.lexeme(operator), left, right, self.tokens.offset(operator))
+
+    def number(self, index):
+        tokens = self.tokens
+        if tokens.kinds[index] == TokenKind.ENTERO:
+            return Number(int(tokens.lexeme(index)), 'int', tokens.offset(index))
+        return Number(float(tokens.lexeme(index)), 'float', tokens.offset(index))
+
+    def variable(self, ident):
+        return Variable(self.tokens.symbols[ident], self.tokens.offset(ident))
+
+    def missing(self, token):
+        return Missing(self.tokens.offset(token))
@@ -0,0 +1,108 @@
+from array import array
+
+from .interner import Interner
+from .source_map import SourceMap
+
+class TokenBuffer:
+    """Almacén compacto de tokens en arreglos paralelos.
+
+    Por cada token se guarda el índice de su regla en la tabla de tokens (array 'B') y
+    sus posiciones de inicio y fin dentro del código fuente (array 'I'); el lexema solo
+    se materializa cuando se solicita (el código puede ser bytes o un mmap del archivo, en cuyo
+    caso el lexema se decodifica al pedirlo). Como secuencia se comporta igual que la lista de
+    tuplas (lexema, tipo, número de tipo) que producía el analizador léxico. La línea y
+    columna de cada token se obtienen de su desplazamiento con el SourceMap del código.
+    Después de intern, symbols guarda el ID de cada identificador en el Interner del buffer.
+    """
+    __slots__ = ('source', 'table', 'kinds', 'starts', 'ends', 'source_map', 'interner', 'symbols')
+
+    def __init__(self, source, table):
+        self.source = source
+        self.table = table
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.source_map = SourceMap(source)
+        self.interner = None
+        self.symbols = None
+
+    def append(self, kind, start, end):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def lexeme(self, index):
+        """Devuelve el texto del token en la posición index."""
+        lexeme = self.source[self.starts[index]:self.ends[index]]
+        return lexeme if isinstance(lexeme, str) else lexeme.decode('utf-8')
+
+    def intern(self, identifier, interner=None):
+        """Asigna un ID a cada token de tipo identifier y devuelve el arreglo de IDs alineado con los tokens.
+
+        Los demás tokens quedan con 0. Solo se recorre el buffer la primera vez; interner permite
+        compartir la tabla de nombres con otra fase de la compilación.
+        """
+        if self.symbols is not None and (interner is None or interner is self.interner):
+            return self.symbols
+
+        interner = Interner() if interner is None else interner
+        intern = interner.intern
+        symbols = array('I', bytes(4 * len(self.kinds)))
+        # Los tipos son bytes, así que los identificadores se localizan con find sobre su copia en bytes
+        kinds = self.kinds.tobytes()
+        marker = bytes([identifier])
+        index = kinds.find(marker)
+        while index != -1:
+            symbols[index] = intern(self.lexeme(index))
+            index = kinds.find(marker, index + 1)
+
+        self.interner = interner
+        self.symbols = symbols
+        return symbols
+
+    def symbol(self, index):
+        """ID del identificador en la posición index (requiere haber llamado a intern)."""
+        return self.symbols[index]
+
+    def text(self, first, last):
+        """Devuelve el código fuente que cubren los tokens first a last - 1."""
+        if first >= last:
+            return ''
+        text = self.source[self.starts[first]:self.ends[last - 1]]
+        return text if isinstance(text, str) else text.decode('utf-8')
+
+    def token_type(self, index):
+        """Devuelve la descripción del tipo del token (por ejemplo 'identificador')."""
+        return self.table[self.kinds[index]][1]
+
+    def num_type(self, index):
+        return self.table[self.kinds[index]][2]
+
+    def location(self, index):
+        """Devuelve (línea, columna) del inicio del token en la posición index."""
+        return self.source_map.location(self.starts[index])
+
+    def offset(self, index):
+        """Desplazamiento del token index, o el final del código si index está fuera del buffer."""
+        if index < len(self.starts):
+            return self.starts[index]
+        return len(self.source)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        _, tokenType, numType = self.table[self.kinds[index]]
+        return (self.lexeme(index), tokenType, numType)
+
+    def __iter__(self):
+        source = self.source
+        table = self.table
+        text = isinstance(source, str)
+        for kind, start, end in zip(self.kinds, self.starts, self.ends):
+            _, tokenType, numType = table[kind]
+            lexeme = source[start:end]
+            yield (lexeme if text else lexeme.decode('utf-8'), tokenType, numType)
@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+import time
+from enum import IntEnum
+
+class TraceLevel(IntEnum):
+    OFF = 0
+    PHASE = 1   # Inicio y fin de cada fase del compilador
+    DEBUG = 2   # Eventos por token, por regla de la gramática y por declaración
+
+def print_sink(phase, event, fields):
+    """Escribe el evento como una línea legible en la salida estándar."""
+    details = ', '.join(f'{name} = {value}' for name, value in fields.items())
+    print(f'{phase} | {event} | {details}' if details else f'{phase} | {event}')
+
+class JsonLinesSink:
+    """Escribe cada evento como un objeto JSON por línea: {"time", "phase", "event", ...campos}."""
+
+    def __init__(self, target):
+        self.owned = isinstance(target, (str, os.PathLike))
+        self.stream = open(target, 'a', encoding='utf-8') if self.owned else target
+
+    def __call__(self, phase, event, fields):
+        record = {'time': time.time(), 'phase': phase, 'event': event, **fields}
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def close(self):
+        if self.owned:
+            self.stream.close()
+
+class Tracer:
+    """Punto único de la depuración del compilador; por omisión no produce ninguna salida.
+
+    Cada componente pide al construirse una función con hook(fase, nivel) y la guarda; si el
+    nivel está deshabilitado recibe None y cada punto de traza se reduce a comprobar
+    `if self.trace:` sin construir mensajes ni hacer E/S.
+    """
+
+    def __init__(self, level=TraceLevel.OFF, sink=print_sink):
+        self.level = TraceLevel(level)
+        self.sink = sink
+
+    def hook(self, phase, level=TraceLevel.DEBUG):
+        """Devuelve trace(event, **fields) para los eventos de phase, o None si level no está habilitado."""
+        if self.level < level:
+            return None
+
+        sink = self.sink
+        def trace(event, **fields):
+            sink(phase, event, fields)
+        return trace
+
+    def configure(self, level, sink=None):
+        """Cambia el nivel y opcionalmente el destino; afecta a los componentes que se construyan después."""
+        self.level = TraceLevel(level)
+        if sink is not None:
+            self.sink = sink
+
+    @classmethod
+    def from_environment(cls):
+        """Nivel en COMPILADOR_TRACE (off, phase o debug) y archivo JSON lines opcional en COMPILADOR_TRACE_FILE."""
+        level = os.environ.get('COMPILADOR_TRACE', 'off').upper()
+        if level not in TraceLevel.__members__:
+            print(f"COMPILADOR_TRACE desconocido: '{level.lower()}', se desactiva la traza", file=sys.stderr)
+            level = 'OFF'
+        path = os.environ.get('COMPILADOR_TRACE_FILE')
+        return cls(TraceLevel[level], JsonLinesSink(path) if path else print_sink)
+
+# Traza compartida por el compilador
+tracer = Tracer.from_environment()
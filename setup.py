@@ -2,8 +2,10 @@ import sys
 import os
 from cx_Freeze import setup, Executable
 
+from modules.app_settings import Settings
+
 # ADD FILES
-files = ['icon.ico','themes/']
+files = ['icon.ico','themes/',('modules/grammar.ebnf','lib/modules/grammar.ebnf')]
 
 # TARGET
 target = Executable(
@@ -15,7 +17,7 @@ target = Executable(
 # SETUP CX FREEZE
 setup(
     name = "PyDracula",
-    version = "1.0",
+    version = Settings.VERSION,
     description = "Modern GUI for Python applications",
     author = "Wanderson M. Pimenta",
     options = {'build_exe' : {'include_files' : files}},
@@ -0,0 +1,82 @@
+"""CompilationCache y DiskCompilationCache: aciertos, formato en disco y archivos dañados."""
+import os
+import zlib
+
+from modules.cache_format import pack, unpack
+from modules.compilation_cache import COMPILER_VERSION, CompilationCache, DiskCompilationCache, dumps, loads
+from modules.compiler import CompilationOptions, compile_source
+from modules.syntax_arena import Cursor
+from modules.syntax_tree import flatten
+
+PROGRAM = 'int a = 2;\nfloat b = a * 1.5;\nif (a <= 2) { print(b); } else { print(a); }\nint c = a / 0;\n'
+
+def summary(result):
+    def errors(diagnostics):
+        return None if diagnostics is None else [(error.message, error.offset, error.location) for error in diagnostics]
+    return (list(result.tokens), errors(result.lexical_errors), errors(result.syntax_errors), errors(result.semantic_errors),
+            errors(result.runtime_errors), result.mips, result.output, flatten(result.program))
+
+def test_dumps_and_loads_round_trip():
+    for code in (PROGRAM, 'int x = 3; print(x);', 'x = ;', 'int a = 1 @', ''):
+        result = compile_source(code)
+        if result.program is None:
+            continue
+        assert summary(loads(dumps(result))) == summary(result)
+
+def test_memory_cache_returns_the_stored_result():
+    cache = CompilationCache()
+    first = compile_source(PROGRAM, None, cache)
+    assert compile_source(PROGRAM, None, cache) is first
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    first = compile_source(PROGRAM, None, DiskCompilationCache(str(tmp_path)))
+    disk = DiskCompilationCache(str(tmp_path))
+    assert summary(disk.get(PROGRAM, CompilationOptions().key)) == summary(first)
+    assert disk.hits == 1
+
+def corrupt(disk, header_change):
+    path = disk.path(PROGRAM, CompilationOptions().key)
+    with open(path, 'rb') as file:
+        header, blobs = unpack(zlib.decompress(file.read()))
+    header_change(header)
+    with open(path, 'wb') as file:
+        file.write(zlib.compress(pack(header, *blobs)))
+
+def test_corrupt_entries_are_misses(tmp_path):
+    disk = DiskCompilationCache(str(tmp_path))
+    compile_source(PROGRAM, None, disk)
+    changes = [
+        lambda header: header['records'].append([1, 'x']),
+        lambda header: header['records'].__setitem__(0, [99, 0]),
+        lambda header: header.__setitem__('records', [[1, 0]]),
+        lambda header: header.__setitem__('mips', 5),
+        lambda header: header.__setitem__('version', COMPILER_VERSION + 'x'),
+        lambda header: header.pop('timings'),
+    ]
+    for change in changes:
+        compile_source(PROGRAM, None, disk)
+        corrupt(disk, change)
+        assert disk.get(PROGRAM, CompilationOptions().key) is None
+    path = disk.path(PROGRAM, CompilationOptions().key)
+    with open(path, 'wb') as file:
+        file.write(b'not a cache file')
+    assert disk.get(PROGRAM, CompilationOptions().key) is None
+
+def test_overwriting_an_entry_does_not_grow_the_size(tmp_path):
+    disk = DiskCompilationCache(str(tmp_path))
+    result = compile_source(PROGRAM)
+    disk.put(PROGRAM, CompilationOptions().key, result)
+    disk.put(PROGRAM, CompilationOptions().key, result)
+    disk.put(PROGRAM, CompilationOptions().key, result)
+    assert disk.size == sum(entry.stat().st_size for entry in os.scandir(tmp_path))
+
+def test_arena_option_gets_an_arena_tree(tmp_path):
+    arena = CompilationOptions(arena=True)
+    for cache in (CompilationCache(), DiskCompilationCache(str(tmp_path))):
+        objects = compile_source(PROGRAM, None, cache)
+        assert not isinstance(objects.program, Cursor)
+        assert isinstance(compile_source(PROGRAM, arena, cache).program, Cursor)
+        assert not isinstance(compile_source(PROGRAM, None, cache).program, Cursor)
+    hit = compile_source(PROGRAM, arena, CompilationCache(disk=DiskCompilationCache(str(tmp_path))))
+    assert isinstance(hit.program, Cursor) and flatten(hit.program) == flatten(objects.program)
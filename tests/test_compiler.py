@@ -0,0 +1,50 @@
+"""compile_source, los diagnósticos de ejecución del intérprete y la compilación desde varios hilos."""
+from concurrent.futures import ThreadPoolExecutor
+
+from modules import compiler
+from modules.benchmark import generate_sized_program
+from modules.compiler import CompilationOptions, compile_source
+from modules.syntax_tree import flatten
+
+def runtime_errors(result):
+    return [(error.message, error.line, error.column) for error in result.runtime_errors]
+
+def test_runtime_error_is_a_diagnostic():
+    result = compile_source('int x = 0;\nint y = 3 / x;\nprint(y);')
+    assert result.output is None and result.mips is not None
+    assert runtime_errors(result) == [("Error evaluando la expresión: division by zero", 2, 11)]
+
+def test_arithmetic_overflow_is_a_runtime_diagnostic():
+    code = 'int x = 10;\n' + 'x = x * x * x * x * x * x * x * x;\n' * 3 + 'x = x * x; x = x / 3; print(x);'
+    result = compile_source(code)
+    assert result.output is None
+    assert runtime_errors(result) == [("Error evaluando la expresión: integer division result too large for a float", 5, 18)]
+
+def test_compile_source_runs_every_phase():
+    result = compile_source('int a = 2;\nfloat b = a * 1.5;\nif (a <= 2) { print(b); } else { print(a); }\n')
+    assert result.diagnostics == []
+    assert result.output == 'b = 3'
+    assert result.mips.startswith('.data\na: .word 0\nb: .float 0.0\n')
+
+def test_lexical_errors_stop_the_later_phases():
+    result = compile_source('int a = 1 @;\nb = 2;')
+    assert [(error.line, error.column) for error in result.diagnostics] == [(1, 11)]
+    assert result.mips is None and result.output is None
+
+def test_compile_is_not_exported():
+    assert 'compile_source' in compiler.__all__ and 'compile' not in compiler.__all__
+
+def summary(result):
+    return (list(result.tokens), [str(error) for error in result.diagnostics], result.mips, result.output,
+            flatten(result.program) if result.program is not None else None)
+
+def test_concurrent_compilations_match_serial_ones():
+    # Cada Compilation tiene su propio estado, así que varios hilos pueden compilar a la vez
+    programs = [generate_sized_program(400, mix='control', seed=seed, max_depth=4)[0] for seed in range(8)]
+    programs += ['int x = 0;\nint y = 3 / x;', 'x = ;\nint y = 1 2;', 'int a = 1 @;']
+    options = [CompilationOptions(), CompilationOptions(parser='ll1'), CompilationOptions(arena=True)]
+    jobs = [(code, option) for code in programs for option in options] * 3
+    expected = [summary(compile_source(code, option)) for code, option in jobs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda job: summary(compile_source(*job)), jobs))
+    assert results == expected
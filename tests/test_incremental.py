@@ -0,0 +1,138 @@
+"""IncrementalLexer e IncrementalParser frente al análisis completo del mismo texto."""
+import random
+
+import pytest
+
+from modules.benchmark import generate_program
+from modules.compiler import CompilationOptions, MIPSCodeGenerator, Parser, compile_source
+from modules.incremental_lexer import IncrementalLexer
+from modules.incremental_parser import IncrementalParser
+from modules.lexer import regex_lexer
+from modules.syntax_tree import flatten
+
+def error_list(errors):
+    return [(error.offset, error.message) for error in errors]
+
+def edited_lexer(text):
+    """IncrementalLexer que llegó a text con una edición que agrega su segunda mitad."""
+    lexer = IncrementalLexer()
+    middle = len(text) // 2
+    lexer.reset(text[:middle])
+    lexer.apply_edit(middle, 0, len(text) - middle, text)
+    return lexer
+
+@pytest.mark.parametrize('max_errors', [None, 0, 1, 2, 3, 5])
+def test_snapshot_stops_like_tokenize(max_errors):
+    rng = random.Random(3)
+    pieces = ['int', ' ', 'x', '=', '1', ';', '\n', '@', '#', '$$', '"a"', '<=', '2.5', 'if', '(', ')', '  ']
+    for _ in range(1000):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        buffer, errors = edited_lexer(text).snapshot(max_errors)
+        expected, expected_errors = regex_lexer.tokenize(text, max_errors)
+        assert list(buffer) == list(expected), text
+        assert error_list(errors) == error_list(expected_errors), text
+
+def test_capped_editor_result_matches_fresh_compile():
+    code = "int x = 1; @ print(x); # y = 2;\n"
+    options = CompilationOptions(max_lexical_errors=1)
+    editor = compile_source(code, options, None, edited_lexer(code))
+    fresh = compile_source(code, options)
+    assert len(editor.tokens) == len(fresh.tokens) == 5
+    assert error_list(editor.lexical_errors) == error_list(fresh.lexical_errors)
+
+def test_lexer_profile_must_match_options():
+    with pytest.raises(ValueError):
+        compile_source('int x;', CompilationOptions(profile='espanol'), None, edited_lexer('int x;'))
+
+def test_runtime_error_is_located_in_the_edited_text():
+    code = 'int a = 1;\nint b = 0;\nprint(a);\nint c = a / b;\n'
+    lexer = IncrementalLexer()
+    parser = IncrementalParser(lexer)
+    lexer.reset(code)
+    compile_source(code, None, None, lexer, parser)
+    edited = 'int z = 5;\n\n\n' + code
+    lexer.apply_edit(0, 0, len(edited) - len(code), edited)
+    editor = compile_source(edited, None, None, lexer, parser)
+    fresh = compile_source(edited)
+    assert [(error.line, error.column) for error in editor.runtime_errors] == [(7, 11)]
+    assert error_list(editor.runtime_errors) == error_list(fresh.runtime_errors)
+
+def test_editor_line_edits_match_full_lexing():
+    # Como main.py: cada edición entrega solo sus líneas completas y el texto se recibe al compilar
+    rng = random.Random(5)
+    pieces = ['int x = 1;', '\n', ' ', 'print(x);', '@', '"a b"', 'if (x <= 2) {', '}', '2.5', '#']
+    text = ''.join(rng.choice(pieces) for _ in range(60))
+    lexer = IncrementalLexer()
+    lexer.reset(text)
+    for _ in range(300):
+        position = rng.randint(0, len(text))
+        removed = rng.randint(0, min(5, len(text) - position))
+        inserted = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+        text = text[:position] + inserted + text[position + removed:]
+        start = text.rfind('\n', 0, position) + 1
+        end = text.find('\n', position + len(inserted))
+        end = len(text) if end == -1 else end + 1
+        lexer.apply_lines(start, end - len(inserted) + removed, text[start:end])
+        if rng.random() < 0.2:
+            lexer.sync(text)
+            buffer, errors = lexer.snapshot()
+            expected, expected_errors = regex_lexer.tokenize(text)
+            assert list(buffer) == list(expected)
+            assert error_list(errors) == error_list(expected_errors)
+
+def parse_signature(parser):
+    return (error_list(parser.get_errors()), error_list(parser.get_semantic_errors()))
+
+def test_incremental_reparse_matches_full_parse():
+    # Ediciones al azar que luego se deshacen, y sentencias completas que se insertan o se borran,
+    # así el texto vuelve a ser válido y también se comparan los árboles
+    rng = random.Random(11)
+    pieces = ['int ', 'float ', 'x', 'y', ' = ', '3', '2.5', ';', '\n', '(', ')', '{', '}', 'if ', 'else ', 'print', ' + ', ' < ', '@']
+    statements = generate_program(20, seed=3).splitlines(keepends=True)
+    text = generate_program(30, seed=2)
+    lexer = IncrementalLexer()
+    incremental = IncrementalParser(lexer)
+    lexer.reset(text)
+    trees = 0
+
+    def edit(position, removed, inserted):
+        nonlocal text
+        old = text[position:position + removed]
+        text = text[:position] + inserted + text[position + removed:]
+        lexer.apply_edit(position, removed, len(inserted), text)
+        return old
+
+    for _ in range(300):
+        choice = rng.random()
+        undo = None
+        if choice < 0.3:
+            position = text.find('\n', rng.randint(0, len(text))) + 1
+            edit(position, 0, rng.choice(statements))
+        elif choice < 0.4:
+            position = text.find('\n', rng.randint(0, len(text))) + 1
+            edit(position, text.find('\n', position) + 1 - position if position < len(text) else 0, '')
+        else:
+            position = rng.randint(0, len(text))
+            removed = rng.randint(0, min(rng.choice([0, 1, 3, 12]), len(text) - position))
+            inserted = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 4)))
+            undo = (position, len(inserted), edit(position, removed, inserted))
+        for _ in range(2):
+            buffer, _ = lexer.snapshot()
+            parser = incremental.parse(buffer)
+            full = Parser(regex_lexer.tokenize(text)[0])
+            full.Programa()
+            assert parse_signature(parser) == parse_signature(full), text
+            if not parser.get_errors():
+                # Los nodos reutilizados conservan su desplazamiento anterior si exact es False
+                records, expected = flatten(parser.program), flatten(full.program)
+                if incremental.exact:
+                    assert records == expected, text
+                else:
+                    assert [record[0] for record in records] == [record[0] for record in expected], text
+                    assert MIPSCodeGenerator(parser.program).getResult() == MIPSCodeGenerator(full.program).getResult()
+                trees += 1
+            if undo is None:
+                break
+            edit(*undo)
+            undo = None
+    assert trees > 100
@@ -0,0 +1,84 @@
+"""Equivalencia de los motores léxicos: regex, dfa y el árbol de operadores (OperatorTrie) que usan ambos."""
+import pytest
+
+from modules.benchmark import EQUIVALENCE_CASES, check_equivalence, random_programs
+from modules.lexer import TokenKind, get_lexer, regex_lexer
+
+ENGINES = ('regex', 'dfa')
+PROGRAMS = EQUIVALENCE_CASES + random_programs(5000, seed=7)
+
+def error_list(errors):
+    return [(error.offset, error.message) for error in errors]
+
+def trie_match(trie, code, start):
+    """Lexema más largo del árbol de operadores que empieza en start, o None."""
+    children, longest, pos = trie.root, None, start
+    while pos < len(code) and code[pos] in children:
+        rule, children = children[code[pos]]
+        pos += 1
+        if rule is not None:
+            longest = code[start:pos]
+    return longest
+
+@pytest.mark.parametrize('profile', ['base', 'espanol'])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_regex_and_dfa_agree(profile, seed):
+    programs = PROGRAMS + random_programs(2000, seed)
+    if profile == 'espanol':
+        programs = programs + ['entero x = 1;', 'real y = 2.5;', 'enterox realy', 'entero(real)']
+    assert check_equivalence(get_lexer('regex', profile), get_lexer('dfa', profile), programs) == []
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_operators_take_the_longest_trie_match(engine):
+    lexer = get_lexer(engine)
+    trie = lexer.operator_trie
+    operators = set(trie.rules.values())
+    for code in PROGRAMS:
+        buffer, _ = lexer.tokenize(code)
+        for kind, start, end in zip(buffer.kinds, buffer.starts, buffer.ends):
+            if kind in operators:
+                assert code[start:end] == trie_match(trie, code, start), code
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('code, kinds', [
+    ('x<=3', [TokenKind.IDENTIFICADOR, TokenKind.OPERACION_RELACION, TokenKind.ENTERO]),
+    ('a >= b', [TokenKind.IDENTIFICADOR, TokenKind.OPERACION_RELACION, TokenKind.IDENTIFICADOR]),
+    ('a<==b', [TokenKind.IDENTIFICADOR, TokenKind.OPERACION_RELACION, TokenKind.ASIGNACION, TokenKind.IDENTIFICADOR]),
+    ('a!==b', [TokenKind.IDENTIFICADOR, TokenKind.OPERACION_IGUALDAD, TokenKind.ASIGNACION, TokenKind.IDENTIFICADOR]),
+    ('a=>b', [TokenKind.IDENTIFICADOR, TokenKind.ASIGNACION, TokenKind.OPERACION_RELACION, TokenKind.IDENTIFICADOR]),
+    ('if (x <= y) {', [TokenKind.PALABRA_RESERVADA_IF, TokenKind.PARENTESIS_ABIERTO, TokenKind.IDENTIFICADOR,
+                       TokenKind.OPERACION_RELACION, TokenKind.IDENTIFICADOR, TokenKind.PARENTESIS_CERRADO, TokenKind.LLAVE_ABIERTA]),
+])
+def test_relational_operators(engine, code, kinds):
+    buffer, errors = get_lexer(engine).tokenize(code)
+    assert list(buffer.kinds) == kinds
+    assert errors == []
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('code, errors', [
+    ('a@b', [(1, "Error LEXICO: token no reconosido '@'")]),
+    ('#$%', [(0, "Error LEXICO: secuencia no reconocida '#$%' (3 caracteres)")]),
+    ('x = 1; @@ y', [(7, "Error LEXICO: secuencia no reconocida '@@' (2 caracteres)")]),
+    ('"sin cerrar', [(0, "Error LEXICO: token no reconosido '\"'")]),
+    ('é = 1;', [(0, "Error LEXICO: token no reconosido 'é'")]),
+])
+def test_lexical_errors(engine, code, errors):
+    assert error_list(get_lexer(engine).tokenize(code)[1]) == errors
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_max_errors(engine):
+    _, errors = get_lexer(engine).tokenize('@ # $ %', max_errors=2)
+    assert error_list(errors) == [
+        (0, "Error LEXICO: token no reconosido '@'"),
+        (2, "Error LEXICO: token no reconosido '#'"),
+        (3, "Error LEXICO: se alcanzó el máximo de 2 errores; no se analizaron los 4 caracteres restantes"),
+    ]
+
+def test_bytes_source_matches_text():
+    for code in PROGRAMS:
+        if code.isascii():
+            text_buffer, text_errors = regex_lexer.tokenize(code)
+            bytes_buffer, bytes_errors = regex_lexer.tokenize(code.encode('ascii'))
+            assert list(bytes_buffer.kinds) == list(text_buffer.kinds), code
+            assert list(bytes_buffer.starts) == list(text_buffer.starts), code
+            assert error_list(bytes_errors) == error_list(text_errors), code
@@ -0,0 +1,60 @@
+"""Parser y LLParser: recuperación en modo pánico y equivalencia entre ambos analizadores."""
+import pytest
+
+from modules.benchmark import generate_sized_program, random_programs
+from modules.compiler import Compiler, CompilationOptions, compile_source
+from modules.syntax_tree import flatten
+
+def syntax_errors(code, **options):
+    return [(error.message, error.line, error.column) for error in compile_source(code, CompilationOptions(**options)).syntax_errors]
+
+def test_missing_semicolon_reports_one_error_and_continues():
+    errors = syntax_errors('int x = 1\nint y = 2;\nprint(x);\nz = ;\n')
+    assert [(line, column) for _, line, column in errors] == [(2, 1), (4, 5)]
+
+def test_recovery_synchronizes_on_closing_brace_and_keywords():
+    errors = syntax_errors('if (x) { int a = 1 }\nprint(1);\nint b = 2 2;\nfloat c = 1;\n')
+    assert [(line, column) for _, line, column in errors] == [(1, 6), (1, 20), (3, 11)]
+
+def test_garbage_makes_forward_progress():
+    # Cada línea inválida produce a lo sumo un error y el análisis termina
+    code = '} ) ( = + ;\n' * 2000 + 'int x = 1;\n'
+    errors = syntax_errors(code)
+    assert 0 < len(errors) <= 2000
+    assert len(set(errors)) == len(errors)
+
+def test_max_syntax_errors_stops_the_parser():
+    # Después de max_syntax_errors errores un aviso indica que el resto del programa no se analizó
+    errors = syntax_errors('x = ;\n' * 50, max_syntax_errors=3)
+    assert len(errors) == 4 and 'máximo de 3 errores' in errors[-1][0]
+
+def parse_signature(code, engine, arena):
+    tokens, _ = Compiler.lexicalAnalyser(code)
+    parser = Compiler.parse(tokens, arena, None, engine)
+    return (flatten(parser.program), [(error.message, error.offset) for error in parser.get_errors()],
+            [(error.message, error.offset) for error in parser.get_semantic_errors()])
+
+@pytest.mark.parametrize('arena', [False, True])
+def test_ll1_parser_matches_manual_parser(arena):
+    programs = [generate_sized_program(300, mix='control', seed=seed, max_depth=5)[0] for seed in range(10)]
+    programs += random_programs(300, seed=4)
+    programs += ['int x = 1\nint y = 2;', 'if (x) { int a = 1 }', '}}}}', 'x = ;', 'else { print(1); }']
+    for code in programs:
+        assert parse_signature(code, 'll1', arena) == parse_signature(code, 'manual', arena), code
+
+def test_ll1_compile_matches_manual_compile():
+    code, _ = generate_sized_program(500, mix='control', seed=7, max_depth=4)
+    manual = compile_source(code, CompilationOptions(parser='manual'))
+    ll1 = compile_source(code, CompilationOptions(parser='ll1'))
+    assert (ll1.mips, ll1.output) == (manual.mips, manual.output)
+
+def test_ll1_parser_handles_deep_nesting():
+    depth = 5000
+    code = 'int x = 1;\n' + 'if (x < 2) {\n' * depth + 'print(x);\n' + '}\n' * depth
+    tokens, _ = Compiler.lexicalAnalyser(code)
+    parser = Compiler.parse(tokens, True, None, 'll1')
+    assert parser.get_errors() == []
+
+def test_unknown_parser_engine_is_rejected():
+    with pytest.raises(ValueError):
+        compile_source('int x;', CompilationOptions(parser='lr'))